@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Achievement, UserAchievement, AchievementProgress
+from .models import Achievement, UserAchievement, AchievementProgress, AchievementRecheck, UserScore
 
 
 @admin.register(Achievement)
@@ -45,7 +45,7 @@ class AchievementAdmin(admin.ModelAdmin):
     
     def earned_count(self, obj):
         """Show how many users earned this achievement"""
-        count = obj.user_achievements.count()
+        count = obj.earned_count
         if count > 0:
             url = reverse('admin:achievements_userachievement_changelist')
             return format_html(
@@ -210,6 +210,29 @@ class AchievementProgressAdmin(admin.ModelAdmin):
     progress_percentage_display.short_description = 'Progress Percentage'
 
 
+@admin.register(AchievementRecheck)
+class AchievementRecheckAdmin(admin.ModelAdmin):
+    """
+    Admin interface for queued achievement rechecks
+    """
+    list_display = ['user', 'triggers', 'requested_at', 'attempts']
+    list_filter = ['attempts']
+    search_fields = ['user__username']
+    list_select_related = ['user']
+    readonly_fields = ['user', 'triggers', 'context', 'requested_at', 'attempts', 'last_error']
+
+
+@admin.register(UserScore)
+class UserScoreAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the points leaderboard (maintained automatically)
+    """
+    list_display = ['user', 'total_points', 'achievement_count', 'last_earned_at']
+    search_fields = ['user__username']
+    list_select_related = ['user']
+    readonly_fields = ['user', 'total_points', 'achievement_count', 'last_earned_at']
+
+
 # Customize admin site header
 admin.site.site_header = "Motomundo Achievement System"
 admin.site.site_title = "Motomundo Admin"
@@ -0,0 +1,39 @@
+"""
+Per-process cache of the active achievement catalog
+
+The catalog is tagged with the version of the 'achievements' cache namespace,
+bumped on every Achievement save or delete (see achievements.signals), so each
+worker reloads it after a change made by any process.
+"""
+
+from django.db import transaction
+
+from motomundo.cache import VersionedProcessCache, bump_version
+from .models import Achievement
+
+ACHIEVEMENTS_NAMESPACE = 'achievements'
+
+
+def load_active_achievements():
+    return list(Achievement.objects.filter(is_active=True))
+
+
+_catalog = VersionedProcessCache(ACHIEVEMENTS_NAMESPACE, load_active_achievements)
+
+
+def get_active_achievements():
+    """Return the active achievements, loaded at most once per catalog version"""
+    return _catalog.get()
+
+
+def invalidate_catalog():
+    """
+    Drop the cached catalog in every process, now and again once the current
+    transaction commits
+    """
+    def invalidate():
+        _catalog.clear()
+        bump_version(ACHIEVEMENTS_NAMESPACE)
+
+    invalidate()
+    transaction.on_commit(invalidate)
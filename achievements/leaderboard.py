@@ -0,0 +1,100 @@
+"""
+Points leaderboard
+
+UserScore keeps each user's total points, achievement count and last earning
+date. Creating a UserAchievement adds to the score with a single upsert;
+deleting one (or changing an achievement's points) recomputes the affected
+users' scores. Rankings are SQL window functions over UserScore: globally they
+walk the (total_points, achievement_count) index and stop after `limit` rows,
+and per club or chapter they only rank that club's or chapter's members.
+"""
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import Rank
+
+from clubs.models import Member
+from .models import Achievement, UserAchievement, UserScore
+
+RANK_ORDER = [F('total_points').desc(), F('achievement_count').desc()]
+
+
+def record_earned(user_achievement):
+    """Add a newly created UserAchievement to its user's score"""
+    table = UserScore._meta.db_table
+    sql = f"""
+        INSERT INTO {table} (user_id, total_points, achievement_count, last_earned_at)
+        SELECT %s, points, 1, %s FROM {Achievement._meta.db_table} WHERE id = %s
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_points = {table}.total_points + EXCLUDED.total_points,
+            achievement_count = {table}.achievement_count + 1,
+            last_earned_at = GREATEST({table}.last_earned_at, EXCLUDED.last_earned_at)
+    """
+    with transaction.get_connection().cursor() as cursor:
+        cursor.execute(sql, [user_achievement.user_id, user_achievement.earned_at, user_achievement.achievement_id])
+
+
+def refresh_scores(user_ids=None):
+    """
+    Recompute scores from UserAchievement, for the given users or everyone
+    (e.g. after bulk inserts, which send no signals)
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+    table = UserScore._meta.db_table
+    earned = UserAchievement._meta.db_table
+    where = 'WHERE ua.user_id = ANY(%s)' if user_ids is not None else ''
+    params = [user_ids] if user_ids is not None else []
+    with transaction.get_connection().cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {table} (user_id, total_points, achievement_count, last_earned_at)
+            SELECT ua.user_id, SUM(a.points), COUNT(*), MAX(ua.earned_at)
+            FROM {earned} ua JOIN {Achievement._meta.db_table} a ON a.id = ua.achievement_id
+            {where}
+            GROUP BY ua.user_id
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_points = EXCLUDED.total_points,
+                achievement_count = EXCLUDED.achievement_count,
+                last_earned_at = EXCLUDED.last_earned_at
+        """, params)
+        # Users left without achievements
+        cursor.execute(f"""
+            DELETE FROM {table} s
+            WHERE {'s.user_id = ANY(%s) AND ' if user_ids is not None else ''}
+            NOT EXISTS (SELECT 1 FROM {earned} ua WHERE ua.user_id = s.user_id)
+        """, params)
+
+
+def scope_filter(club_id=None, chapter_id=None):
+    """Restrict scores to the members of a club or chapter"""
+    if chapter_id is not None:
+        return Q(user__in=Member.objects.filter(chapter_id=chapter_id).values('user_id'))
+    if club_id is not None:
+        return Q(user__in=Member.objects.filter(chapter__club_id=club_id).values('user_id'))
+    return Q()
+
+
+def ranked_scores(club_id=None, chapter_id=None):
+    """Scores ranked by points (ties broken by achievement count), best first"""
+    return UserScore.objects.filter(
+        scope_filter(club_id, chapter_id), achievement_count__gt=0,
+    ).select_related('user').annotate(
+        rank=Window(Rank(), order_by=RANK_ORDER),
+    ).order_by(*RANK_ORDER, 'user_id')
+
+
+def get_top_scores(limit=10, club_id=None, chapter_id=None):
+    return list(ranked_scores(club_id, chapter_id)[:limit])
+
+
+def get_rank(score, club_id=None, chapter_id=None):
+    """A score's rank, counting the scores ahead of it on the ranking index"""
+    ahead = UserScore.objects.filter(
+        Q(total_points__gt=score.total_points)
+        | Q(total_points=score.total_points, achievement_count__gt=score.achievement_count),
+        scope_filter(club_id, chapter_id),
+        achievement_count__gt=0,
+    )
+    return ahead.count() + 1
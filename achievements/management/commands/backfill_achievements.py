@@ -0,0 +1,140 @@
+"""
+Management command to award achievements to every qualifying user at once,
+e.g. after adding an achievement or fixing a rule
+
+Each rule's set-based form (Rule.users) runs as one query per chunk of user
+ids, returning the qualifying users that don't have the achievement yet, and
+the missing UserAchievement rows are bulk created. Chunks can run in parallel
+worker processes. bulk_create sends no signals, so user scores and the
+achievement statistics are recomputed once at the end.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Exists, Max, Min, OuterRef
+
+from achievements.leaderboard import refresh_scores
+from achievements.models import Achievement, UserAchievement
+from achievements.rules import RULES
+from achievements.stats import clear_recent_feed, refresh_earned_counts
+
+
+def missing_users(code, achievement_id, start, stop):
+    """Users in [start, stop) who qualify for the achievement but don't have it"""
+    return User.objects.filter(
+        pk__in=RULES[code].users(), pk__gte=start, pk__lt=stop,
+    ).exclude(
+        Exists(UserAchievement.objects.filter(user_id=OuterRef('pk'), achievement_id=achievement_id))
+    ).order_by('pk')
+
+
+def backfill_chunk(code, achievement_id, start, stop, dry_run, batch_size):
+    """Award one achievement to the users of one id range, returns the count"""
+    missing = missing_users(code, achievement_id, start, stop)
+    if dry_run:
+        return code, missing.count()
+
+    with transaction.atomic():
+        user_ids = list(missing.values_list('pk', flat=True))
+        UserAchievement.objects.bulk_create(
+            [
+                UserAchievement(user_id=user_id, achievement_id=achievement_id, progress_data={'trigger': 'backfill'})
+                for user_id in user_ids
+            ],
+            batch_size=batch_size,
+        )
+    return code, len(user_ids)
+
+
+class Command(BaseCommand):
+    help = 'Award achievements to all qualifying users with one query per rule and user id chunk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--codes',
+            nargs='+',
+            help='Achievement codes to backfill (default: every active achievement with a rule)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the achievements that would be awarded',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='User id range handled per query (default: 10000)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert (default: 1000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Parallel worker processes (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        achievements = Achievement.objects.filter(is_active=True)
+        if options['codes']:
+            unknown = set(options['codes']) - set(achievements.filter(code__in=options['codes']).values_list('code', flat=True))
+            if unknown:
+                raise CommandError(f"Unknown or inactive achievement codes: {', '.join(sorted(unknown))}")
+            achievements = achievements.filter(code__in=options['codes'])
+
+        targets = []
+        for code, achievement_id in achievements.values_list('code', 'id'):
+            rule = RULES.get(code)
+            if rule is None or rule.users is None:
+                self.stdout.write(self.style.WARNING(f'Skipping {code}: no set-based rule'))
+                continue
+            targets.append((code, achievement_id))
+
+        bounds = User.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if not targets or bounds['first'] is None:
+            self.stdout.write(self.style.SUCCESS('Nothing to backfill'))
+            return
+
+        chunk_size = max(options['chunk_size'], 1)
+        tasks = [
+            (code, achievement_id, start, start + chunk_size, options['dry_run'], options['batch_size'])
+            for code, achievement_id in targets
+            for start in range(bounds['first'], bounds['last'] + 1, chunk_size)
+        ]
+
+        totals = {code: 0 for code, _achievement_id in targets}
+        for code, count in self.run_tasks(tasks, options['workers']):
+            totals[code] += count
+
+        if not options['dry_run'] and any(totals.values()):
+            with transaction.atomic():
+                refresh_scores()
+                refresh_earned_counts()
+                clear_recent_feed()
+
+        verb = 'would be awarded' if options['dry_run'] else 'awarded'
+        for code, count in totals.items():
+            self.stdout.write(f'{code}: {count} {verb}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(totals.values())} achievement(s) {verb}'))
+
+    def run_tasks(self, tasks, workers):
+        if workers <= 1:
+            return [backfill_chunk(*task) for task in tasks]
+
+        # Children must open their own database connections
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=connections.close_all,
+        ) as executor:
+            return list(executor.map(backfill_chunk, *zip(*tasks)))
@@ -0,0 +1,45 @@
+"""
+Management command comparing the queries one achievement check costs per
+trigger event, with the trigger index (only the rules the event can affect)
+and without it (every rule). Works on throwaway data in a transaction that is
+rolled back.
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from achievements.catalog import get_active_achievements
+from achievements.models import Achievement
+from achievements.rules import RULES, RULES_BY_TRIGGER, codes_for_triggers
+from achievements.services import AchievementService
+
+
+class Command(BaseCommand):
+    help = 'Show queries per achievement check for each trigger, with and without the trigger index'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not Achievement.objects.filter(is_active=True).exists():
+                call_command('setup_achievements', stdout=StringIO())
+            user = User.objects.create_user(username='achievement-benchmark')
+            get_active_achievements()
+
+            full = self.count_queries(user, 'manual_check')
+            self.stdout.write(f"{'trigger':<26}{'rules':>7}{'queries':>9}{'without index':>15}")
+            for trigger in RULES_BY_TRIGGER:
+                queries = self.count_queries(user, trigger)
+                codes = codes_for_triggers([trigger])
+                self.stdout.write(f'{trigger:<26}{len(codes):>7}{queries:>9}{full:>15}')
+            self.stdout.write(f"{'(no trigger)':<26}{len(RULES):>7}{full:>9}{full:>15}")
+
+            transaction.set_rollback(True)
+
+    def count_queries(self, user, trigger):
+        with CaptureQueriesContext(connection) as queries:
+            AchievementService.check_user_achievements(user, {'trigger': trigger})
+        return len(queries)
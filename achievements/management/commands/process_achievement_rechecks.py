@@ -0,0 +1,128 @@
+"""
+Management command to evaluate queued achievement rechecks (see
+achievements.queue). Run it continuously with --loop as a worker process, or
+periodically from cron. Several workers can run side by side.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from achievements.models import AchievementRecheck
+from achievements.queue import MAX_ATTEMPTS
+from achievements.services import AchievementService
+from clubs.models import Club, Member
+
+logger = logging.getLogger(__name__)
+
+
+def build_contexts(batch):
+    """
+    Trigger contexts for AchievementService by recheck id, with ids resolved
+    to instances (one query per model for the whole batch)
+    """
+    members = Member.objects.select_related('chapter__club').in_bulk(
+        {recheck.context['member_id'] for recheck in batch if recheck.context.get('member_id')}
+    )
+    clubs = Club.objects.in_bulk({
+        recheck.context['club_id'] for recheck in batch
+        if recheck.context.get('club_id') and recheck.context.get('member_id') not in members
+    })
+
+    contexts = {}
+    for recheck in batch:
+        context = {'trigger': ', '.join(recheck.triggers), 'triggers': recheck.triggers}
+        member = members.get(recheck.context.get('member_id'))
+        club = clubs.get(recheck.context.get('club_id'))
+        if member is not None:
+            context['member'] = member
+        elif club is not None:
+            context['club'] = club
+        contexts[recheck.pk] = context
+    return contexts
+
+
+class Command(BaseCommand):
+    help = 'Evaluate achievements for users queued by signal handlers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Users to evaluate per transaction (default: 50)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new rechecks instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls with --loop (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} achievement recheck(s)'))
+
+    def process_batch(self, batch_size):
+        """
+        Evaluate one batch of queued users in a single pass that shares its
+        queries (see AchievementService.check_users_achievements). If the
+        pass fails, the users are evaluated one by one so only the failing
+        ones are retried later. Rows stay locked until the batch commits, so
+        concurrent workers skip them and new requests for the same users wait
+        and are queued again afterwards.
+        """
+        with transaction.atomic():
+            batch = list(
+                AchievementRecheck.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('user')
+                .filter(attempts__lt=MAX_ATTEMPTS)
+                .order_by('requested_at')[:batch_size]
+            )
+            if not batch:
+                return 0
+            contexts = build_contexts(batch)
+            try:
+                with transaction.atomic():
+                    AchievementService.check_users_achievements(
+                        [(recheck.user, contexts[recheck.pk]) for recheck in batch]
+                    )
+                done = [recheck.pk for recheck in batch]
+            except Exception:
+                logger.exception("Batched achievement recheck failed, checking users one by one")
+                done = self.process_individually(batch, contexts)
+            AchievementRecheck.objects.filter(pk__in=done).delete()
+        return len(batch)
+
+    def process_individually(self, batch, contexts):
+        """Evaluate each user in its own savepoint, returns the processed recheck ids"""
+        done = []
+        for recheck in batch:
+            try:
+                with transaction.atomic():
+                    AchievementService.check_user_achievements(recheck.user, contexts[recheck.pk])
+            except Exception as e:
+                logger.exception(f"Achievement recheck failed for user {recheck.user_id}")
+                AchievementRecheck.objects.filter(pk=recheck.pk).update(
+                    attempts=F('attempts') + 1, last_error=str(e)
+                )
+            else:
+                done.append(recheck.pk)
+        return done
@@ -0,0 +1,23 @@
+"""
+Management command to recompute the achievement statistics (user scores,
+earned counts and the recent feed) from the earned achievements, e.g. after
+rows were changed with raw SQL or bulk operations that send no signals
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from achievements.leaderboard import refresh_scores
+from achievements.models import UserScore
+from achievements.stats import clear_recent_feed, refresh_earned_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the points leaderboard and achievement statistics from UserAchievement'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            refresh_scores()
+            refresh_earned_counts()
+            clear_recent_feed()
+        self.stdout.write(self.style.SUCCESS(f'{UserScore.objects.count()} user score(s) refreshed'))
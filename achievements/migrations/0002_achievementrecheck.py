@@ -0,0 +1,33 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AchievementRecheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('triggers', models.JSONField(blank=True, default=list, help_text='Events that requested this recheck')),
+                ('context', models.JSONField(blank=True, default=dict, help_text='Latest trigger context (member_id, club_id, ...)')),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Failed processing attempts')),
+                ('last_error', models.TextField(blank=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='achievement_recheck', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Achievement Recheck',
+                'verbose_name_plural': 'Achievement Rechecks',
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(fields=['attempts', 'requested_at'], name='achievement_attempt_2c2819_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def populate_scores(apps, schema_editor):
+    UserAchievement = apps.get_model('achievements', 'UserAchievement')
+    UserScore = apps.get_model('achievements', 'UserScore')
+    totals = UserAchievement.objects.order_by().values('user_id').annotate(
+        total_points=Sum('achievement__points'),
+        achievement_count=Count('id'),
+        last_earned_at=Max('earned_at'),
+    )
+    UserScore.objects.bulk_create([UserScore(**row) for row in totals], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0002_achievementrecheck'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserScore',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='achievement_score', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_points', models.IntegerField(default=0)),
+                ('achievement_count', models.IntegerField(default=0)),
+                ('last_earned_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'User Score',
+                'verbose_name_plural': 'User Scores',
+                'ordering': ['-total_points', '-achievement_count', 'user'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='userachievement',
+            index=models.Index(fields=['achievement', 'earned_at'], name='achievement_achieve_06fdd4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userscore',
+            index=models.Index(fields=['-total_points', '-achievement_count', 'user'], name='achievement_total_p_fa9544_idx'),
+        ),
+        migrations.RunPython(populate_scores, migrations.RunPython.noop),
+    ]
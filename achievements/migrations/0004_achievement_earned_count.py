@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_earned_counts(apps, schema_editor):
+    Achievement = apps.get_model('achievements', 'Achievement')
+    UserAchievement = apps.get_model('achievements', 'UserAchievement')
+    counts = UserAchievement.objects.filter(
+        achievement_id=OuterRef('pk')
+    ).order_by().values('achievement_id').annotate(total=Count('id')).values('total')
+    Achievement.objects.update(earned_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0003_userscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='earned_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Times this achievement was earned, maintained automatically'),
+        ),
+        migrations.RunPython(populate_earned_counts, migrations.RunPython.noop),
+    ]
@@ -5,11 +5,13 @@ Handles badges, achievements, and user recognition system
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from clubs.models import Club, Chapter, Member
+from motomundo.tracking import TrackedFieldsMixin
 
 
-class Achievement(models.Model):
+class Achievement(TrackedFieldsMixin, models.Model):
     """
     Defines available achievements/badges in the system
     """
@@ -86,10 +88,20 @@ class Achievement(models.Model):
         help_text="Requires manual admin verification"
     )
     
+    # Statistics
+    earned_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Times this achievement was earned, maintained automatically"
+    )
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Holders' scores are recomputed when points change (see achievements.signals)
+    tracked_fields = ('points',)
+    
     class Meta:
         ordering = ['category', 'difficulty', 'points']
         verbose_name = 'Achievement'
@@ -97,6 +109,16 @@ class Achievement(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
+    
+    def save(self, *args, **kwargs):
+        # earned_count is only changed with F() updates (see
+        # achievements.stats), never overwrite it with a stale value
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'earned_count'
+            ]
+        super().save(*args, **kwargs)
 
 
 class UserAchievement(models.Model):
@@ -162,6 +184,10 @@ class UserAchievement(models.Model):
         ordering = ['-earned_at']
         verbose_name = 'User Achievement'
         verbose_name_plural = 'User Achievements'
+        indexes = [
+            # Per-achievement leaderboard, in earning order
+            models.Index(fields=['achievement', 'earned_at']),
+        ]
         
         # Note: Unique constraint for non-repeatable achievements 
         # will be enforced in the service layer to avoid join constraints
@@ -235,3 +261,70 @@ class AchievementProgress(models.Model):
             return False
         current = self.current_value or 0
         return current >= self.target_value
+
+
+class AchievementRecheck(models.Model):
+    """
+    Pending request to re-evaluate a user's achievements, one row per user.
+    Queued after commit by achievements.queue and processed in batches by the
+    process_achievement_rechecks command.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='achievement_recheck'
+    )
+    triggers = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Events that requested this recheck"
+    )
+    context = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Latest trigger context (member_id, club_id, ...)"
+    )
+    requested_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Failed processing attempts"
+    )
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['requested_at']
+        indexes = [
+            models.Index(fields=['attempts', 'requested_at']),
+        ]
+        verbose_name = 'Achievement Recheck'
+        verbose_name_plural = 'Achievement Rechecks'
+    
+    def __str__(self):
+        return f"Recheck {self.user_id} ({', '.join(self.triggers)})"
+
+
+class UserScore(models.Model):
+    """
+    Denormalized achievement totals per user, kept up to date as
+    UserAchievement rows are created and deleted (see achievements.leaderboard)
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='achievement_score'
+    )
+    total_points = models.IntegerField(default=0)
+    achievement_count = models.IntegerField(default=0)
+    last_earned_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-total_points', '-achievement_count', 'user']
+        indexes = [
+            models.Index(fields=['-total_points', '-achievement_count', 'user']),
+        ]
+        verbose_name = 'User Score'
+        verbose_name_plural = 'User Scores'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.total_points} points"
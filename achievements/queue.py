@@ -0,0 +1,127 @@
+"""
+Deferred achievement rechecks
+
+Signal handlers call queue_recheck() instead of evaluating achievements in the
+request. Requests made during a transaction are collected per user and written
+once it commits, as a single upsert into AchievementRecheck (one row per user,
+so a user queued many times is still checked once). The
+process_achievement_rechecks command evaluates queued users in batches.
+
+Requests are buffered per thread and per savepoint, and each buffer registers
+its flush once, in the block it collects for. The thread only holds weak
+references to its buffers, so the flush callback Django keeps is what keeps a
+buffer alive: rolling back a savepoint or the whole transaction drops the
+callback, and the buffer and its requests go with it.
+"""
+
+import json
+import logging
+import threading
+import weakref
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AchievementRecheck
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+_local = threading.local()
+
+
+def _buffers():
+    """This thread's unflushed buffers, by (database alias, savepoint ids)"""
+    if not hasattr(_local, 'buffers'):
+        _local.buffers = weakref.WeakValueDictionary()
+    return _local.buffers
+
+
+class PendingRechecks:
+    """Rechecks requested during one transaction (or savepoint), merged per user"""
+
+    def __init__(self, key=None):
+        self.key = key
+        self.users = {}
+
+    def add(self, user_id, trigger, context):
+        triggers, merged_context = self.users.setdefault(user_id, ([], {}))
+        if trigger not in triggers:
+            triggers.append(trigger)
+        merged_context.update(context)
+
+    def flush(self):
+        buffers = _buffers()
+        if buffers.get(self.key) is self:
+            del buffers[self.key]
+        users, self.users = self.users, {}
+        if not users:
+            return
+        table = AchievementRecheck._meta.db_table
+        now = timezone.now()
+        rows = []
+        params = []
+        for user_id, (triggers, context) in users.items():
+            rows.append("(%s, %s::jsonb, %s::jsonb, %s, 0, '')")
+            params.extend([user_id, json.dumps(triggers), json.dumps(context), now])
+        # Merge into a row another transaction already queued, keeping the
+        # union of triggers so the worker evaluates every affected rule
+        sql = f"""
+            INSERT INTO {table} (user_id, triggers, context, requested_at, attempts, last_error)
+            VALUES {', '.join(rows)}
+            ON CONFLICT (user_id) DO UPDATE SET
+                triggers = (
+                    SELECT coalesce(jsonb_agg(DISTINCT t.value), '[]'::jsonb)
+                    FROM jsonb_array_elements({table}.triggers || EXCLUDED.triggers) AS t
+                ),
+                context = {table}.context || EXCLUDED.context,
+                requested_at = EXCLUDED.requested_at,
+                attempts = 0,
+                last_error = ''
+        """
+        with transaction.get_connection().cursor() as cursor:
+            cursor.execute(sql, params)
+        logger.debug(f"Queued achievement rechecks for {len(users)} user(s)")
+
+
+def _current_pending(connection):
+    """
+    The buffer collecting for the innermost atomic block, and whether it was
+    just created (and its flush still has to be registered)
+    """
+    key = (connection.alias, tuple(connection.savepoint_ids))
+    buffers = _buffers()
+    pending = buffers.get(key)
+    if pending is not None:
+        return pending, False
+    pending = buffers[key] = PendingRechecks(key)
+    return pending, True
+
+
+def queue_recheck(user_id, trigger, context=None):
+    """
+    Ask for the user's achievements to be re-evaluated once the current
+    transaction commits (immediately outside a transaction). `context` must be
+    JSON serializable, e.g. {'member_id': 1}.
+    """
+    queue_rechecks([user_id], trigger, context)
+
+
+def queue_rechecks(user_ids, trigger, context=None):
+    """queue_recheck() for several users, written with the same upsert"""
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if not user_ids:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        pending = PendingRechecks()
+        for user_id in user_ids:
+            pending.add(user_id, trigger, context or {})
+        pending.flush()
+        return
+    pending, created = _current_pending(connection)
+    for user_id in user_ids:
+        pending.add(user_id, trigger, context or {})
+    if created:
+        transaction.on_commit(pending.flush, robust=True)
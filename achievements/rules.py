@@ -0,0 +1,339 @@
+"""
+Achievement rules
+
+A rule decides whether a user qualifies for the achievement with the same
+code, looking only at a UserFacts snapshot. Rules can also give the same
+condition as a single query over all users (`users`), used by the
+backfill_achievements command. Each rule declares the trigger
+events that can change its outcome, so an event only evaluates the rules in
+RULES_BY_TRIGGER[trigger], and facts are loaded lazily with one query each
+(shared by all the users of a batch, see UserFacts.load_many), so only the
+facts those rules read are fetched. Checks without a known trigger
+(e.g. a manual check) evaluate every rule. Achievements without a registered
+rule are never awarded automatically.
+
+Rules whose outcome changes with time alone (veteran_rider_badge, after a
+year of membership) have no event of their own, so they are evaluated on
+every trigger. A user who raises no event once they qualify only gets the
+award from backfill_achievements, e.g.
+`backfill_achievements --codes veteran_rider_badge` run daily from cron.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, F, Func, IntegerField, OuterRef, Q, QuerySet, Subquery
+from django.utils import timezone
+
+from clubs.models import Chapter, ChapterAdmin, ClubAdmin, Member
+
+LEADERSHIP_ROLES = ('president', 'vice_president', 'secretary', 'treasurer')
+
+# Events raised by AchievementTrigger and achievements.signals
+MEMBER_TRIGGERS = ('member_created', 'member_role_change')
+
+
+@dataclass(frozen=True)
+class Membership:
+    role: str
+    club_id: int
+    created_at: datetime
+
+
+FACT_LOADERS: Dict[str, Callable[[List[int]], Dict[int, object]]] = {}
+
+
+def fact(name: str):
+    """
+    Register the loader of a UserFacts attribute. Loaders take a list of user
+    ids and return the fact for every one of them, with one query.
+    """
+    def register(func):
+        FACT_LOADERS[name] = func
+        return func
+    return register
+
+
+@fact('memberships')
+def load_memberships(user_ids):
+    memberships = {user_id: [] for user_id in user_ids}
+    rows = Member.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'role', 'chapter__club_id', 'created_at'
+    )
+    for user_id, role, club_id, created_at in rows:
+        memberships[user_id].append(Membership(role, club_id, created_at))
+    return memberships
+
+
+@fact('admin_club_ids')
+def load_admin_club_ids(user_ids):
+    club_ids = {user_id: set() for user_id in user_ids}
+    for user_id, club_id in ClubAdmin.objects.filter(user_id__in=user_ids).values_list('user_id', 'club_id'):
+        club_ids[user_id].add(club_id)
+    return {user_id: frozenset(ids) for user_id, ids in club_ids.items()}
+
+
+def managed_chapter_count():
+    """
+    Subquery counting the chapters the outer User manages: every chapter of
+    the clubs they administer plus chapters they administer directly
+    """
+    managed = Chapter.objects.filter(
+        Q(club_id__in=ClubAdmin.objects.filter(user_id=OuterRef(OuterRef('pk'))).values('club_id'))
+        | Q(pk__in=ChapterAdmin.objects.filter(user_id=OuterRef(OuterRef('pk'))).values('chapter_id'))
+    ).order_by().annotate(total=Func(F('pk'), function='COUNT')).values('total')
+    return Subquery(managed, output_field=IntegerField())
+
+
+@fact('admin_chapter_count')
+def load_admin_chapter_count(user_ids):
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        User.objects.filter(pk__in=user_ids).annotate(
+            managed_chapters=managed_chapter_count()
+        ).values_list('pk', 'managed_chapters')
+    )
+    return counts
+
+
+class UserFacts:
+    """
+    What the achievement rules know about a user. Facts not passed to the
+    constructor are loaded the first time a rule reads them. Facts created
+    together by load_many() are loaded for all of those users at once.
+    """
+
+    def __init__(self, user_id: int, **facts):
+        unknown = set(facts) - set(FACT_LOADERS)
+        if unknown:
+            raise TypeError(f"Unknown facts: {', '.join(sorted(unknown))}")
+        self.user_id = user_id
+        self._facts = facts
+        self._batch = {user_id: self}
+
+    @classmethod
+    def load(cls, user: User) -> 'UserFacts':
+        """Load every fact for a user up front, one query each"""
+        facts = cls(user.pk)
+        for name in FACT_LOADERS:
+            facts.get(name)
+        return facts
+
+    @classmethod
+    def load_many(cls, user_ids: Iterable[int]) -> Dict[int, 'UserFacts']:
+        """
+        Facts for several users sharing their queries: the first read of a
+        fact by any of them loads it for all of them with one query
+        """
+        batch = {user_id: cls(user_id) for user_id in user_ids}
+        for facts in batch.values():
+            facts._batch = batch
+        return batch
+
+    def get(self, name: str):
+        if name not in self._facts:
+            values = FACT_LOADERS[name](list(self._batch))
+            for user_id, facts in self._batch.items():
+                facts._facts.setdefault(name, values[user_id])
+        return self._facts[name]
+
+    @property
+    def memberships(self):
+        return self.get('memberships')
+
+    @property
+    def admin_club_ids(self) -> FrozenSet[int]:
+        return self.get('admin_club_ids')
+
+    @property
+    def admin_chapter_count(self) -> int:
+        return self.get('admin_chapter_count')
+
+    @property
+    def roles(self):
+        return {membership.role for membership in self.memberships}
+
+    @property
+    def club_ids(self):
+        return {membership.club_id for membership in self.memberships}
+
+    @property
+    def leadership_club_ids(self):
+        return {
+            membership.club_id for membership in self.memberships
+            if membership.role in LEADERSHIP_ROLES
+        }
+
+    def member_since(self, days: int) -> bool:
+        """Whether any membership is at least `days` old"""
+        cutoff = timezone.now() - timedelta(days=days)
+        return any(membership.created_at <= cutoff for membership in self.memberships)
+
+
+@dataclass(frozen=True)
+class Rule:
+    code: str
+    check: Callable[[UserFacts], bool]
+    # None for rules evaluated on every trigger
+    triggers: Optional[Tuple[str, ...]]
+    # Returns a queryset of the ids of every qualifying user
+    users: Optional[Callable[[], QuerySet]] = None
+
+
+RULES: Dict[str, Rule] = {}
+RULES_BY_TRIGGER: Dict[str, FrozenSet[str]] = {}
+EVERY_TRIGGER_RULES: Set[str] = set()
+
+
+def rule(code: str, triggers: Optional[Iterable[str]], users: Optional[Callable[[], QuerySet]] = None):
+    """
+    Register a rule for the achievement with this code, evaluated on the
+    given trigger events (and on checks without a known trigger), or on every
+    trigger if `triggers` is None. `users` expresses the rule as a query of
+    qualifying user ids.
+    """
+    def register(func):
+        RULES[code] = Rule(code, func, None if triggers is None else tuple(triggers), users)
+        if triggers is None:
+            EVERY_TRIGGER_RULES.add(code)
+        for trigger in triggers or ():
+            RULES_BY_TRIGGER[trigger] = RULES_BY_TRIGGER.get(trigger, frozenset()) | {code}
+        return func
+    return register
+
+
+def codes_for_triggers(triggers: Iterable[str]) -> Optional[FrozenSet[str]]:
+    """
+    Codes of the rules the given events can affect, or None when every rule
+    must be evaluated (no trigger, or one no rule declares)
+    """
+    triggers = list(triggers)
+    if not triggers or any(trigger not in RULES_BY_TRIGGER for trigger in triggers):
+        return None
+    return frozenset(EVERY_TRIGGER_RULES).union(*(RULES_BY_TRIGGER[trigger] for trigger in triggers))
+
+
+def evaluate(code: str, facts: UserFacts) -> bool:
+    """Whether the facts satisfy the achievement's rule"""
+    registered = RULES.get(code)
+    return bool(registered and registered.check(facts))
+
+
+# Set-based forms of the rules, each a queryset of user ids
+
+def members():
+    # No default ordering, it would leak into DISTINCT / GROUP BY
+    return Member.objects.filter(user__isnull=False).order_by()
+
+
+def role_holders(*roles):
+    return members().filter(role__in=roles).values_list('user_id', flat=True).distinct()
+
+
+def users_in_clubs(count, roles=None):
+    """Users with (a role in) at least `count` different clubs"""
+    queryset = members()
+    if roles:
+        queryset = queryset.filter(role__in=roles)
+    return queryset.values('user_id').annotate(
+        clubs=Count('chapter__club_id', distinct=True)
+    ).filter(clubs__gte=count).values_list('user_id', flat=True)
+
+
+def chapter_managers(count):
+    """Users administering at least `count` chapters, as in load_admin_chapter_count"""
+    return User.objects.filter(
+        Exists(ClubAdmin.objects.filter(user_id=OuterRef('pk')))
+        | Exists(ChapterAdmin.objects.filter(user_id=OuterRef('pk')))
+    ).annotate(
+        managed_chapters=managed_chapter_count()
+    ).filter(managed_chapters__gte=count).values_list('pk', flat=True)
+
+
+# Leadership Achievements
+
+@rule('president_badge', triggers=MEMBER_TRIGGERS, users=lambda: role_holders('president'))
+def president(facts):
+    return 'president' in facts.roles
+
+
+@rule('vice_president_badge', triggers=MEMBER_TRIGGERS, users=lambda: role_holders('vice_president'))
+def vice_president(facts):
+    return 'vice_president' in facts.roles
+
+
+@rule('secretary_badge', triggers=MEMBER_TRIGGERS, users=lambda: role_holders('secretary'))
+def secretary(facts):
+    return 'secretary' in facts.roles
+
+
+@rule('treasurer_badge', triggers=MEMBER_TRIGGERS, users=lambda: role_holders('treasurer'))
+def treasurer(facts):
+    return 'treasurer' in facts.roles
+
+
+@rule(
+    'club_founder_badge',
+    triggers=['club_admin_assigned'],
+    users=lambda: ClubAdmin.objects.order_by().values_list('user_id', flat=True).distinct(),
+)
+def club_founder(facts):
+    return bool(facts.admin_club_ids)
+
+
+@rule(
+    'multi_club_leader_badge',
+    triggers=MEMBER_TRIGGERS,
+    users=lambda: users_in_clubs(2, roles=LEADERSHIP_ROLES),
+)
+def multi_club_leader(facts):
+    # Leadership role in 2+ clubs
+    return len(facts.leadership_club_ids) >= 2
+
+
+# Membership Achievements
+
+@rule(
+    'first_timer_badge',
+    triggers=['member_created'],
+    users=lambda: members().values_list('user_id', flat=True).distinct(),
+)
+def first_timer(facts):
+    return bool(facts.memberships)
+
+
+@rule('multi_club_member_badge', triggers=['member_created'], users=lambda: users_in_clubs(2))
+def multi_club_member(facts):
+    return len(facts.club_ids) >= 2
+
+
+@rule(
+    'veteran_rider_badge',
+    # Crossing the year raises no event
+    triggers=None,
+    users=lambda: members().filter(
+        created_at__lte=timezone.now() - timedelta(days=365)
+    ).values_list('user_id', flat=True).distinct(),
+)
+def veteran_rider(facts):
+    # Member for 1+ years
+    return facts.member_since(days=365)
+
+
+@rule('social_butterfly_badge', triggers=['member_created'], users=lambda: users_in_clubs(3))
+def social_butterfly(facts):
+    return len(facts.club_ids) >= 3
+
+
+# Activity Achievements
+
+@rule(
+    'chapter_creator_badge',
+    triggers=['club_admin_assigned', 'chapter_admin_assigned', 'chapter_created'],
+    users=lambda: chapter_managers(2),
+)
+def chapter_creator(facts):
+    # Admin of 2+ chapters, as club admin or chapter admin
+    return facts.admin_chapter_count >= 2
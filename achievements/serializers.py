@@ -4,7 +4,7 @@ Serializers for Achievement System API
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Achievement, UserAchievement, AchievementProgress
+from .models import Achievement, UserAchievement, AchievementProgress, UserScore
 
 
 class AchievementSerializer(serializers.ModelSerializer):
@@ -22,6 +22,24 @@ class AchievementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class AchievementStatsSerializer(AchievementSerializer):
+    """
+    Achievement with how often it was earned. Pass the number of users with
+    achievements as context['players'] to include its rarity.
+    """
+    rarity = serializers.SerializerMethodField()
+    
+    class Meta(AchievementSerializer.Meta):
+        fields = AchievementSerializer.Meta.fields + ['earned_count', 'rarity']
+    
+    def get_rarity(self, obj):
+        """Percentage of users with achievements who earned it"""
+        players = self.context.get('players')
+        if not players:
+            return None
+        return round(min(obj.earned_count / players, 1) * 100, 1)
+
+
 class UserAchievementSerializer(serializers.ModelSerializer):
     """
     Serializer for UserAchievement model
@@ -108,3 +126,24 @@ class LeaderboardEntrySerializer(serializers.Serializer):
             'username': user.username,
             'display_name': user.get_full_name() or user.username,
         }
+
+
+class UserScoreSerializer(serializers.ModelSerializer):
+    """
+    Serializer for points leaderboard entries
+    """
+    user = serializers.SerializerMethodField()
+    rank = serializers.IntegerField(read_only=True, required=False)
+    
+    class Meta:
+        model = UserScore
+        fields = ['rank', 'user', 'total_points', 'achievement_count', 'last_earned_at']
+    
+    def get_user(self, obj):
+        """Get user display information"""
+        user = obj.user
+        return {
+            'id': user.id,
+            'username': user.username,
+            'display_name': user.get_full_name() or user.username,
+        }
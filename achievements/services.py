@@ -1,24 +1,17 @@
 """
-Achievement Service - Core logic for earnin        for achievement in available_achievements:
-            print(f"DEBUG - Checking achievement: {achievement.code} for user {user.username}")
-            if AchievementService.check_achievement_condition(user, achievement, trigger_context):
-                awarded = AchievementService.award_achievement(user, achievement, trigger_context)
-                if awarded:
-                    newly_awarded.append(awarded)
-                    logger.info(f"Awarded achievement '{achievement.name}' to user {user.username}")
-            else:
-                print(f"DEBUG - Achievement {achievement.code} condition not met for user {user.username}")managing achievements
+Achievement Service - Core logic for earning and managing achievements
 """
 
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Tuple
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.utils import timezone
-from django.db.models import Q, Count, Max, Min
+from django.db.models import Exists, OuterRef
 import logging
 
+from .catalog import get_active_achievements, invalidate_catalog
 from .models import Achievement, UserAchievement, AchievementProgress
-from clubs.models import Club, Chapter, Member, ClubAdmin, ChapterAdmin
+from .rules import UserFacts, codes_for_triggers, evaluate
+from clubs.models import Chapter, Member, ClubAdmin
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +26,11 @@ class AchievementService:
         """
         Check and award all applicable achievements for a user
         
+        Only achievements whose rules can be affected by the trigger(s) in
+        trigger_context are evaluated, against facts loaded once and lazily
+        (see achievements.rules). Without a known trigger every unearned
+        achievement is evaluated.
+        
         Args:
             user: User to check achievements for
             trigger_context: Optional context about what triggered this check
@@ -40,30 +38,70 @@ class AchievementService:
         Returns:
             List of newly awarded achievements
         """
-        newly_awarded = []
+        return AchievementService.check_users_achievements([(user, trigger_context)])[user.pk]
+    
+    @staticmethod
+    def check_users_achievements(checks: List[Tuple[User, Optional[Dict]]]) -> Dict[int, List[UserAchievement]]:
+        """
+        Check and award achievements for several users in one pass
         
-        # Get all active achievements the user hasn't earned yet
-        earned_achievement_ids = UserAchievement.objects.filter(
-            user=user
-        ).values_list('achievement_id', flat=True)
+        Earned achievements are fetched for all the users with one query, and
+        each fact the rules read is loaded for all of them with one query
+        (UserFacts.load_many), so the queries don't grow with the number of
+        users, except for the awards themselves.
         
-        available_achievements = Achievement.objects.filter(
-            is_active=True
-        ).exclude(
-            id__in=earned_achievement_ids
-        )
-        
-        for achievement in available_achievements:
-            if AchievementService.check_achievement_condition(user, achievement, trigger_context):
-                awarded = AchievementService.award_achievement(user, achievement, trigger_context)
-                if awarded:
-                    newly_awarded.append(awarded)
-                    logger.info(f"Awarded achievement '{achievement.name}' to user {user.username}")
+        Args:
+            checks: (user, trigger_context) pairs, one per user
+            
+        Returns:
+            Newly awarded achievements by user id
+        """
+        newly_awarded = {user.pk: [] for user, _context in checks}
+        
+        # Get all active achievements the users haven't earned yet
+        earned_achievement_ids = {user_id: set() for user_id in newly_awarded}
+        for user_id, achievement_id in UserAchievement.objects.filter(
+            user_id__in=list(newly_awarded)
+        ).values_list('user_id', 'achievement_id'):
+            earned_achievement_ids[user_id].add(achievement_id)
+        
+        active_achievements = get_active_achievements()
+        facts = UserFacts.load_many(newly_awarded)
+        for user, trigger_context in checks:
+            candidate_codes = codes_for_triggers(AchievementService._triggers(trigger_context))
+            available_achievements = [
+                achievement for achievement in active_achievements
+                if achievement.id not in earned_achievement_ids[user.pk]
+                and (candidate_codes is None or achievement.code in candidate_codes)
+            ]
+            
+            for achievement in available_achievements:
+                if AchievementService.check_achievement_condition(
+                    user, achievement, trigger_context, facts=facts[user.pk]
+                ):
+                    awarded = AchievementService.award_achievement(user, achievement, trigger_context)
+                    if awarded:
+                        newly_awarded[user.pk].append(awarded)
+                        logger.info(f"Awarded achievement '{achievement.name}' to user {user.username}")
         
         return newly_awarded
     
     @staticmethod
-    def check_achievement_condition(user: User, achievement: Achievement, context: Optional[Dict] = None) -> bool:
+    def _triggers(context: Optional[Dict]) -> List[str]:
+        """Trigger events named in a trigger context"""
+        if not context:
+            return []
+        if context.get('triggers'):
+            return list(context['triggers'])
+        return [context['trigger']] if context.get('trigger') else []
+    
+    @staticmethod
+    def check_achievement_condition(
+        user: User,
+        achievement: Achievement,
+        context: Optional[Dict] = None,
+        facts: Optional[UserFacts] = None
+    ) -> bool:
         """
         Check if user meets conditions for a specific achievement
         
@@ -71,93 +109,14 @@ class AchievementService:
             user: User to check
             achievement: Achievement to verify
             context: Additional context
+            facts: Already loaded UserFacts for this user, if any
             
         Returns:
             True if user qualifies for this achievement
         """
-        # Get user's member records and administrative roles
-        user_members = Member.objects.filter(user=user).select_related('chapter', 'chapter__club')
-        user_club_admins = ClubAdmin.objects.filter(user=user).select_related('club')
-        user_chapter_admins = ChapterAdmin.objects.filter(user=user).select_related('chapter', 'chapter__club')
-        
-        # Check based on achievement code
-        return AchievementService._check_achievement_by_code(
-            achievement.code, user, user_members, user_club_admins, user_chapter_admins, context
-        )
-    
-    @staticmethod
-    def _check_achievement_by_code(
-        code: str, 
-        user: User, 
-        user_members, 
-        user_club_admins, 
-        user_chapter_admins, 
-        context: Optional[Dict]
-    ) -> bool:
-        """
-        Check specific achievement conditions based on achievement code
-        """
-        
-        # Leadership Achievements
-        if code == 'president_badge':
-            return user_members.filter(role='president').exists()
-        
-        elif code == 'vice_president_badge':
-            return user_members.filter(role='vice_president').exists()
-        
-        elif code == 'secretary_badge':
-            return user_members.filter(role='secretary').exists()
-        
-        elif code == 'treasurer_badge':
-            return user_members.filter(role='treasurer').exists()
-        
-        elif code == 'club_founder_badge':
-            return user_club_admins.exists()
-        
-        elif code == 'multi_club_leader_badge':
-            # Leadership role in 2+ clubs
-            leadership_roles = ['president', 'vice_president', 'secretary', 'treasurer']
-            leadership_clubs = set()
-            for member in user_members.filter(role__in=leadership_roles):
-                leadership_clubs.add(member.chapter.club_id)
-            return len(leadership_clubs) >= 2
-        
-        # Membership Achievements
-        elif code == 'first_timer_badge':
-            return user_members.exists()
-        
-        elif code == 'multi_club_member_badge':
-            clubs = set(member.chapter.club_id for member in user_members)
-            return len(clubs) >= 2
-        
-        elif code == 'veteran_rider_badge':
-            # Member for 1+ years
-            one_year_ago = timezone.now() - timezone.timedelta(days=365)
-            return user_members.filter(created_at__lte=one_year_ago).exists()
-        
-        elif code == 'social_butterfly_badge':
-            clubs = set(member.chapter.club_id for member in user_members)
-            return len(clubs) >= 3
-        
-        # Activity Achievements
-        elif code == 'chapter_creator_badge':
-            # Check if user created multiple chapters (as club admin or chapter admin)
-            # Count chapters where user is admin
-            admin_chapters = set()
-            
-            # Chapters where user is club admin
-            for club_admin in user_club_admins:
-                admin_chapters.update(club_admin.club.chapters.all())
-            
-            # Chapters where user is chapter admin
-            for chapter_admin in user_chapter_admins:
-                admin_chapters.add(chapter_admin.chapter)
-            
-            return len(admin_chapters) >= 2
-        
-        # Special/Dynamic achievements can be added here
-        
-        return False
+        if facts is None:
+            facts = UserFacts(user.pk)
+        return evaluate(achievement.code, facts)
     
     @staticmethod
     @transaction.atomic
@@ -177,14 +136,16 @@ class AchievementService:
         Returns:
             UserAchievement instance if awarded, None if already exists
         """
-        # Check if user already has this achievement (for non-repeatable)
-        if not achievement.is_repeatable:
-            existing = UserAchievement.objects.filter(
-                user=user, 
-                achievement=achievement
-            ).first()
-            if existing:
-                return None
+        # Check the achievement still exists (the catalog is cached per
+        # process) and whether the user already has it (for non-repeatable)
+        already_earned = Achievement.objects.filter(pk=achievement.pk).annotate(
+            earned=Exists(UserAchievement.objects.filter(user=user, achievement_id=OuterRef('pk')))
+        ).values_list('earned', flat=True).first()
+        if already_earned is None:
+            invalidate_catalog()
+            return None
+        if already_earned and not achievement.is_repeatable:
+            return None
         
         # Determine source context
         source_member = None
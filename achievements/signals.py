@@ -1,15 +1,20 @@
 """
 Django Signals for Achievement System
-Automatically triggers achievement checks when relevant events occur
+Queues achievement rechecks when relevant events occur. They are evaluated
+after commit by the process_achievement_rechecks worker (see
+achievements.queue), not in the request that saved the object.
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
 import logging
 
 from clubs.models import Member, ClubAdmin, ChapterAdmin, Chapter
-from .services import AchievementTrigger
+from .catalog import invalidate_catalog
+from .leaderboard import record_earned, refresh_scores
+from .models import Achievement, UserAchievement
+from .queue import queue_recheck, queue_rechecks
+from .stats import change_earned_count, clear_recent_feed, push_recent
 
 logger = logging.getLogger(__name__)
 
@@ -19,43 +24,15 @@ def member_created_or_updated(sender, instance, created, **kwargs):
     """
     Trigger achievement checks when a member is created or updated
     """
-    if not instance.user:
+    if not instance.user_id:
         return
     
     if created:
         # New member created
-        logger.info(f"New member created: {instance.user.username} in {instance.chapter.club.name}")
-        AchievementTrigger.on_member_created(instance)
-    else:
-        # Member updated - check if role changed
-        try:
-            # Get the original instance from DB to compare
-            old_instance = Member.objects.get(id=instance.id)
-            if hasattr(old_instance, '_role_before_save') and old_instance._role_before_save != instance.role:
-                logger.info(
-                    f"Member role changed: {instance.user.username} "
-                    f"from {old_instance._role_before_save} to {instance.role}"
-                )
-                AchievementTrigger.on_member_role_change(
-                    instance, 
-                    old_role=old_instance._role_before_save
-                )
-        except Member.DoesNotExist:
-            # Handle edge case where instance might not exist yet
-            pass
-
-
-@receiver(pre_save, sender=Member)
-def store_member_role_before_save(sender, instance, **kwargs):
-    """
-    Store the original role before saving to detect changes
-    """
-    if instance.pk:  # Only for existing instances
-        try:
-            original = Member.objects.get(pk=instance.pk)
-            instance._role_before_save = original.role
-        except Member.DoesNotExist:
-            instance._role_before_save = None
+        queue_recheck(instance.user_id, 'member_created', {'member_id': instance.pk})
+    elif instance.field_changed('role'):
+        # Member updated - role changed since it was loaded
+        queue_recheck(instance.user_id, 'member_role_change', {'member_id': instance.pk})
 
 
 @receiver(post_save, sender=ClubAdmin)
@@ -64,8 +41,7 @@ def club_admin_assigned(sender, instance, created, **kwargs):
     Trigger achievement checks when user becomes club admin
     """
     if created:
-        logger.info(f"Club admin assigned: {instance.user.username} for {instance.club.name}")
-        AchievementTrigger.on_club_admin_assigned(instance)
+        queue_recheck(instance.user_id, 'club_admin_assigned', {'club_id': instance.club_id})
 
 
 @receiver(post_save, sender=ChapterAdmin)
@@ -74,16 +50,9 @@ def chapter_admin_assigned(sender, instance, created, **kwargs):
     Trigger achievement checks when user becomes chapter admin
     """
     if created:
-        logger.info(f"Chapter admin assigned: {instance.user.username} for {instance.chapter.name}")
         # Treat chapter admin similar to club admin for achievement purposes
         # Could create specific chapter admin achievements in the future
-        context = {
-            'chapter': instance.chapter,
-            'club': instance.chapter.club,
-            'trigger': 'chapter_admin_assigned'
-        }
-        from .services import AchievementService
-        AchievementService.check_user_achievements(instance.user, context)
+        queue_recheck(instance.user_id, 'chapter_admin_assigned', {'chapter_id': instance.chapter_id})
 
 
 @receiver(post_save, sender=Chapter)
@@ -92,22 +61,59 @@ def chapter_created(sender, instance, created, **kwargs):
     Trigger achievement checks when a new chapter is created
     """
     if created:
-        logger.info(f"Chapter created: {instance.name} in {instance.club.name}")
-        
         # Find who created this chapter (club admin or chapter admin)
-        # For now, we'll check club admins as they typically create chapters
-        club_admins = instance.club.admins.all()
-        for club_admin in club_admins:
-            AchievementTrigger.on_chapter_created(instance, club_admin.user)
+        # For now, we'll check club admins as they typically create chapters.
+        # They are queued together and evaluated in one batch by the worker.
+        queue_rechecks(
+            ClubAdmin.objects.filter(club_id=instance.club_id).values_list('user_id', flat=True),
+            'chapter_created',
+            {'club_id': instance.club_id},
+        )
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def achievement_catalog_changed(sender, **kwargs):
+    """
+    Reload the per-process achievement catalog after an achievement changes
+    """
+    invalidate_catalog()
+    clear_recent_feed()
+
+
+@receiver(post_save, sender=Achievement)
+def achievement_points_changed(sender, instance, created, **kwargs):
+    """
+    Recompute the scores of every holder when an achievement's points change
+    """
+    if not created and instance.field_changed('points'):
+        refresh_scores(
+            UserAchievement.objects.filter(achievement=instance).values_list('user_id', flat=True).distinct()
+        )
+
+
+@receiver(post_delete, sender=UserAchievement)
+def achievement_revoked(sender, instance, **kwargs):
+    """
+    Recompute the user's score and update the statistics when an earned
+    achievement is removed
+    """
+    refresh_scores([instance.user_id])
+    change_earned_count(instance.achievement_id, -1)
+    clear_recent_feed()
 
 
 # Optional: Achievement verification signals
-@receiver(post_save, sender='achievements.UserAchievement')
+@receiver(post_save, sender=UserAchievement)
 def achievement_earned(sender, instance, created, **kwargs):
     """
-    Log when achievements are earned (could trigger notifications, etc.)
+    Update the user's score and the statistics, and log when achievements
+    are earned (could trigger notifications, etc.)
     """
     if created:
+        record_earned(instance)
+        change_earned_count(instance.achievement_id, 1)
+        push_recent(instance)
         logger.info(
             f"🏆 Achievement earned: {instance.user.username} earned "
             f"'{instance.achievement.name}' (+{instance.achievement.points} points)"
@@ -118,4 +124,3 @@ def achievement_earned(sender, instance, created, **kwargs):
         # - Email notifications
         # - Social sharing hooks
         # - Statistics updates
-        # - Leaderboard cache updates
@@ -0,0 +1,93 @@
+"""
+Global achievement statistics
+
+Nothing here aggregates UserAchievement when serving a request:
+- Achievement.earned_count is incremented and decremented with F() updates
+  as UserAchievement rows are created and deleted.
+- The number of users with achievements is the number of UserScore rows (see
+  achievements.leaderboard).
+- Rarity is the share of those users holding an achievement
+  (AchievementStatsSerializer).
+- The recent achievements feed is a capped list in the cache. Awards are
+  prepended once they commit. The list is dropped when an earned achievement
+  is removed or an achievement changes, and is rebuilt on the next read.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from motomundo.cache import cache_delete, cache_get, cache_set
+from .models import Achievement, UserAchievement, UserScore
+from .serializers import AchievementStatsSerializer, UserAchievementSerializer
+
+RECENT_FEED_KEY = 'achievements:recent-feed'
+RECENT_FEED_SIZE = 10
+POPULAR_COUNT = 5
+
+
+def change_earned_count(achievement_id, delta):
+    Achievement.objects.filter(pk=achievement_id).update(earned_count=F('earned_count') + delta)
+
+
+def refresh_earned_counts():
+    """Recompute every earned_count, e.g. after bulk inserts"""
+    counts = UserAchievement.objects.filter(
+        achievement_id=OuterRef('pk')
+    ).order_by().values('achievement_id').annotate(total=Count('id')).values('total')
+    Achievement.objects.update(earned_count=Coalesce(Subquery(counts), 0))
+
+
+def get_recent_feed():
+    """The most recent awards, serialized, newest first"""
+    feed = cache_get(RECENT_FEED_KEY)
+    if feed is None:
+        recent = UserAchievement.objects.select_related(
+            'achievement', 'user', 'source_club'
+        ).order_by('-earned_at')[:RECENT_FEED_SIZE]
+        feed = UserAchievementSerializer(recent, many=True).data
+        cache_set(RECENT_FEED_KEY, feed, None)
+    return feed
+
+
+def push_recent(user_achievement):
+    """Prepend an award to the feed once the current transaction commits"""
+    entry = UserAchievementSerializer(user_achievement).data
+
+    def push():
+        feed = cache_get(RECENT_FEED_KEY)
+        if feed is None:
+            # Rebuilt from the database on the next read
+            return
+        cache_set(RECENT_FEED_KEY, [entry] + [
+            item for item in feed if item['id'] != entry['id']
+        ][:RECENT_FEED_SIZE - 1], None)
+
+    transaction.on_commit(push)
+
+
+def clear_recent_feed():
+    """Drop the feed, now and again once the current transaction commits"""
+    cache_delete(RECENT_FEED_KEY)
+    transaction.on_commit(lambda: cache_delete(RECENT_FEED_KEY))
+
+
+def get_global_stats():
+    achievements = list(Achievement.objects.all())
+    active = [achievement for achievement in achievements if achievement.is_active]
+    players = UserScore.objects.count()
+    popular = sorted(active, key=lambda achievement: achievement.earned_count, reverse=True)[:POPULAR_COUNT]
+
+    return {
+        'total_achievements': len(active),
+        'total_earned': sum(achievement.earned_count for achievement in achievements),
+        'total_users_with_achievements': players,
+        'popular_achievements': [
+            {
+                'achievement': AchievementStatsSerializer(achievement, context={'players': players}).data,
+                'earned_count': achievement.earned_count,
+            }
+            for achievement in popular
+        ],
+        'recent_achievements': get_recent_feed(),
+    }
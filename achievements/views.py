@@ -9,15 +9,22 @@ from django.contrib.auth.models import User
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 
-from .models import Achievement, UserAchievement, AchievementProgress
+from clubs.models import Club
+from .leaderboard import get_rank, get_top_scores
+from .models import Achievement, UserAchievement, AchievementProgress, UserScore
 from .serializers import (
     AchievementSerializer, 
+    AchievementStatsSerializer,
     UserAchievementSerializer, 
     AchievementProgressSerializer,
     UserAchievementSummarySerializer,
-    LeaderboardEntrySerializer
+    LeaderboardEntrySerializer,
+    UserScoreSerializer
 )
 from .services import AchievementService
+from .stats import get_global_stats
+
+MAX_LEADERBOARD_LIMIT = 100
 
 
 class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
@@ -25,18 +32,28 @@ class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
     ViewSet for viewing achievements - public read access
     """
     queryset = Achievement.objects.filter(is_active=True).order_by('category', 'difficulty', 'name')
-    serializer_class = AchievementSerializer
+    serializer_class = AchievementStatsSerializer
     permission_classes = []  # No authentication required for read-only access
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Users with achievements, for rarity
+        context['players'] = UserScore.objects.count()
+        return context
+    
     @action(detail=True, methods=['get'])
     def leaderboard(self, request, pk=None):
         """
         Get leaderboard for a specific achievement
         """
         achievement = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_LEADERBOARD_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         leaderboard_data = AchievementService.get_achievement_leaderboard(
             achievement.code, 
-            limit=request.query_params.get('limit', 10)
+            limit=limit
         )
         
         serializer = LeaderboardEntrySerializer(leaderboard_data, many=True)
@@ -198,60 +215,73 @@ class AchievementStatsViewSet(viewsets.ViewSet):
     def global_stats(self, request):
         """
         Get global achievement statistics - public access
-        """
-        total_achievements = Achievement.objects.filter(is_active=True).count()
-        total_earned = UserAchievement.objects.count()
-        total_users_with_achievements = UserAchievement.objects.values('user').distinct().count()
         
-        # Most popular achievements
-        popular_achievements = Achievement.objects.annotate(
-            earned_count=Count('user_achievements')
-        ).filter(is_active=True).order_by('-earned_count')[:5]
-        
-        # Recent achievements
-        recent_achievements = UserAchievement.objects.select_related(
-            'achievement', 'user'
-        ).order_by('-earned_at')[:10]
-        
-        return Response({
-            'total_achievements': total_achievements,
-            'total_earned': total_earned,
-            'total_users_with_achievements': total_users_with_achievements,
-            'popular_achievements': [
-                {
-                    'achievement': AchievementSerializer(ach).data,
-                    'earned_count': ach.earned_count
-                }
-                for ach in popular_achievements
-            ],
-            'recent_achievements': UserAchievementSerializer(recent_achievements, many=True).data
-        })
+        Served from precomputed counters and the cached recent feed (see
+        achievements.stats)
+        """
+        return Response(get_global_stats())
     
     @action(detail=False, methods=['get'], permission_classes=[])
     def top_users(self, request):
         """
         Get top users by achievement points - public access
-        """
-        # This would require a more complex query to sum points
-        # For now, return top users by achievement count
-        top_users = User.objects.annotate(
-            achievement_count=Count('earned_achievements'),
-            total_points=Count('earned_achievements__achievement__points')  # Simplified
-        ).filter(achievement_count__gt=0).order_by('-achievement_count')[:10]
         
-        users_data = []
-        for user in top_users:
-            user_achievements = AchievementService.get_user_achievements(user)
-            users_data.append({
-                'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'display_name': user.get_full_name() or user.username,
-                },
-                'achievement_count': user_achievements['total_achievements'],
-                'total_points': user_achievements['total_points']
-            })
+        Optional ?club= or ?chapter= rank only that club's or chapter's
+        members; ?limit= (default 10, at most 100)
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_LEADERBOARD_LIMIT)
+            club_id, chapter_id = self._scope(request)
+        except ValueError:
+            return Response(
+                {'error': 'limit, club and chapter must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        scores = get_top_scores(limit, club_id=club_id, chapter_id=chapter_id)
+        serializer = UserScoreSerializer(scores, many=True)
         return Response({
-            'top_users': users_data
+            'top_users': serializer.data
         })
+    
+    @action(detail=False, methods=['get'], url_path='rank/(?P<user_id>[^/.]+)', permission_classes=[])
+    def rank(self, request, user_id=None):
+        """
+        Get a user's points and rank, globally and in each of their clubs -
+        public access
+        """
+        try:
+            target_user = User.objects.get(id=user_id)
+        except (User.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'User not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        score = UserScore.objects.filter(user=target_user, achievement_count__gt=0).first()
+        if score is None:
+            # Users without achievements are not ranked
+            data = UserScoreSerializer(UserScore(user=target_user)).data
+            data.update(rank=None, club_ranks=[])
+            return Response(data)
+        
+        data = UserScoreSerializer(score).data
+        data['rank'] = get_rank(score)
+        clubs = Club.objects.filter(
+            chapters__members__user=target_user
+        ).distinct().order_by('name').values('id', 'name')
+        data['club_ranks'] = [
+            {'club': club, 'rank': get_rank(score, club_id=club['id'])}
+            for club in clubs
+        ]
+        return Response(data)
+    
+    @staticmethod
+    def _scope(request):
+        """(club_id, chapter_id) from the query string, ValueError if malformed"""
+        club_id = request.query_params.get('club')
+        chapter_id = request.query_params.get('chapter')
+        return (
+            int(club_id) if club_id else None,
+            int(chapter_id) if chapter_id else None,
+        )
@@ -72,12 +72,6 @@ class ChapterModelAdmin(GISModelAdmin):
 			'map_srid': 4326,
 		},
 	}
-	
-	def save_model(self, request, obj, form, change):
-		obj.save()
-		# Update club stats after saving chapter
-		if obj.club:
-			obj.club.update_stats()
 
 @admin.register(Member)
 class MemberModelAdmin(admin.ModelAdmin):
@@ -5,14 +5,22 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.contrib.gis.db.models.functions import Distance
 from django.utils import timezone
+from urllib.parse import urlencode
 
-from .models import Club, Chapter, Member, ClubAdmin, ChapterAdmin, ChapterJoinRequest
+from .models import Club, Chapter, Member, ClubAdmin, ChapterAdmin, ChapterJoinRequest, PlatformStats
 from .serializers import (
     ClubSerializer, ChapterSerializer, MemberSerializer, 
     ClubAdminSerializer, ChapterAdminSerializer, ChapterJoinRequestSerializer
 )
+from .cache import PublicResponseCacheMixin, cache_public_response
+from .clustering import get_clusters
+from .filters import InBBoxFilter, MemberSearchFilter
+from .geo import KNNDistance, parse_bbox_bounds, parse_point, tiles_for_bounds
+from .pagination import HybridPagination
 from .permissions import (
     IsClubAdminOrReadOnly, 
     IsClubAdminOrPublicReadOnly,
@@ -21,11 +29,13 @@ from .permissions import (
     CanCreateMemberOrPublicRead,
     get_user_manageable_clubs,
     get_user_manageable_chapters,
-    get_user_manageable_members
+    get_user_manageable_members,
+    get_permission_context,
+    user_can_manage_club
 )
 
 
-class ClubViewSet(viewsets.ModelViewSet):
+class ClubViewSet(PublicResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Club.objects.all()  # Default queryset, will be filtered in get_queryset
     serializer_class = ClubSerializer
     # Allow public read access; only admins can write
@@ -34,6 +44,9 @@ class ClubViewSet(viewsets.ModelViewSet):
     filterset_fields = ['foundation_date']
     search_fields = ['name', 'website']
     ordering_fields = ['name', 'foundation_date', 'created_at']
+    # Opt in to keyset pagination with ?pagination=cursor
+    pagination_class = HybridPagination
+    cursor_ordering = ('name', 'id')
 
     def get_queryset(self):
         """
@@ -84,21 +97,28 @@ class ClubViewSet(viewsets.ModelViewSet):
         })
 
 
-class ChapterViewSet(viewsets.ModelViewSet):
+class ChapterViewSet(PublicResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Chapter.objects.all()  # Default queryset, will be filtered in get_queryset
     serializer_class = ChapterSerializer
     # Allow public read access; only admins/chapter creators can write
     permission_classes = [IsClubAdminOrPublicReadOnly, CanCreateChapter]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['club', 'foundation_date']
+    filter_backends = [DjangoFilterBackend, InBBoxFilter, SearchFilter, OrderingFilter]
+    filterset_fields = ['club', 'foundation_date', 'accepts_new_members', 'is_public', 'state_new']
     search_fields = ['name', 'club__name']
     ordering_fields = ['name', 'foundation_date', 'created_at']
+    # Opt in to keyset pagination with ?pagination=cursor
+    pagination_class = HybridPagination
+    cursor_ordering = ('name', 'id')
+    nearby_max_limit = 100
+    nearby_candidate_factor = 4
+    clusters_max_zoom = 18
+    clusters_max_tiles = 16
 
     def get_queryset(self):
         """
         Return all chapters for read operations, manageable chapters for write operations.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'nearby', 'clusters']:
             return Chapter.objects.select_related('club').order_by('name')
 
         # For write operations, return chapters that the user can manage
@@ -128,6 +148,88 @@ class ChapterViewSet(viewsets.ModelViewSet):
             'results': serializer.data
         })
 
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        Chapters nearest to a point, with spherical distances in km
+        GET /api/chapters/nearby/?lat=25.67&lng=-100.31&limit=20[&radius=50]
+        Combines with the list filters (club, accepts_new_members, is_public, in_bbox).
+        """
+        try:
+            point = parse_point(request.query_params.get('lat'), request.query_params.get('lng'))
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.nearby_max_limit)
+            radius = request.query_params.get('radius')
+            radius = float(radius) if radius else None
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid parameters. Provide lat, lng and optionally limit and radius (km).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # KNN ordering on the GiST index picks candidates by planar degree
+        # distance, which stretches east-west away from the equator, so fetch
+        # extra candidates and re-rank them by spherical distance
+        candidates = self.filter_queryset(self.get_queryset()).filter(
+            location__isnull=False
+        ).annotate(
+            distance=Distance('location', point)
+        ).order_by(KNNDistance('location', point))[:limit * self.nearby_candidate_factor]
+        
+        chapters = sorted(candidates, key=lambda chapter: chapter.distance.m)
+        if radius is not None:
+            chapters = [chapter for chapter in chapters if chapter.distance.km <= radius]
+        chapters = chapters[:limit]
+        
+        serializer = self.get_serializer(chapters, many=True)
+        results = [
+            {**data, 'distance_km': round(chapter.distance.km, 3)}
+            for chapter, data in zip(chapters, serializer.data)
+        ]
+        return Response({
+            'query_point': {'lat': point.y, 'lng': point.x},
+            'count': len(results),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Grid clusters of active public chapters for a map viewport
+        GET /api/chapters/clusters/?bbox=min_lng,min_lat,max_lng,max_lat&zoom=5
+        Returns count, centroid and sample chapter ids per cell. Very large
+        viewports are clustered at a lower zoom so the number of tiles stays bounded.
+        """
+        try:
+            bounds = parse_bbox_bounds(request.query_params.get('bbox', ''))
+            zoom = min(max(int(request.query_params.get('zoom', 0)), 0), self.clusters_max_zoom)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid parameters. Provide bbox=min_lng,min_lat,max_lng,max_lat and zoom.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        tiles = tiles_for_bounds(bounds, zoom)
+        while len(tiles) > self.clusters_max_tiles and zoom > 0:
+            zoom -= 1
+            tiles = tiles_for_bounds(bounds, zoom)
+        
+        # Other list filters (e.g. club, accepts_new_members) are part of the tile cache key
+        filter_params = sorted(
+            (name, value) for name, value in request.query_params.items()
+            if name not in ('bbox', 'zoom')
+        )
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            is_active=True, is_public=True, location__isnull=False
+        )
+        clusters = get_clusters(queryset, tiles, zoom, cache_prefix=urlencode(filter_params))
+        
+        return Response({
+            'zoom': zoom,
+            'tiles': len(tiles),
+            'count': sum(cluster['count'] for cluster in clusters),
+            'clusters': clusters,
+        })
+
     def perform_create(self, serializer):
         """
         For non-superusers, create a join request instead of directly creating a chapter
@@ -166,15 +268,19 @@ class ChapterViewSet(viewsets.ModelViewSet):
             })
 
 
-class MemberViewSet(viewsets.ModelViewSet):
+class MemberViewSet(PublicResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Member.objects.all()  # Default queryset, will be filtered in get_queryset
     serializer_class = MemberSerializer
     # Allow public read access; only permitted admins can create members
     permission_classes = [CanCreateMemberOrPublicRead]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ?search= uses the full-text/trigram search columns, ranked by relevance
+    filter_backends = [DjangoFilterBackend, MemberSearchFilter, OrderingFilter]
     filterset_fields = ['chapter', 'role', 'is_active']
     search_fields = ['first_name', 'last_name', 'nickname', 'chapter__name', 'chapter__club__name']
     ordering_fields = ['first_name', 'last_name', 'joined_at', 'created_at']
+    # Opt in to keyset pagination with ?pagination=cursor
+    pagination_class = HybridPagination
+    cursor_ordering = ('first_name', 'last_name', 'id')
 
     def get_queryset(self):
         """
@@ -390,11 +496,12 @@ class ClubAdminViewSet(viewsets.ModelViewSet):
         
         if self.request.user.is_superuser:
             return ClubAdmin.objects.select_related('user', 'club', 'created_by').order_by('club__name', 'user__username')
-        elif ClubAdmin.objects.filter(user=self.request.user).exists():
+        
+        admin_club_ids = get_permission_context(self.request).admin_club_ids
+        if admin_club_ids:
             # Club admins can see assignments for their clubs
-            user_clubs = Club.objects.filter(admins__user=self.request.user)
             return ClubAdmin.objects.select_related('user', 'club', 'created_by').filter(
-                club__in=user_clubs
+                club_id__in=admin_club_ids
             ).order_by('club__name', 'user__username')
         else:
             # Regular users can't see club admin assignments
@@ -405,11 +512,10 @@ class ClubAdminViewSet(viewsets.ModelViewSet):
         Check if user can create club admin for the specified club
         """
         club = serializer.validated_data['club']
-        if not self.request.user.is_superuser:
-            # Club admins can only assign to their own clubs
-            user_clubs = Club.objects.filter(admins__user=self.request.user)
-            if club not in user_clubs:
-                raise PermissionDenied("You can only assign club admins to clubs you manage.")
+        # Club admins can only assign to their own clubs
+        context = get_permission_context(self.request)
+        if not user_can_manage_club(self.request.user, club, context=context):
+            raise PermissionDenied("You can only assign club admins to clubs you manage.")
         
         serializer.save(created_by=self.request.user)
 
@@ -455,7 +561,7 @@ class ChapterAdminViewSet(viewsets.ModelViewSet):
 # DISCOVERY PLATFORM API ENDPOINTS
 # ============================================================================
 
-class ClubDiscoveryViewSet(viewsets.ReadOnlyModelViewSet):
+class ClubDiscoveryViewSet(PublicResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public API for discovering clubs - NO AUTH REQUIRED
     This endpoint provides public access to club information for discovery purposes.
@@ -464,18 +570,17 @@ class ClubDiscoveryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ClubSerializer
     permission_classes = []  # Public access
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['club_type', 'country', 'primary_state']
+    filterset_fields = ['club_type', 'country', 'primary_state', 'country_new', 'primary_state_new']
     search_fields = ['name', 'description', 'primary_state']
     ordering_fields = ['name', 'founded_year', 'total_members', 'total_chapters']
     ordering = ['name']
     
     def get_queryset(self):
         """Return only public clubs with aggregated data"""
-        return Club.objects.filter(is_public=True).select_related().prefetch_related(
-            'chapters__members'
-        )
+        return Club.objects.filter(is_public=True).select_related()
     
     @action(detail=False, methods=['get'])
+    @cache_public_response
     def by_location(self, request):
         """Get clubs grouped by geographic location"""
         clubs_by_location = {}
@@ -483,66 +588,73 @@ class ClubDiscoveryViewSet(viewsets.ReadOnlyModelViewSet):
         # Get filter parameters
         country = request.query_params.get('country', 'Mexico')
         state = request.query_params.get('state', None)
+        state_id = request.query_params.get('state_id', None)
         
         queryset = self.get_queryset().filter(country=country)
-        if state:
-            queryset = queryset.filter(
+        if state_id:
+            # Indexed FK match on the spatially assigned states
+            if not state_id.isdigit():
+                return Response({'error': 'state_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            matching_clubs = Club.objects.filter(
+                Q(primary_state_new_id=state_id) | Q(chapters__state_new_id=state_id)
+            ).values('pk')
+            queryset = queryset.filter(pk__in=matching_clubs)
+        elif state:
+            matching_clubs = Club.objects.filter(
                 Q(primary_state__icontains=state) |
-                Q(chapters__state__icontains=state)
-            ).distinct()
-        
-        for club in queryset:
-            # Group by states
-            states = set()
-            if club.primary_state:
-                states.add(club.primary_state)
-            
-            # Add states from chapters
-            for chapter in club.chapters.filter(is_active=True, is_public=True):
-                if chapter.state:
-                    states.add(chapter.state)
-            
-            for state_name in states:
-                if state_name not in clubs_by_location:
-                    clubs_by_location[state_name] = []
+                Q(primary_state_new__name__icontains=state) |
+                Q(chapters__state__icontains=state) |
+                Q(chapters__state_new__name__icontains=state)
+            ).values('pk')
+            queryset = queryset.filter(pk__in=matching_clubs)
+        
+        # One row per (club, state): the club's primary state and the states of
+        # its active public chapters. State names come from the geography
+        # models, falling back to the legacy text fields.
+        rows = queryset.annotate(
+            public_chapters=FilteredRelation(
+                'chapters',
+                condition=Q(chapters__is_active=True, chapters__is_public=True),
+            ),
+            club_state=Coalesce('primary_state_new__name', NullIf('primary_state', Value(''))),
+            chapter_state=Coalesce(
+                'public_chapters__state_new__name',
+                NullIf('public_chapters__state', Value('')),
+            ),
+        ).values(
+            'id', 'name', 'club_type', 'total_chapters', 'total_members', 'founded_year',
+            'club_state', 'chapter_state',
+        ).distinct().order_by('name', 'id')
+        
+        club_types = dict(Club.CLUB_TYPE_CHOICES)
+        seen = set()
+        for row in rows:
+            for state_name in (row['club_state'], row['chapter_state']):
+                if not state_name or (state_name, row['id']) in seen:
+                    continue
+                seen.add((state_name, row['id']))
                 
-                clubs_by_location[state_name].append({
-                    'id': club.id,
-                    'name': club.name,
-                    'club_type': club.get_club_type_display(),
-                    'total_chapters': club.total_chapters,
-                    'total_members': club.total_members,
-                    'founded_year': club.founded_year,
+                clubs_by_location.setdefault(state_name, []).append({
+                    'id': row['id'],
+                    'name': row['name'],
+                    'club_type': club_types.get(row['club_type'], row['club_type']),
+                    'total_chapters': row['total_chapters'],
+                    'total_members': row['total_members'],
+                    'founded_year': row['founded_year'],
                 })
         
         return Response(clubs_by_location)
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get overall platform statistics"""
-        from django.db.models import Count, Sum
-        
-        stats = {
-            'total_clubs': Club.objects.filter(is_public=True).count(),
-            'total_chapters': Chapter.objects.filter(
-                club__is_public=True, 
-                is_active=True, 
-                is_public=True
-            ).count(),
-            'total_members': Member.objects.filter(
-                chapter__club__is_public=True,
-                chapter__is_active=True,
-                chapter__is_public=True,
-                is_active=True
-            ).count(),
-            'clubs_by_type': Club.objects.filter(
-                is_public=True
-            ).values('club_type').annotate(
-                count=Count('id')
-            ).order_by('club_type'),
-        }
+        """
+        Get overall platform statistics from the PlatformStats rollup.
+        Staff can pass ?fresh=1 to recompute it first.
+        """
+        if request.query_params.get('fresh') == '1' and request.user.is_staff:
+            return Response(PlatformStats.refresh().as_dict())
         
-        return Response(stats)
+        return self.cached_response(request, lambda: Response(PlatformStats.get().as_dict()))
 
 
 class ChapterJoinRequestViewSet(viewsets.ModelViewSet):
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class ClubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clubs'
+
+    def ready(self):
+        """
+        Import signal handlers when Django starts
+        """
+        import clubs.signals  # noqa: F401
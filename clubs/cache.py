@@ -0,0 +1,144 @@
+"""
+Response cache for the public (anonymous-safe) read endpoints of the clubs API
+
+Entries are keyed on the host, normalized path and sorted query string, and
+tagged with the version of the 'clubs' cache namespace. Club, Chapter and Member
+saves/deletes bump that version (see clubs.signals). An invalidated or expired
+entry is still served for a while as stale data while a single request,
+holding a short lock, recomputes it.
+"""
+
+import hashlib
+import os
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from motomundo.cache import cache_add, cache_delete, cache_get, cache_set, get_version, invalidate_namespace
+
+CLUBS_CACHE_NAMESPACE = 'clubs'
+
+DEFAULT_CONFIG = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'STALE_TIMEOUT': 600,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 2.0,
+}
+
+
+def get_cache_config():
+    # Read here rather than in each settings module, after DEBUG is final
+    enabled = os.environ.get('PUBLIC_API_CACHE_ENABLED', '0' if settings.DEBUG else '1') == '1'
+    return {'ENABLED': enabled, **DEFAULT_CONFIG, **getattr(settings, 'PUBLIC_API_CACHE', {})}
+
+
+def invalidate_public_api_cache():
+    """Invalidate cached public responses (see invalidate_namespace)"""
+    invalidate_namespace(CLUBS_CACHE_NAMESPACE, get_cache_config()['ALIAS'])
+
+
+def build_cache_key(request, namespace=CLUBS_CACHE_NAMESPACE):
+    """
+    Cache key for a request: scheme and host (responses contain absolute
+    URLs), normalized path and the query string with sorted parameters
+    """
+    path = '/' + '/'.join(part for part in request.path.split('/') if part)
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = f'{request.scheme}://{request.get_host()}{path}?{query}'
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'public-api:{namespace}:{digest}'
+
+
+class PublicResponseCacheMixin:
+    """
+    Cache list/retrieve responses of a viewset, see module docstring.
+    Other actions can opt in with the cache_public_response decorator.
+    """
+    cache_namespace = CLUBS_CACHE_NAMESPACE
+
+    def list(self, request, *args, **kwargs):
+        compute = super().list
+        return self.cached_response(request, lambda: compute(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        return self.cached_response(request, lambda: compute(request, *args, **kwargs))
+
+    def cached_response(self, request, compute):
+        config = get_cache_config()
+        if not config['ENABLED'] or request.method not in ('GET', 'HEAD'):
+            return compute()
+
+        alias = config['ALIAS']
+        version = get_version(self.cache_namespace, alias)
+        if version is None:
+            # Cache unavailable
+            return compute()
+
+        key = build_cache_key(request, self.cache_namespace)
+        entry = cache_get(key, alias=alias)
+        if self._is_fresh(entry, version, config):
+            return self._entry_response(entry, 'HIT')
+
+        lock_key = f'{key}:lock'
+        if cache_add(lock_key, 1, config['LOCK_TIMEOUT'], alias=alias):
+            try:
+                return self._compute_and_store(key, version, compute, config, alias)
+            finally:
+                cache_delete(lock_key, alias=alias)
+
+        # Another request is recomputing this entry
+        if entry is not None:
+            return self._entry_response(entry, 'STALE')
+
+        deadline = time.monotonic() + config['LOCK_WAIT']
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache_get(key, alias=alias)
+            if entry is not None and entry['version'] == version:
+                return self._entry_response(entry, 'HIT')
+        return compute()
+
+    def _is_fresh(self, entry, version, config):
+        return (
+            entry is not None
+            and entry['version'] == version
+            and time.time() - entry['created'] < config['TIMEOUT']
+        )
+
+    def _compute_and_store(self, key, version, compute, config, alias):
+        response = compute()
+        if response.status_code == 200:
+            entry = {
+                'data': response.data,
+                'status': response.status_code,
+                'version': version,
+                'created': time.time(),
+            }
+            # Kept past TIMEOUT so it can be served stale while recomputing
+            cache_set(key, entry, config['TIMEOUT'] + config['STALE_TIMEOUT'], alias=alias)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _entry_response(self, entry, cache_status):
+        response = Response(entry['data'], status=entry['status'])
+        response['X-Cache'] = cache_status
+        return response
+
+
+def cache_public_response(view_method):
+    """
+    Cache a custom read action of a viewset using PublicResponseCacheMixin
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: view_method(self, request, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,99 @@
+"""
+Grid clustering of chapter locations for zoomed-out maps
+
+Each geographic grid tile (see clubs.geo.tile_bounds) is split into
+CELLS_PER_TILE x CELLS_PER_TILE cells. PostGIS snaps every point to its cell
+centre (ST_SnapToGrid with the grid origin moved by half a cell) and groups on
+it, returning a count, the centroid of the points and a few sample ids per
+cell. Tiles are cached separately, so panning only computes the new tiles and
+a viewport's payload is bounded by its tile count, not by the chapter count.
+"""
+
+from django.contrib.gis.db.models import Collect
+from django.contrib.gis.db.models.functions import Centroid, SnapToGrid
+from django.contrib.gis.geos import Polygon
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Aggregate, BigIntegerField, Count, F, FloatField, Func
+
+from motomundo.cache import cache_get, cache_set, get_version
+from .cache import CLUBS_CACHE_NAMESPACE, get_cache_config
+from .geo import WGS84, tile_bounds
+
+CELLS_PER_TILE = 8
+SAMPLE_SIZE = 5
+TILE_CACHE_TIMEOUT = 600
+
+
+class ArraySample(Aggregate):
+    """The first `size` values of the group, ascending"""
+    function = 'ARRAY_AGG'
+    template = '(%(function)s(%(expressions)s ORDER BY %(expressions)s))[1:%(size)s]'
+
+    def __init__(self, expression, size, **extra):
+        super().__init__(
+            expression,
+            size=int(size),
+            output_field=ArrayField(BigIntegerField()),
+            **extra
+        )
+
+
+def compute_tile_clusters(queryset, zoom, x, y):
+    """Cluster the queryset's locations inside one tile"""
+    min_lng, min_lat, max_lng, max_lat = tile_bounds(zoom, x, y)
+    cell_width = (max_lng - min_lng) / CELLS_PER_TILE
+    cell_height = (max_lat - min_lat) / CELLS_PER_TILE
+
+    tile = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+    tile.srid = WGS84
+
+    rows = queryset.filter(
+        location__contained=tile,
+    ).annotate(
+        lng=Func(F('location'), function='ST_X', output_field=FloatField()),
+        lat=Func(F('location'), function='ST_Y', output_field=FloatField()),
+    ).filter(
+        # Half-open bounds so points on a tile edge belong to one tile only
+        lng__gte=min_lng, lng__lt=max_lng, lat__gte=min_lat, lat__lt=max_lat,
+    ).annotate(
+        # Sizes first: Django passes them to PostGIS after the origin
+        cell=SnapToGrid(
+            'location',
+            cell_width, cell_height,
+            min_lng + cell_width / 2, min_lat + cell_height / 2,
+        ),
+    ).order_by().values('cell').annotate(
+        count=Count('id'),
+        center=Centroid(Collect('location')),
+        sample_ids=ArraySample('id', SAMPLE_SIZE),
+    )
+
+    return [
+        {
+            'count': row['count'],
+            'lat': round(row['center'].y, 6),
+            'lng': round(row['center'].x, 6),
+            'sample_ids': row['sample_ids'],
+        }
+        for row in rows
+    ]
+
+
+def get_clusters(queryset, tiles, zoom, cache_prefix):
+    """
+    Clusters for several tiles, each cached in the public API cache under the
+    clubs cache namespace version (bumped on Chapter changes). cache_prefix
+    must identify any filtering applied to the queryset.
+    """
+    alias = get_cache_config()['ALIAS']
+    version = get_version(CLUBS_CACHE_NAMESPACE, alias)
+    clusters = []
+    for x, y in tiles:
+        key = f'chapter-clusters:{version}:{cache_prefix}:{zoom}:{x}:{y}'
+        tile_clusters = cache_get(key, alias=alias) if version is not None else None
+        if tile_clusters is None:
+            tile_clusters = compute_tile_clusters(queryset, zoom, x, y)
+            if version is not None:
+                cache_set(key, tile_clusters, TILE_CACHE_TIMEOUT, alias=alias)
+        clusters.extend(tile_clusters)
+    return clusters
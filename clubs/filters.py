@@ -0,0 +1,85 @@
+"""
+Filter backends for the clubs API
+"""
+
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from .geo import parse_bbox
+
+SEARCH_CONFIG = 'motomundo_es'
+
+
+def normalize_search_term(term):
+    """Lowercase and strip accents, like lower(unaccent(...)) in the database"""
+    decomposed = unicodedata.normalize('NFKD', term)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+class MemberSearchFilter(SearchFilter):
+    """
+    ?search= for members backed by the trigger-maintained Member.search_vector
+    (full text, accent-insensitive, prefix matching for search-as-you-type)
+    and Member.search_text (trigram substring / typo matching), ordered by
+    relevance. Falls back to the view's search_fields off PostgreSQL.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        words = [
+            word
+            for term in self.get_search_terms(request)
+            for word in re.findall(r'\w+', normalize_search_term(term))
+        ]
+        if not words:
+            return queryset
+
+        # 'ana:* & lop:*' - every word, each as a prefix
+        query = SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        text = ' '.join(words)
+
+        trigram_match = Q()
+        for word in words:
+            trigram_match &= Q(search_text__contains=word) | Q(search_text__trigram_word_similar=word)
+
+        return queryset.filter(Q(search_vector=query) | trigram_match).annotate(
+            search_rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(text, 'search_text'),
+        ).order_by('-search_rank', 'first_name', 'last_name', 'id')
+
+
+class InBBoxFilter(BaseFilterBackend):
+    """
+    ?in_bbox=min_lng,min_lat,max_lng,max_lat keeps objects whose location lies
+    in the map viewport. Uses the bounding-box operator, served by the GiST
+    index on the view's bbox_filter_field (default 'location').
+    """
+    bbox_param = 'in_bbox'
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.bbox_param)
+        if not value:
+            return queryset
+        try:
+            bbox = parse_bbox(value)
+        except ValueError as e:
+            raise ValidationError({self.bbox_param: str(e)})
+
+        field = getattr(view, 'bbox_filter_field', 'location')
+        boxes = bbox if bbox.geom_type == 'MultiPolygon' else [bbox]
+        condition = Q()
+        for box in boxes:
+            box.srid = bbox.srid
+            condition |= Q(**{f'{field}__contained': box})
+        return queryset.filter(condition)
@@ -0,0 +1,99 @@
+"""
+Geospatial helpers for chapter locations (PostGIS, SRID 4326)
+"""
+
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Point, Polygon, MultiPolygon
+from django.db.models import F, FloatField, Func, Value
+
+WGS84 = 4326
+
+
+class KNNDistance(Func):
+    """
+    `location <-> point`: planar distance in degrees that PostGIS can serve in
+    order straight from the GiST index (KNN). Only use it for ORDER BY, then
+    measure real distances on the few rows it returns.
+    """
+    arg_joiner = ' <-> '
+    template = '%(expressions)s'
+    output_field = FloatField()
+
+    def __init__(self, field, point, **extra):
+        super().__init__(F(field), Value(point, output_field=PointField(srid=WGS84)), **extra)
+
+
+def parse_point(lat, lng):
+    """
+    Build a WGS84 point from lat/lng query parameters.
+    Raises ValueError for missing, malformed or out of range coordinates.
+    """
+    lat, lng = float(lat), float(lng)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Coordinates out of range')
+    return Point(lng, lat, srid=WGS84)
+
+
+def parse_bbox_bounds(value):
+    """
+    Parse 'min_lng,min_lat,max_lng,max_lat' into a tuple of floats.
+    min_lng > max_lng means the box crosses the antimeridian.
+    Raises ValueError for malformed boxes.
+    """
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('Expected min_lng,min_lat,max_lng,max_lat')
+    min_lng, min_lat, max_lng, max_lat = parts
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError('Bounding box out of range')
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_bbox(value):
+    """
+    Parse 'min_lng,min_lat,max_lng,max_lat' into a polygon. A box crossing the
+    antimeridian (min_lng > max_lng) becomes two polygons.
+    Raises ValueError for malformed boxes.
+    """
+    min_lng, min_lat, max_lng, max_lat = parse_bbox_bounds(value)
+    if min_lng <= max_lng:
+        bbox = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+    else:
+        bbox = MultiPolygon(
+            Polygon.from_bbox((min_lng, min_lat, 180, max_lat)),
+            Polygon.from_bbox((-180, min_lat, max_lng, max_lat)),
+        )
+    bbox.srid = WGS84
+    return bbox
+
+
+def tile_bounds(zoom, x, y):
+    """
+    Bounds (min_lng, min_lat, max_lng, max_lat) of a geographic grid tile:
+    at zoom z the world is split into 2^z x 2^z tiles of 360/2^z by 180/2^z
+    degrees, x counted eastwards from -180 and y northwards from -90
+    """
+    n = 2 ** zoom
+    width, height = 360 / n, 180 / n
+    return (-180 + x * width, -90 + y * height, -180 + (x + 1) * width, -90 + (y + 1) * height)
+
+
+def tiles_for_bounds(bounds, zoom):
+    """Return the (x, y) grid tiles covering a bounding box at a zoom level"""
+    min_lng, min_lat, max_lng, max_lat = bounds
+    n = 2 ** zoom
+    width, height = 360 / n, 180 / n
+
+    def column(lng):
+        return min(int((lng + 180) // width), n - 1)
+
+    def row(lat):
+        return min(int((lat + 90) // height), n - 1)
+
+    if min_lng <= max_lng:
+        columns = list(range(column(min_lng), column(max_lng) + 1))
+    else:
+        # Crosses the antimeridian
+        columns = list(range(column(min_lng), n)) + list(range(0, column(max_lng) + 1))
+    rows = range(row(min_lat), row(max_lat) + 1)
+    return [(x, y) for x in columns for y in rows]
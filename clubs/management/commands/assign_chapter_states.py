@@ -0,0 +1,68 @@
+"""
+Management command to derive Chapter.state_new (and Club.country_new) from
+chapter locations with set-based spatial joins against State.boundary
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from clubs.cache import invalidate_public_api_cache
+from clubs.models import Club, Chapter
+from geography.models import State
+from geography.tiles import MAP_TILES_NAMESPACE
+from motomundo.cache import invalidate_namespace
+
+
+class Command(BaseCommand):
+    help = 'Assign chapters to the state containing their location, and clubs to its country'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='Also re-derive chapters that already have a state',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows would change without updating them',
+        )
+
+    def handle(self, *args, **options):
+        containing_states = State.objects.filter(
+            boundary__contains=OuterRef('location')
+        ).order_by('id')
+
+        chapters = Chapter.objects.filter(location__isnull=False).filter(Exists(containing_states))
+        if not options['overwrite']:
+            chapters = chapters.filter(state_new__isnull=True)
+
+        clubs = Club.objects.filter(country_new__isnull=True)
+        chapter_countries = Chapter.objects.filter(
+            club=OuterRef('pk'), state_new__country__isnull=False
+        ).order_by('id').values('state_new__country_id')[:1]
+
+        if options['dry_run']:
+            self.stdout.write(f'{chapters.count()} chapter(s) would get a state')
+            self.stdout.write(self.style.WARNING('Dry run, nothing updated'))
+            return
+
+        with transaction.atomic():
+            # update() doesn't send save signals
+            updated_chapters = chapters.update(
+                state_new=Subquery(containing_states.values('pk')[:1])
+            )
+            Chapter.objects.filter(state='', state_new__isnull=False).update(
+                state=Subquery(State.objects.filter(pk=OuterRef('state_new_id')).values('name')[:1])
+            )
+            updated_clubs = clubs.filter(Exists(chapter_countries)).update(
+                country_new=Subquery(chapter_countries)
+            )
+            # The save signals that invalidate these never fired
+            invalidate_public_api_cache()
+            invalidate_namespace(MAP_TILES_NAMESPACE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Assigned states to {updated_chapters} chapter(s) and countries to {updated_clubs} club(s)'
+        ))
@@ -0,0 +1,63 @@
+"""
+Management command to recompute Club.total_members / Club.total_chapters and
+fix any drift from the incrementally maintained counters
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from clubs.cache import invalidate_public_api_cache
+from clubs.models import Club
+
+
+class Command(BaseCommand):
+    help = 'Recompute club member/chapter counters in one grouped query and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted clubs without updating them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        counts = Club.objects.order_by().annotate(
+            actual_chapters=Count(
+                'chapters',
+                filter=Q(chapters__is_active=True),
+                distinct=True,
+            ),
+            actual_members=Count(
+                'chapters__members',
+                filter=Q(chapters__is_active=True, chapters__members__is_active=True),
+                distinct=True,
+            ),
+        ).values_list('id', 'name', 'total_chapters', 'total_members', 'actual_chapters', 'actual_members')
+
+        drifted = []
+        for club_id, name, total_chapters, total_members, actual_chapters, actual_members in counts:
+            if (total_chapters, total_members) == (actual_chapters, actual_members):
+                continue
+            self.stdout.write(
+                f'{name} (id={club_id}): chapters {total_chapters} -> {actual_chapters}, '
+                f'members {total_members} -> {actual_members}'
+            )
+            drifted.append(Club(id=club_id, total_chapters=actual_chapters, total_members=actual_members))
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All club counters are up to date'))
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} club(s) drifted (dry run, nothing updated)'))
+            return
+
+        with transaction.atomic():
+            Club.objects.bulk_update(drifted, ['total_chapters', 'total_members'], batch_size=500)
+            # bulk_update doesn't send save signals
+            invalidate_public_api_cache()
+
+        self.stdout.write(self.style.SUCCESS(f'Fixed counters for {len(drifted)} club(s)'))
@@ -0,0 +1,21 @@
+"""
+Management command to refresh the PlatformStats rollup used by the discovery
+stats endpoint. Reads recompute the rollup once it is older than
+PlatformStats.STALE_AFTER; running this periodically (e.g. every few minutes
+from cron) keeps that work off the request.
+"""
+
+from django.core.management.base import BaseCommand
+
+from clubs.models import PlatformStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute public platform totals for the discovery stats endpoint'
+
+    def handle(self, *args, **options):
+        stats = PlatformStats.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f'Platform stats refreshed: {stats.total_clubs} clubs, '
+            f'{stats.total_chapters} chapters, {stats.total_members} members'
+        ))
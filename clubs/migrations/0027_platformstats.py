@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0026_remove_old_geography_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_clubs', models.PositiveIntegerField(default=0)),
+                ('total_chapters', models.PositiveIntegerField(default=0)),
+                ('total_members', models.PositiveIntegerField(default=0)),
+                ('clubs_by_type', models.JSONField(blank=True, default=list, help_text="[{'club_type': ..., 'count': ...}]")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Platform Stats',
+                'verbose_name_plural': 'Platform Stats',
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Full-text and trigram search columns for members, maintained by triggers.
+# unaccent() isn't IMMUTABLE, so it can't back a generated column or an
+# expression index; triggers keep plain columns up to date instead.
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+CREATE_SEARCH_CONFIG = """
+CREATE TEXT SEARCH CONFIGURATION motomundo_es (COPY = simple);
+ALTER TEXT SEARCH CONFIGURATION motomundo_es
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+DROP_SEARCH_CONFIG = "DROP TEXT SEARCH CONFIGURATION IF EXISTS motomundo_es;"
+
+CREATE_TRIGGERS = """
+CREATE FUNCTION clubs_member_search_update() RETURNS trigger AS $$
+DECLARE
+    chapter_name text;
+    club_name text;
+BEGIN
+    SELECT ch.name, cl.name INTO chapter_name, club_name
+    FROM clubs_chapter ch JOIN clubs_club cl ON cl.id = ch.club_id
+    WHERE ch.id = NEW.chapter_id;
+
+    NEW.search_vector :=
+        setweight(to_tsvector('motomundo_es', concat_ws(' ', NEW.first_name, NEW.last_name, NEW.nickname)), 'A') ||
+        setweight(to_tsvector('motomundo_es', coalesce(chapter_name, '')), 'C') ||
+        setweight(to_tsvector('motomundo_es', coalesce(club_name, '')), 'D');
+    NEW.search_text := lower(unaccent(concat_ws(' ', NEW.first_name, NEW.last_name, NEW.nickname, chapter_name, club_name)));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER clubs_member_search_trigger
+    BEFORE INSERT OR UPDATE OF first_name, last_name, nickname, chapter_id ON clubs_member
+    FOR EACH ROW EXECUTE FUNCTION clubs_member_search_update();
+
+-- Renamed or moved chapters and renamed clubs re-run the member trigger
+CREATE FUNCTION clubs_chapter_search_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE clubs_member SET chapter_id = chapter_id WHERE chapter_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER clubs_chapter_search_trigger
+    AFTER UPDATE OF name, club_id ON clubs_chapter
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.club_id IS DISTINCT FROM NEW.club_id)
+    EXECUTE FUNCTION clubs_chapter_search_update();
+
+CREATE FUNCTION clubs_club_search_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE clubs_member SET chapter_id = chapter_id
+    WHERE chapter_id IN (SELECT id FROM clubs_chapter WHERE club_id = NEW.id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER clubs_club_search_trigger
+    AFTER UPDATE OF name ON clubs_club
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION clubs_club_search_update();
+
+-- Backfill existing members
+UPDATE clubs_member SET chapter_id = chapter_id;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS clubs_club_search_trigger ON clubs_club;
+DROP FUNCTION IF EXISTS clubs_club_search_update();
+DROP TRIGGER IF EXISTS clubs_chapter_search_trigger ON clubs_chapter;
+DROP FUNCTION IF EXISTS clubs_chapter_search_update();
+DROP TRIGGER IF EXISTS clubs_member_search_trigger ON clubs_member;
+DROP FUNCTION IF EXISTS clubs_member_search_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0028_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_SEARCH_CONFIG, DROP_SEARCH_CONFIG),
+        migrations.AddField(
+            model_name='member',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.AddIndex(
+            model_name='member',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='member_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='member_search_text_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,14 +1,19 @@
 import secrets
 import string
+from datetime import timedelta
 from django.db import models
-from django.db.models.functions import Lower
+from django.db.models import F
+from django.db.models.functions import Greatest, Lower
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.utils.module_loading import import_string
 from django.conf import settings as django_settings
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 from motomundo import settings
+from motomundo.tracking import TrackedFieldsMixin
 from geography.models import Country, State
 
 
@@ -129,6 +134,21 @@ class Club(models.Model):
         ).count()
         
         self.save(update_fields=['total_members', 'total_chapters'])
+
+    @classmethod
+    def adjust_stats(cls, club_id, members=0, chapters=0):
+        """
+        Apply deltas to total_members / total_chapters with atomic F() arithmetic,
+        so concurrent saves don't lose updates. Counters never drop below zero;
+        any drift is fixed by the reconcile_club_stats command.
+        """
+        updates = {}
+        if members:
+            updates['total_members'] = Greatest(F('total_members') + members, 0)
+        if chapters:
+            updates['total_chapters'] = Greatest(F('total_chapters') + chapters, 0)
+        if club_id and updates:
+            cls.objects.filter(pk=club_id).update(**updates)
     
     @property 
     def total_members_legacy(self):
@@ -140,7 +160,7 @@ class Club(models.Model):
         ).count()
 
 
-class Chapter(models.Model):
+class Chapter(TrackedFieldsMixin, models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="chapters")
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -210,6 +230,10 @@ class Chapter(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Persisted values compared on save by the club counters and the state
+    # assignment (see motomundo.tracking)
+    tracked_fields = ('club_id', 'is_active', 'location')
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["club", "name"], name="unique_chapter_name_per_club"),
@@ -219,22 +243,83 @@ class Chapter(models.Model):
             models.Index(fields=['state', 'city']),
             models.Index(fields=['club', 'is_active']),
             models.Index(fields=['is_public', 'is_active']),
+            # Keyset pagination on (name, id)
+            models.Index(fields=['name', 'id'], name='chapter_name_keyset_idx'),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.club.name})"
-    
+
+    def get_stats_state(self):
+        """
+        Return the (club_id, is_active) pair that drives the club counters, or
+        None if those fields aren't loaded
+        """
+        if 'club_id' not in self.__dict__ or 'is_active' not in self.__dict__:
+            return None
+        return (self.club_id, self.is_active)
+
+    def location_changed(self):
+        """Whether location was set or moved since the chapter was loaded"""
+        if not self.has_saved_value('location'):
+            return self.__dict__.get('location') is not None
+        return self.field_changed('location')
+
+    def assign_state_from_location(self):
+        """
+        Set state_new to the State whose boundary contains location (and the
+        legacy state text if empty), and the club's country_new if it has none.
+        Nothing changes when no boundary contains the point. Returns the
+        changed field names.
+        """
+        if self.location is None:
+            return set()
+
+        state = State.objects.filter(
+            boundary__contains=self.location
+        ).only('id', 'name', 'country_id').order_by('id').first()
+        if state is None:
+            return set()
+
+        self.state_new = state
+        changed = {'state_new'}
+        if not self.state:
+            self.state = state.name
+            changed.add('state')
+
+        if self.club_id and state.country_id:
+            Club.objects.filter(pk=self.club_id, country_new__isnull=True).update(
+                country_new_id=state.country_id
+            )
+            club = self._state.fields_cache.get('club')
+            if club is not None and club.country_new_id is None:
+                club.country_new_id = state.country_id
+        return changed
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.location_changed() and (update_fields is None or 'location' in update_fields):
+            changed = self.assign_state_from_location()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | changed
         super().save(*args, **kwargs)
-        # Auto-update parent club stats whenever chapter changes
-        if self.club_id:
-            self.club.update_stats()
     
     def can_manage(self, user):
         """Check if user can manage this chapter"""
         return user == self.owner
 
-class Member(models.Model):
+# Queries a Member save costs, signal handlers included, when its chapter and
+# user are assigned as loaded instances. Not counted: the achievement recheck
+# queued for after commit (one upsert). Asserted by tests/test_member_save_queries.py.
+MEMBER_SAVE_QUERIES = {
+    # name check, user/chapter membership check, INSERT, club counter UPDATE
+    'create': 4,
+    # UPDATE, e.g. of the role (moving or (de)activating also updates counters)
+    'update': 1,
+}
+
+
+class Member(TrackedFieldsMixin, models.Model):
     ROLE_CHOICES = [
         ('president', 'President'),
         ('vice_president', 'Vice President'),
@@ -294,6 +379,15 @@ class Member(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Search columns maintained by database triggers (see migration 0029) from
+    # the member's names and its chapter and club names
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    # Persisted values compared on save by the club counters, the achievement
+    # signals and the validation in save() (see motomundo.tracking)
+    tracked_fields = ('chapter_id', 'user_id', 'is_active', 'role', 'first_name', 'last_name', 'claim_code')
+
     class Meta:
         ordering = ['first_name', 'last_name']
         constraints = [
@@ -307,11 +401,26 @@ class Member(models.Model):
                 condition=models.Q(user__isnull=False)
             )
         ]
+        indexes = [
+            # Keyset pagination on (first_name, last_name, id)
+            models.Index(fields=['first_name', 'last_name', 'id'], name='member_name_keyset_idx'),
+            GinIndex(fields=['search_vector'], name='member_search_vector_idx'),
+            GinIndex(fields=['search_text'], name='member_search_text_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         full_name = f"{self.first_name} {self.last_name}".strip()
         return f"{full_name} ({self.role}) - {self.chapter.name}"
     
+    def get_stats_state(self):
+        """
+        Return the (chapter_id, is_active) pair that drives the club counters, or
+        None if those fields aren't loaded
+        """
+        if 'chapter_id' not in self.__dict__ or 'is_active' not in self.__dict__:
+            return None
+        return (self.chapter_id, self.is_active)
+
     @property
     def club(self):
         """Get the club this member belongs to through their chapter"""
@@ -333,6 +442,9 @@ class Member(models.Model):
 
         if self.chapter_id is None or not self.first_name:
             return
+        if not ({'chapter_id', 'first_name', 'last_name'} & self.changed_fields()):
+            # Checked when these fields were saved
+            return
 
         qs = Member.objects.filter(
             chapter_id=self.chapter_id,
@@ -347,9 +459,33 @@ class Member(models.Model):
                 'last_name': 'A member with the same name already exists in this chapter.',
             })
 
+    def clean_fields(self, exclude=None):
+        # A related object assigned as a saved instance exists, so skip the
+        # existence query for it (the foreign key constraint still applies)
+        exclude = set(exclude or ())
+        for field in self._meta.concrete_fields:
+            related = self._state.fields_cache.get(field.name) if field.is_relation else None
+            if related is not None and not related._state.adding and related.pk == getattr(self, field.attname):
+                exclude.add(field.name)
+        super().clean_fields(exclude=exclude)
+
+    def validate_constraints(self, exclude=None):
+        # clean() checks the case-insensitive name constraint, reporting the
+        # error on the name fields
+        super().validate_constraints(exclude=set(exclude or ()) | {'first_name'})
+
+    def unchanged_fields(self):
+        """Names of the tracked fields that still hold their persisted values"""
+        return {
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.tracked_fields and not self.field_changed(field.attname)
+        }
+
     def save(self, *args, **kwargs):
-        # Ensure validation runs on programmatic saves as well
-        self.full_clean()
+        # Ensure validation runs on programmatic saves as well. Tracked fields
+        # that didn't change were validated when they were saved, which keeps
+        # saves within MEMBER_SAVE_QUERIES
+        self.full_clean(exclude=self.unchanged_fields())
         return super().save(*args, **kwargs)
 
 
@@ -459,9 +595,6 @@ class ChapterJoinRequest(models.Model):
         self.reviewed_at = timezone.now()
         self.save()
         
-        # Update club stats
-        self.club.update_stats()
-        
         return chapter
     
     def reject(self, admin_notes=""):
@@ -537,4 +670,74 @@ class UserClubContext(models.Model):
     def __str__(self):
         if self.active_club:
             return f"{self.user.username} - Active: {self.active_club.name}"
-        return f"{self.user.username} - No active club"
\ No newline at end of file
+        return f"{self.user.username} - No active club"
+
+class PlatformStats(models.Model):
+    """
+    Single-row rollup of public platform totals served by the discovery stats
+    endpoint. get() recomputes it once it is older than STALE_AFTER; the
+    refresh_platform_stats command refreshes it ahead of reads.
+    """
+    total_clubs = models.PositiveIntegerField(default=0)
+    total_chapters = models.PositiveIntegerField(default=0)
+    total_members = models.PositiveIntegerField(default=0)
+    clubs_by_type = models.JSONField(default=list, blank=True, help_text="[{'club_type': ..., 'count': ...}]")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SINGLETON_ID = 1
+    STALE_AFTER = timedelta(minutes=15)
+
+    class Meta:
+        verbose_name = "Platform Stats"
+        verbose_name_plural = "Platform Stats"
+
+    def __str__(self):
+        return f"Platform stats ({self.updated_at:%Y-%m-%d %H:%M})"
+
+    @staticmethod
+    def compute():
+        """Count public clubs, chapters and members"""
+        from django.db.models import Count
+        return {
+            'total_clubs': Club.objects.filter(is_public=True).count(),
+            'total_chapters': Chapter.objects.filter(
+                club__is_public=True,
+                is_active=True,
+                is_public=True
+            ).count(),
+            'total_members': Member.objects.filter(
+                chapter__club__is_public=True,
+                chapter__is_active=True,
+                chapter__is_public=True,
+                is_active=True
+            ).count(),
+            'clubs_by_type': list(Club.objects.filter(
+                is_public=True
+            ).values('club_type').annotate(
+                count=Count('id')
+            ).order_by('club_type')),
+        }
+
+    @classmethod
+    def refresh(cls):
+        """Recompute the totals and store them in the single row"""
+        stats, _ = cls.objects.update_or_create(pk=cls.SINGLETON_ID, defaults=cls.compute())
+        return stats
+
+    @classmethod
+    def get(cls):
+        """Return the stored row, computing it on first use or once stale"""
+        from django.utils import timezone
+        stats = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        if stats is None or stats.updated_at < timezone.now() - cls.STALE_AFTER:
+            stats = cls.refresh()
+        return stats
+
+    def as_dict(self):
+        return {
+            'total_clubs': self.total_clubs,
+            'total_chapters': self.total_chapters,
+            'total_members': self.total_members,
+            'clubs_by_type': self.clubs_by_type,
+            'updated_at': self.updated_at,
+        }
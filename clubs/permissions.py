@@ -1,8 +1,93 @@
+from functools import cached_property
+
 from rest_framework import permissions
 from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef
 from .models import ClubAdmin, ChapterAdmin, Club, Chapter, Member
 
 
+class PermissionContext:
+    """
+    The clubs and chapters a user administers, loaded at most once each.
+    Build one per request (see get_permission_context) so permission checks
+    on any number of objects don't hit the database again.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_superuser(self):
+        return bool(getattr(self.user, 'is_superuser', False))
+
+    @cached_property
+    def admin_club_ids(self):
+        if not self.user or not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(
+            ClubAdmin.objects.filter(user=self.user).values_list('club_id', flat=True)
+        )
+
+    @cached_property
+    def admin_chapter_ids(self):
+        if not self.user or not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(
+            ChapterAdmin.objects.filter(user=self.user).values_list('chapter_id', flat=True)
+        )
+
+    @property
+    def is_admin(self):
+        """True if the user is a superuser, club admin or chapter admin"""
+        return self.is_superuser or bool(self.admin_club_ids) or bool(self.admin_chapter_ids)
+
+    def can_manage_club(self, club):
+        """Accepts a Club instance or a club id"""
+        if self.is_superuser:
+            return True
+        club_id = club.pk if isinstance(club, Club) else club
+        return club_id is not None and club_id in self.admin_club_ids
+
+    def can_manage_chapter(self, chapter):
+        """Club admins manage all chapters of their clubs, chapter admins their own chapter"""
+        if self.is_superuser:
+            return True
+        if chapter is None:
+            return False
+        return chapter.club_id in self.admin_club_ids or chapter.pk in self.admin_chapter_ids
+
+
+def get_permission_context(request):
+    """
+    Return the PermissionContext for request.user, cached on the request
+    """
+    context = getattr(request, '_permission_context', None)
+    if context is None or context.user is not request.user:
+        context = PermissionContext(request.user)
+        request._permission_context = context
+    return context
+
+
+def _club_admin_can_edit(context, obj):
+    """
+    Object check shared by the IsClubAdmin* permissions: club admins edit their
+    clubs and everything under them, chapter admins only their own chapters
+    """
+    if context.is_superuser:
+        return True
+    if isinstance(obj, Club):
+        return context.can_manage_club(obj)
+    if isinstance(obj, Chapter):
+        return context.can_manage_chapter(obj)
+    if isinstance(obj, (Member, ChapterAdmin)):
+        # Through the chapter's club
+        return context.can_manage_club(obj.chapter.club_id)
+    if hasattr(obj, 'club_id'):
+        # ClubAdmin, ChapterJoinRequest, ...
+        return context.can_manage_club(obj.club_id)
+    return False
+
+
 class IsClubAdminOrPublicReadOnly(permissions.BasePermission):
     """
     Custom permission to allow club admins to edit clubs they manage,
@@ -24,10 +109,7 @@ class IsClubAdminOrPublicReadOnly(permissions.BasePermission):
             return True
         
         # For other write operations, require admin permissions
-        is_club_admin = ClubAdmin.objects.filter(user=request.user).exists()
-        is_chapter_admin = ChapterAdmin.objects.filter(user=request.user).exists()
-        
-        return (request.user.is_superuser or is_club_admin or is_chapter_admin)
+        return get_permission_context(request).is_admin
     
     def has_object_permission(self, request, view, obj):
         # Read permissions for any user (authenticated or not)
@@ -38,35 +120,7 @@ class IsClubAdminOrPublicReadOnly(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        # Superusers have full access
-        if request.user.is_superuser:
-            return True
-        
-        # Get user's administered clubs
-        user_clubs = Club.objects.filter(admins__user=request.user)
-        
-        # Club admins can only edit clubs they manage
-        if hasattr(obj, 'club') and not isinstance(obj, Chapter):
-            # For chapters and members
-            return obj.club in user_clubs
-        elif hasattr(obj, 'chapter'):
-            # For members through chapter
-            return obj.chapter.club in user_clubs
-        elif isinstance(obj, Club):
-            # For clubs directly
-            return obj in user_clubs
-        elif isinstance(obj, Chapter):
-            # For chapters directly - allow chapter admins to edit their chapters
-            is_chapter_admin = ChapterAdmin.objects.filter(user=request.user, chapter=obj).exists()
-            return (obj.club in user_clubs or is_chapter_admin)
-        elif isinstance(obj, ClubAdmin):
-            # NEW: Club admins can manage other club admins for their clubs
-            return obj.club in user_clubs
-        elif isinstance(obj, ChapterAdmin):
-            # Club admins can manage chapter managers for their chapters
-            return obj.chapter.club in user_clubs
-        
-        return False
+        return _club_admin_can_edit(get_permission_context(request), obj)
 
 
 class IsClubAdminOrReadOnly(permissions.BasePermission):
@@ -85,45 +139,14 @@ class IsClubAdminOrReadOnly(permissions.BasePermission):
             return False
         
         # Write permissions only for club admins, chapter admins, or superusers
-        is_club_admin = ClubAdmin.objects.filter(user=request.user).exists()
-        is_chapter_admin = ChapterAdmin.objects.filter(user=request.user).exists()
-        
-        return (request.user.is_superuser or is_club_admin or is_chapter_admin)
+        return get_permission_context(request).is_admin
     
     def has_object_permission(self, request, view, obj):
         # Read permissions for any authenticated user
         if request.method in permissions.SAFE_METHODS:
             return request.user.is_authenticated
         
-        # Superusers have full access
-        if request.user.is_superuser:
-            return True
-        
-        # Get user's administered clubs
-        user_clubs = Club.objects.filter(admins__user=request.user)
-        
-        # Club admins can only edit clubs they manage
-        if hasattr(obj, 'club') and not isinstance(obj, Chapter):
-            # For chapters and members
-            return obj.club in user_clubs
-        elif hasattr(obj, 'chapter'):
-            # For members through chapter
-            return obj.chapter.club in user_clubs
-        elif isinstance(obj, Club):
-            # For clubs directly
-            return obj in user_clubs
-        elif isinstance(obj, Chapter):
-            # For chapters directly - allow chapter admins to edit their chapters
-            is_chapter_admin = ChapterAdmin.objects.filter(user=request.user, chapter=obj).exists()
-            return (obj.club in user_clubs or is_chapter_admin)
-        elif isinstance(obj, ClubAdmin):
-            # NEW: Club admins can manage other club admins for their clubs
-            return obj.club in user_clubs
-        elif isinstance(obj, ChapterAdmin):
-            # Club admins can manage chapter managers for their chapters
-            return obj.chapter.club in user_clubs
-        
-        return False
+        return _club_admin_can_edit(get_permission_context(request), obj)
 
 
 class IsChapterAdminOrReadOnly(permissions.BasePermission):
@@ -146,11 +169,7 @@ class IsChapterAdminOrReadOnly(permissions.BasePermission):
         
         # Chapter managers can only modify members
         if isinstance(obj, Member):
-            return (
-                request.user.is_superuser or 
-                ClubAdmin.objects.filter(user=request.user, club=obj.chapter.club).exists() or
-                ChapterAdmin.objects.filter(user=request.user, chapter=obj.chapter).exists()
-            )
+            return get_permission_context(request).can_manage_chapter(obj.chapter)
         
         # Chapter managers cannot modify clubs or chapters
         return request.user.is_superuser
@@ -207,14 +226,10 @@ class CanCreateMemberOrPublicRead(permissions.BasePermission):
             chapter_id = request.data.get('chapter')
             if chapter_id:
                 try:
-                    chapter = Chapter.objects.get(id=chapter_id)
-                    return (
-                        request.user.is_superuser or
-                        ClubAdmin.objects.filter(user=request.user, club=chapter.club).exists() or
-                        ChapterAdmin.objects.filter(user=request.user, chapter=chapter).exists()
-                    )
+                    chapter = Chapter.objects.only('id', 'club_id').get(id=chapter_id)
                 except Chapter.DoesNotExist:
                     return False
+                return get_permission_context(request).can_manage_chapter(chapter)
         
         # For other write operations (PUT, PATCH, DELETE), defer to object-level permissions
         # This allows the has_object_permission method to handle the detailed check
@@ -229,15 +244,8 @@ class CanCreateMemberOrPublicRead(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        # Superusers have full access
-        if request.user.is_superuser:
-            return True
-        
         # For member objects, check if user can manage this member's chapter
-        return (
-            ClubAdmin.objects.filter(user=request.user, club=obj.chapter.club).exists() or
-            ChapterAdmin.objects.filter(user=request.user, chapter=obj.chapter).exists()
-        )
+        return get_permission_context(request).can_manage_chapter(obj.chapter)
 
 
 class CanCreateMember(permissions.BasePermission):
@@ -256,14 +264,10 @@ class CanCreateMember(permissions.BasePermission):
             chapter_id = request.data.get('chapter')
             if chapter_id:
                 try:
-                    chapter = Chapter.objects.get(id=chapter_id)
-                    return (
-                        request.user.is_superuser or
-                        ClubAdmin.objects.filter(user=request.user, club=chapter.club).exists() or
-                        ChapterAdmin.objects.filter(user=request.user, chapter=chapter).exists()
-                    )
+                    chapter = Chapter.objects.only('id', 'club_id').get(id=chapter_id)
                 except Chapter.DoesNotExist:
                     return False
+                return get_permission_context(request).can_manage_chapter(chapter)
         
         # For other write operations (PUT, PATCH, DELETE), defer to object-level permissions
         # This allows the has_object_permission method to handle the detailed check
@@ -274,36 +278,24 @@ class CanCreateMember(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return request.user.is_authenticated
         
-        # Superusers have full access
-        if request.user.is_superuser:
-            return True
-        
         # For member objects, check if user can manage this member's chapter
-        return (
-            ClubAdmin.objects.filter(user=request.user, club=obj.chapter.club).exists() or
-            ChapterAdmin.objects.filter(user=request.user, chapter=obj.chapter).exists()
-        )
+        return get_permission_context(request).can_manage_chapter(obj.chapter)
 
 
-def user_can_manage_club(user, club):
+def user_can_manage_club(user, club, context=None):
     """
-    Helper function to check if a user can manage a specific club
+    Helper function to check if a user can manage a specific club.
+    Pass the request's PermissionContext to reuse its cached admin roles.
     """
-    return (
-        user.is_superuser or 
-        ClubAdmin.objects.filter(user=user, club=club).exists()
-    )
+    return (context or PermissionContext(user)).can_manage_club(club)
 
 
-def user_can_manage_chapter(user, chapter):
+def user_can_manage_chapter(user, chapter, context=None):
     """
-    Helper function to check if a user can manage a specific chapter
+    Helper function to check if a user can manage a specific chapter.
+    Pass the request's PermissionContext to reuse its cached admin roles.
     """
-    return (
-        user.is_superuser or 
-        ClubAdmin.objects.filter(user=user, club=chapter.club).exists() or
-        ChapterAdmin.objects.filter(user=user, chapter=chapter).exists()
-    )
+    return (context or PermissionContext(user)).can_manage_chapter(chapter)
 
 
 def get_user_manageable_clubs(user):
@@ -323,15 +315,12 @@ def get_user_manageable_chapters(user):
     if user.is_superuser:
         return Chapter.objects.all()
     
-    # Clubs where user is admin
-    club_chapters = Chapter.objects.filter(club__admins__user=user)
-    
-    # Chapters where user is admin
-    direct_chapters = Chapter.objects.filter(admins__user=user)
-    
-    all_chapters = (club_chapters | direct_chapters).distinct()
-    
-    return all_chapters
+    # Chapters of clubs where user is admin, or chapters where user is admin.
+    # EXISTS subqueries never duplicate rows, so no DISTINCT is needed
+    return Chapter.objects.filter(
+        Exists(ClubAdmin.objects.filter(user=user, club_id=OuterRef('club_id')))
+        | Exists(ChapterAdmin.objects.filter(user=user, chapter_id=OuterRef('pk')))
+    )
 
 
 def get_user_manageable_members(user):
@@ -341,13 +330,10 @@ def get_user_manageable_members(user):
     if user.is_superuser:
         return Member.objects.all()
     
-    # Members from clubs where user is admin
-    club_members = Member.objects.filter(chapter__club__admins__user=user)
-    
-    # Members from chapters where user is admin
-    chapter_members = Member.objects.filter(chapter__admins__user=user)
-    
-    return (club_members | chapter_members).distinct()
+    # Members of manageable chapters (semi-join on the member.chapter_id index)
+    return Member.objects.filter(
+        chapter__in=get_user_manageable_chapters(user).values('pk')
+    )
 
 
 class IsClubAdminOrChapterAdmin(permissions.BasePermission):
@@ -361,39 +347,31 @@ class IsClubAdminOrChapterAdmin(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        # Superusers have access
-        if request.user.is_superuser:
-            return True
-        
-        # Check if user is club admin or chapter admin
-        is_club_admin = ClubAdmin.objects.filter(user=request.user).exists()
-        is_chapter_admin = ChapterAdmin.objects.filter(user=request.user).exists()
-        
-        return is_club_admin or is_chapter_admin
+        # Superusers, club admins and chapter admins have access
+        return get_permission_context(request).is_admin
     
     def has_object_permission(self, request, view, obj):
+        context = get_permission_context(request)
+        
         # Superusers have full access
-        if request.user.is_superuser:
+        if context.is_superuser:
             return True
         
         # For club-related objects
         if hasattr(obj, 'club'):
-            return user_can_manage_club(request.user, obj.club)
+            return user_can_manage_club(request.user, obj.club, context=context)
         
         # For chapter-related objects
         if hasattr(obj, 'chapter'):
-            return user_can_manage_chapter(request.user, obj.chapter)
+            return user_can_manage_chapter(request.user, obj.chapter, context=context)
         
         # For direct club objects
         if isinstance(obj, Club):
-            return user_can_manage_club(request.user, obj)
+            return user_can_manage_club(request.user, obj, context=context)
         
         # For direct chapter objects
         if isinstance(obj, Chapter):
-            return user_can_manage_chapter(request.user, obj)
+            return user_can_manage_chapter(request.user, obj, context=context)
         
         # Default to basic permission check
-        is_club_admin = ClubAdmin.objects.filter(user=request.user).exists()
-        is_chapter_admin = ChapterAdmin.objects.filter(user=request.user).exists()
-        
-        return is_club_admin or is_chapter_admin
+        return context.is_admin
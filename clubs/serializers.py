@@ -3,13 +3,29 @@ from rest_framework.exceptions import PermissionDenied
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.templatetags.static import static
+from django.db.models import Count, Q
 import os
 import logging
 from .models import Club, Chapter, Member, ClubAdmin, ChapterAdmin, ChapterJoinRequest
+from .permissions import get_permission_context
 
 logger = logging.getLogger(__name__)
 
 
+class PrefetchingListSerializer(serializers.ListSerializer):
+    """
+    List serializer that lets the child serializer load per-row data for the
+    whole page up front (see ``prefetch_page``) instead of querying per object
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, 'all') else data)
+        prefetch_page = getattr(self.child, 'prefetch_page', None)
+        if instances and prefetch_page is not None:
+            prefetch_page(instances)
+        return super().to_representation(instances)
+
+
 class ClubSerializer(serializers.ModelSerializer):
     logo_url = serializers.SerializerMethodField()
     featured_members = serializers.SerializerMethodField()
@@ -21,6 +37,7 @@ class ClubSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'foundation_date', 'logo', 'logo_url', 'website',
             'featured_members', 'created_at', 'updated_at', 'total_members'
         ]
+        list_serializer_class = PrefetchingListSerializer
     
     def validate_name(self, value):
         """
@@ -75,30 +92,58 @@ class ClubSerializer(serializers.ModelSerializer):
         # Return None if no logo available
         return None
 
-    def get_featured_members(self, obj):
+    @staticmethod
+    def _featured_members_queryset():
         """
-        Return all members with national roles for this club
+        Members with a national role, in the order they are featured
         """
-        # Get all members of this club that have a national role
-        featured_members = Member.objects.filter(
-            chapter__club=obj,
+        return Member.objects.filter(
             national_role__isnull=False,
             national_role__gt='',  # Exclude empty strings
             is_active=True
         ).select_related('chapter').order_by('national_role', 'first_name', 'last_name')
+
+    def prefetch_page(self, clubs):
+        """
+        Load featured members and member counts for a page of clubs with two
+        queries, so list serialization doesn't query once per club
+        """
+        club_ids = [club.pk for club in clubs]
+
+        featured_by_club = {club_id: [] for club_id in club_ids}
+        for member in self._featured_members_queryset().filter(chapter__club_id__in=club_ids):
+            featured_by_club[member.chapter.club_id].append(member)
+
+        member_counts = dict(
+            Member.objects.filter(chapter__club_id__in=club_ids)
+            .order_by()
+            .values('chapter__club_id')
+            .annotate(count=Count('id'))
+            .values_list('chapter__club_id', 'count')
+        )
+
+        for club in clubs:
+            club._featured_members = featured_by_club[club.pk]
+            club._member_count = member_counts.get(club.pk, 0)
+
+    def get_featured_members(self, obj):
+        """
+        Return all members with national roles for this club
+        """
+        # Use the page-level prefetch when serializing a list
+        featured_members = getattr(obj, '_featured_members', None)
+        if featured_members is None:
+            featured_members = self._featured_members_queryset().filter(chapter__club=obj)
         
         # Get request context for building absolute URLs
         request = self.context.get('request')
+        national_role_labels = dict(Member.NATIONAL_ROLE_CHOICES)
         
         # Serialize the featured members
         featured_data = []
         for member in featured_members:
             # Get the human-readable national role
-            national_role_display = None
-            for choice_value, choice_label in Member.NATIONAL_ROLE_CHOICES:
-                if choice_value == member.national_role:
-                    national_role_display = choice_label
-                    break
+            national_role_display = national_role_labels.get(member.national_role)
                 
             # Build absolute URL for profile picture with flexible storage backend
             profile_picture_url = None
@@ -142,12 +187,17 @@ class ClubSerializer(serializers.ModelSerializer):
         """
         Return the total number of members for this club
         """
+        member_count = getattr(obj, '_member_count', None)
+        if member_count is not None:
+            return member_count
         return Member.objects.filter(chapter__club=obj).count()
 
 
 class ChapterSerializer(serializers.ModelSerializer):
     club = serializers.PrimaryKeyRelatedField(queryset=Club.objects.all())
     total_members = serializers.SerializerMethodField()
+    active_members = serializers.SerializerMethodField()
+    member_breakdown = serializers.SerializerMethodField()
     latitude = serializers.SerializerMethodField()
     longitude = serializers.SerializerMethodField()
 
@@ -158,14 +208,87 @@ class ChapterSerializer(serializers.ModelSerializer):
             'city', 'state_new', 'location', 'latitude', 'longitude',
             'owner', 'is_active', 'is_public', 'accepts_new_members',
             'meeting_info', 'contact_email',
-            'created_at', 'updated_at', 'total_members'
+            'created_at', 'updated_at', 'total_members', 'active_members',
+            'member_breakdown'
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    @staticmethod
+    def get_member_stats(chapter_ids):
+        """
+        Return member statistics per chapter id, computed with one conditional
+        aggregation over all the given chapters. The role and member type
+        breakdowns count active members only.
+        """
+        aggregates = {
+            'total': Count('id'),
+            'active': Count('id', filter=Q(is_active=True)),
+        }
+        for role, _ in Member.ROLE_CHOICES:
+            aggregates[f'role_{role}'] = Count('id', filter=Q(is_active=True, role=role))
+        for member_type, _ in Member.MEMBER_TYPE_CHOICES:
+            aggregates[f'type_{member_type}'] = Count(
+                'id', filter=Q(is_active=True, member_type=member_type)
+            )
+
+        rows = (
+            Member.objects.filter(chapter_id__in=chapter_ids)
+            .order_by()
+            .values('chapter_id')
+            .annotate(**aggregates)
+        )
+
+        empty_row = {name: 0 for name in aggregates}
+        rows_by_chapter = {row['chapter_id']: row for row in rows}
+
+        stats = {}
+        for chapter_id in chapter_ids:
+            row = rows_by_chapter.get(chapter_id, empty_row)
+            stats[chapter_id] = {
+                'total_members': row['total'],
+                'active_members': row['active'],
+                'member_breakdown': {
+                    'by_role': {
+                        role: row[f'role_{role}'] for role, _ in Member.ROLE_CHOICES
+                    },
+                    'by_member_type': {
+                        member_type: row[f'type_{member_type}']
+                        for member_type, _ in Member.MEMBER_TYPE_CHOICES
+                    },
+                },
+            }
+        return stats
+
+    def prefetch_page(self, chapters):
+        """
+        Load member statistics for a page of chapters in a single query
+        """
+        stats = self.get_member_stats([chapter.pk for chapter in chapters])
+        for chapter in chapters:
+            chapter._member_stats = stats[chapter.pk]
+
+    def _member_stats(self, obj):
+        if getattr(obj, '_member_stats', None) is None:
+            obj._member_stats = self.get_member_stats([obj.pk])[obj.pk]
+        return obj._member_stats
 
     def get_total_members(self, obj):
         """
         Return the total number of members for this chapter
         """
-        return Member.objects.filter(chapter=obj).count()
+        return self._member_stats(obj)['total_members']
+
+    def get_active_members(self, obj):
+        """
+        Return the number of active members for this chapter
+        """
+        return self._member_stats(obj)['active_members']
+
+    def get_member_breakdown(self, obj):
+        """
+        Return active member counts per role and per member type
+        """
+        return self._member_stats(obj)['member_breakdown']
     
     def get_latitude(self, obj):
         """
@@ -294,8 +417,7 @@ class ChapterAdminSerializer(serializers.ModelSerializer):
         
         # Ensure club admins can only assign chapter admins to chapters in their clubs
         if request and not request.user.is_superuser:
-            user_clubs = Club.objects.filter(admins__user=request.user)
-            if chapter and chapter.club not in user_clubs:
+            if chapter and not get_permission_context(request).can_manage_club(chapter.club_id):
                 raise PermissionDenied("You can only assign chapter admins to chapters in clubs you manage.")
         
         return data
@@ -0,0 +1,200 @@
+"""
+Django Signals for the clubs app
+Keeps the denormalized Club.total_members / Club.total_chapters counters up to
+date by applying deltas when chapters and members are created, deleted, moved
+or (de)activated, and invalidates cached public API responses
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_public_api_cache
+from .models import Club, Chapter, Member
+
+
+def adjust_club_stats(club_id, members=0, chapters=0, cached_club=None):
+    """
+    Apply counter deltas to a club in the database, and mirror them on an
+    already loaded Club instance so callers holding it see the new values
+    """
+    if not club_id or not (members or chapters):
+        return
+
+    Club.adjust_stats(club_id, members=members, chapters=chapters)
+
+    if cached_club is not None and cached_club.pk == club_id:
+        cached_club.total_members = max(cached_club.total_members + members, 0)
+        cached_club.total_chapters = max(cached_club.total_chapters + chapters, 0)
+
+
+def _cached_club(chapter):
+    """Return the chapter's club instance if it is already loaded"""
+    if chapter is None:
+        return None
+    return chapter._state.fields_cache.get('club')
+
+
+def _was_active(instance):
+    """Return the persisted is_active value of a chapter or member"""
+    return instance.saved_value('is_active', instance.is_active)
+
+
+def _origin_model(origin):
+    """Return the model class a deletion started from"""
+    if isinstance(origin, QuerySet):
+        return origin.model
+    return type(origin)
+
+
+def _member_club_id(chapter, is_active):
+    """
+    Return the club id a member counts towards, or None when the member
+    doesn't count (inactive member or inactive chapter)
+    """
+    if chapter is None or not (is_active and chapter.is_active):
+        return None
+    return chapter.club_id
+
+
+@receiver(post_save, sender=Chapter)
+def update_club_stats_on_chapter_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Adjust club counters when a chapter is created, (de)activated or moved
+    """
+    if raw:
+        return
+
+    previous = None if created else instance.saved_values('club_id', 'is_active')
+    current = instance.get_stats_state()
+
+    if created:
+        # A new chapter has no members yet
+        if instance.is_active:
+            adjust_club_stats(instance.club_id, chapters=1, cached_club=_cached_club(instance))
+        return
+
+    if previous is None:
+        # Previous state unknown (instance not loaded from the database)
+        if instance.club_id:
+            instance.club.update_stats()
+        return
+
+    if previous == current:
+        return
+
+    previous_club_id, was_active = previous
+    active_members = Member.objects.filter(chapter=instance, is_active=True).count()
+
+    if was_active:
+        adjust_club_stats(previous_club_id, members=-active_members, chapters=-1,
+                          cached_club=_cached_club(instance))
+    if instance.is_active:
+        adjust_club_stats(instance.club_id, members=active_members, chapters=1,
+                          cached_club=_cached_club(instance))
+
+
+@receiver(pre_delete, sender=Chapter)
+def count_members_before_chapter_delete(sender, instance, origin=None, **kwargs):
+    """
+    Count the chapter's active members before they are cascade-deleted
+    """
+    if origin is not None and issubclass(_origin_model(origin), Club):
+        return
+
+    instance._active_members_at_delete = 0
+    if _was_active(instance):
+        instance._active_members_at_delete = Member.objects.filter(
+            chapter=instance, is_active=True
+        ).count()
+
+
+@receiver(post_delete, sender=Chapter)
+def update_club_stats_on_chapter_delete(sender, instance, origin=None, **kwargs):
+    """
+    Remove a deleted chapter and its members from the club counters
+    """
+    if origin is not None and issubclass(_origin_model(origin), Club):
+        # The club itself is being deleted
+        return
+
+    if _was_active(instance):
+        adjust_club_stats(
+            instance.club_id,
+            members=-getattr(instance, '_active_members_at_delete', 0),
+            chapters=-1,
+            cached_club=_cached_club(instance),
+        )
+
+
+@receiver(post_save, sender=Member)
+def update_club_stats_on_member_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Adjust club counters when a member is created, (de)activated or moved
+    """
+    if raw:
+        return
+
+    previous = None if created else instance.saved_values('chapter_id', 'is_active')
+    current = instance.get_stats_state()
+
+    if created:
+        club_id = _member_club_id(instance.chapter, instance.is_active)
+        adjust_club_stats(club_id, members=1, cached_club=_cached_club(instance.chapter))
+        return
+
+    if previous is None:
+        # Previous state unknown (instance not loaded from the database)
+        instance.chapter.club.update_stats()
+        return
+
+    if previous == current:
+        return
+
+    previous_chapter_id, was_active = previous
+    if previous_chapter_id == instance.chapter_id:
+        previous_chapter = instance.chapter
+    else:
+        previous_chapter = Chapter.objects.filter(pk=previous_chapter_id).only(
+            'club_id', 'is_active'
+        ).first()
+
+    previous_club_id = _member_club_id(previous_chapter, was_active)
+    current_club_id = _member_club_id(instance.chapter, instance.is_active)
+    if previous_club_id == current_club_id:
+        return
+
+    adjust_club_stats(previous_club_id, members=-1, cached_club=_cached_club(previous_chapter))
+    adjust_club_stats(current_club_id, members=1, cached_club=_cached_club(instance.chapter))
+
+
+@receiver(post_delete, sender=Member)
+def update_club_stats_on_member_delete(sender, instance, origin=None, **kwargs):
+    """
+    Remove a deleted member from the club counters
+    """
+    if origin is not None and issubclass(_origin_model(origin), (Club, Chapter)):
+        # Handled by the chapter delete signals (or the club is going away)
+        return
+
+    chapter = instance._state.fields_cache.get('chapter')
+    if chapter is None:
+        chapter = Chapter.objects.filter(pk=instance.chapter_id).only('club_id', 'is_active').first()
+    adjust_club_stats(
+        _member_club_id(chapter, _was_active(instance)),
+        members=-1,
+        cached_club=_cached_club(chapter),
+    )
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+@receiver(post_save, sender=Chapter)
+@receiver(post_delete, sender=Chapter)
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_public_responses(sender, **kwargs):
+    """
+    Invalidate cached public club/chapter/member responses
+    """
+    invalidate_public_api_cache()
@@ -5,3 +5,9 @@ class GeographyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geography'
     verbose_name = 'Geography'
+
+    def ready(self):
+        """
+        Import signal handlers when Django starts
+        """
+        import geography.signals  # noqa: F401
@@ -0,0 +1,68 @@
+"""
+GeoJSON boundaries for choropleth / outline map layers
+
+Country and State boundaries are served from the simplified copies kept on the
+models (see SimplifiedBoundaryModel), picked from the client's ?zoom, with
+coordinates rounded to a precision matching that simplification. Responses are
+cached per geography namespace version (bumped on Country/State changes, see
+geography.signals) along with an ETag, so clients can revalidate cheaply.
+"""
+
+import hashlib
+import json
+
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from motomundo.cache import cache_get, cache_set, get_version
+from .models import Country, State, resolution_for_zoom
+from .tiles import GEOGRAPHY_NAMESPACE
+
+BOUNDARY_CACHE_TIMEOUT = 24 * 60 * 60
+
+LAYERS = {
+    'countries': (Country, ('id', 'name', 'code')),
+    'states': (State, ('id', 'name', 'code', 'country_id')),
+}
+
+
+def render_feature_collection(layer, zoom, country_id=None):
+    """Build the FeatureCollection JSON text for a layer at a zoom level"""
+    model, properties = LAYERS[layer]
+    level, precision = resolution_for_zoom(zoom)
+
+    queryset = model.objects.filter(boundary__isnull=False)
+    if country_id is not None and layer == 'states':
+        queryset = queryset.filter(country_id=country_id)
+
+    rows = queryset.annotate(
+        # Fall back to the full boundary for rows not simplified yet
+        geojson=AsGeoJSON(Coalesce(F(f'boundary_{level}'), F('boundary')), precision=precision),
+    ).order_by('id').values_list('geojson', *properties)
+
+    # Geometries come back as JSON text from PostGIS, splice them in as-is
+    features = []
+    for geojson, *values in rows:
+        props = dict(zip(properties, values))
+        features.append(
+            f'{{"type":"Feature","id":{props["id"]},'
+            f'"properties":{json.dumps(props, separators=(",", ":"))},'
+            f'"geometry":{geojson}}}'
+        )
+    return '{"type":"FeatureCollection","features":[' + ','.join(features) + ']}'
+
+
+def get_feature_collection(layer, zoom, country_id=None):
+    """Return (body, etag) for a layer, from the cache when possible"""
+    level, _precision = resolution_for_zoom(zoom)
+    version = get_version(GEOGRAPHY_NAMESPACE)
+    key = f'boundaries:{version}:{layer}:{level}:{country_id or ""}'
+
+    entry = cache_get(key) if version is not None else None
+    if entry is None:
+        body = render_feature_collection(layer, zoom, country_id)
+        entry = {'body': body, 'etag': '"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()}
+        if version is not None:
+            cache_set(key, entry, BOUNDARY_CACHE_TIMEOUT)
+    return entry['body'], entry['etag']
@@ -0,0 +1,40 @@
+"""
+Management command to (re)compute the simplified boundary copies of every
+Country and State, e.g. after bulk-loading boundaries or changing
+BOUNDARY_TOLERANCES
+"""
+
+from django.contrib.gis.db.models import MultiPolygonField
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Func, Value
+
+from geography.models import BOUNDARY_TOLERANCES, Country, State
+from geography.tiles import GEOGRAPHY_NAMESPACE
+from motomundo.cache import invalidate_namespace
+
+
+def simplified(tolerance):
+    return Func(
+        Func(F('boundary'), Value(tolerance), function='ST_SimplifyPreserveTopology'),
+        function='ST_Multi',
+        output_field=MultiPolygonField(srid=4326),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recompute simplified Country and State boundaries in the database'
+
+    def handle(self, *args, **options):
+        columns = {
+            f'boundary_{level}': simplified(tolerance)
+            for level, tolerance in BOUNDARY_TOLERANCES.items()
+        }
+        with transaction.atomic():
+            for model in (Country, State):
+                # update() doesn't send save signals
+                updated = model.objects.filter(boundary__isnull=False).update(**columns)
+                self.stdout.write(f'{model._meta.verbose_name_plural}: {updated} simplified')
+            invalidate_namespace(GEOGRAPHY_NAMESPACE)
+
+        self.stdout.write(self.style.SUCCESS('Simplified boundaries updated'))
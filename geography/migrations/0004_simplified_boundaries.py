@@ -0,0 +1,54 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+def simplified_columns_sql(table):
+    return f"""
+    UPDATE {table} SET
+        boundary_low = ST_Multi(ST_SimplifyPreserveTopology(boundary, 0.05)),
+        boundary_medium = ST_Multi(ST_SimplifyPreserveTopology(boundary, 0.01)),
+        boundary_high = ST_Multi(ST_SimplifyPreserveTopology(boundary, 0.002))
+    WHERE boundary IS NOT NULL;
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0003_alter_state_unique_together_country_boundary_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='country',
+            name='boundary_high',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for high zoom levels', null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='country',
+            name='boundary_low',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for low zoom levels', null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='country',
+            name='boundary_medium',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for medium zoom levels', null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='state',
+            name='boundary_high',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for high zoom levels', null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='state',
+            name='boundary_low',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for low zoom levels', null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='state',
+            name='boundary_medium',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified for medium zoom levels', null=True, srid=4326),
+        ),
+        migrations.RunSQL(simplified_columns_sql('geography_country'), migrations.RunSQL.noop),
+        migrations.RunSQL(simplified_columns_sql('geography_state'), migrations.RunSQL.noop),
+    ]
@@ -1,7 +1,76 @@
 from django.contrib.gis.db import models as gis_models
+from django.contrib.gis.geos import MultiPolygon
 from django.db import models
 
-class Country(models.Model):
+# Simplification tolerances in degrees (SRID 4326), coarsest first
+BOUNDARY_TOLERANCES = {
+    'low': 0.05,
+    'medium': 0.01,
+    'high': 0.002,
+}
+
+# (maximum zoom, simplified boundary level, GeoJSON coordinate decimals)
+ZOOM_RESOLUTIONS = (
+    (4, 'low', 2),
+    (7, 'medium', 3),
+    (None, 'high', 4),
+)
+
+
+def resolution_for_zoom(zoom):
+    """Return (level, precision) for a map zoom level"""
+    for max_zoom, level, precision in ZOOM_RESOLUTIONS:
+        if max_zoom is None or zoom <= max_zoom:
+            return level, precision
+
+
+def simplify_boundary(boundary, tolerance):
+    """Topology-preserving simplification of a boundary, always a MultiPolygon"""
+    if boundary is None:
+        return None
+    simplified = boundary.simplify(tolerance, preserve_topology=True)
+    if simplified.empty:
+        return None
+    if simplified.geom_type == 'Polygon':
+        simplified = MultiPolygon(simplified, srid=boundary.srid)
+    return simplified
+
+
+class SimplifiedBoundaryModel(models.Model):
+    """
+    Adds precomputed simplified copies of `boundary` at each of
+    BOUNDARY_TOLERANCES, refreshed on save (or in bulk by the
+    simplify_boundaries command)
+    """
+    boundary_low = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, help_text="Boundary simplified for low zoom levels"
+    )
+    boundary_medium = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, help_text="Boundary simplified for medium zoom levels"
+    )
+    boundary_high = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, help_text="Boundary simplified for high zoom levels"
+    )
+
+    class Meta:
+        abstract = True
+
+    def update_simplified_boundaries(self):
+        for level, tolerance in BOUNDARY_TOLERANCES.items():
+            setattr(self, f'boundary_{level}', simplify_boundary(self.boundary, tolerance))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'boundary' in update_fields:
+            self.update_simplified_boundaries()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    f'boundary_{level}' for level in BOUNDARY_TOLERANCES
+                }
+        super().save(*args, **kwargs)
+
+
+class Country(SimplifiedBoundaryModel):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=3, unique=True, help_text="ISO 3166-1 alpha-2 code")
     
@@ -16,7 +85,7 @@ class Country(models.Model):
     def __str__(self):
         return self.name
 
-class State(models.Model):
+class State(SimplifiedBoundaryModel):
     name = models.CharField(max_length=100)
     country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='states')
     code = models.CharField(max_length=10, blank=True, help_text="State/province code")
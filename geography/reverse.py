@@ -0,0 +1,89 @@
+"""
+In-process reverse geocoding: which State and Country contain a point
+
+Each worker keeps the State and Country boundaries as prepared GEOS geometries
+in a coarse grid of CELL_SIZE degree cells, keyed by the cells their bounding
+box overlaps. A lookup reads one cell, drops candidates whose bounding box
+misses the point and runs a prepared `contains` on the rest, without touching
+the database. Like the geography snapshot, the index is rebuilt when the
+geography cache namespace version changes (see geography.signals).
+"""
+
+import math
+
+from .models import Country, State
+from motomundo.cache import VersionedProcessCache
+from .snapshot import get_snapshot
+from .tiles import GEOGRAPHY_NAMESPACE
+
+CELL_SIZE = 1.0
+
+
+def _cell(lng, lat):
+    return math.floor(lng / CELL_SIZE), math.floor(lat / CELL_SIZE)
+
+
+class BoundaryIndex:
+    """Grid index of prepared boundaries for one model"""
+
+    def __init__(self, rows):
+        self.cells = {}
+        for pk, boundary in rows:
+            if boundary is None or boundary.empty:
+                continue
+            min_lng, min_lat, max_lng, max_lat = boundary.extent
+            entry = (pk, (min_lng, min_lat, max_lng, max_lat), boundary.prepared)
+            min_x, min_y = _cell(min_lng, min_lat)
+            max_x, max_y = _cell(max_lng, max_lat)
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    self.cells.setdefault((x, y), []).append(entry)
+
+    def find(self, point):
+        """Return the id of the first boundary containing the point, or None"""
+        lng, lat = point.x, point.y
+        for pk, (min_lng, min_lat, max_lng, max_lat), prepared in self.cells.get(_cell(lng, lat), ()):
+            if min_lng <= lng <= max_lng and min_lat <= lat <= max_lat and prepared.contains(point):
+                return pk
+        return None
+
+
+class ReverseGeocoder:
+    """Prepared State and Country boundary indexes"""
+
+    def __init__(self):
+        self.states = BoundaryIndex(State.objects.order_by('id').values_list('id', 'boundary'))
+        self.countries = BoundaryIndex(Country.objects.order_by('id').values_list('id', 'boundary'))
+
+    def lookup(self, point, snapshot):
+        """
+        Return the serialized (state, country) containing a WGS84 point, from
+        the geography snapshot; either may be None
+        """
+        state = snapshot.states_by_id.get(self.states.find(point))
+        if state is not None:
+            return state, snapshot.countries_by_id.get(state['country'])
+        return None, snapshot.countries_by_id.get(self.countries.find(point))
+
+
+_geocoder = VersionedProcessCache(GEOGRAPHY_NAMESPACE, ReverseGeocoder)
+
+
+def get_geocoder():
+    """Return the current index, rebuilding it if geography data changed"""
+    return _geocoder.get()
+
+
+def clear_geocoder():
+    _geocoder.clear()
+
+
+def reverse_geocode(points):
+    """Return a {'state': ..., 'country': ...} dict for each point"""
+    geocoder = get_geocoder()
+    snapshot = get_snapshot()
+    results = []
+    for point in points:
+        state, country = geocoder.lookup(point, snapshot)
+        results.append({'state': state, 'country': country})
+    return results
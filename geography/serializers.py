@@ -11,6 +11,9 @@ class CountrySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'code', 'states_count', 'location_coordinates', 'has_location']
     
     def get_states_count(self, obj):
+        # Annotated by geography.snapshot.country_queryset
+        if hasattr(obj, 'states_count'):
+            return obj.states_count
         return obj.states.count()
     
     def get_location_coordinates(self, obj):
@@ -0,0 +1,34 @@
+"""
+Django Signals for the geography app
+Invalidates cached map tiles and geography data when the underlying rows change
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from clubs.models import Club, Chapter
+from motomundo.cache import invalidate_namespace
+from .models import Country, State
+from .tiles import GEOGRAPHY_NAMESPACE, MAP_TILES_NAMESPACE
+
+
+@receiver(post_save, sender=Chapter)
+@receiver(post_delete, sender=Chapter)
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_map_tiles(sender, **kwargs):
+    """
+    Chapters moved, (un)published or renamed, or club details changed
+    """
+    invalidate_namespace(MAP_TILES_NAMESPACE)
+
+
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def invalidate_geography(sender, **kwargs):
+    """
+    State or country names or boundaries changed
+    """
+    invalidate_namespace(GEOGRAPHY_NAMESPACE)
@@ -0,0 +1,63 @@
+"""
+In-process snapshot of the geography reference data
+
+Countries and states almost never change, so each worker serializes them once
+(states counted in the same query, boundary geometries deferred) and serves
+the geography API from memory. The snapshot is tagged with the geography cache
+namespace version, bumped on every Country/State save or delete (see
+geography.signals), so an admin edit in any process makes every worker reload
+on its next request. When the cache is unavailable the snapshot is reloaded
+after a short while instead.
+"""
+
+import time
+
+from django.db.models import Count
+
+from motomundo.cache import VersionedProcessCache
+from .models import BOUNDARY_TOLERANCES, Country, State
+from .serializers import CountrySerializer, StateSerializer
+from .tiles import GEOGRAPHY_NAMESPACE
+
+BOUNDARY_FIELDS = ('boundary',) + tuple(f'boundary_{level}' for level in BOUNDARY_TOLERANCES)
+
+
+def country_queryset():
+    """Countries with states_count annotated and boundaries deferred"""
+    return Country.objects.defer(*BOUNDARY_FIELDS).annotate(states_count=Count('states'))
+
+
+def state_queryset():
+    """States with their country joined and boundaries deferred"""
+    return State.objects.select_related('country').defer(
+        *BOUNDARY_FIELDS, *(f'country__{field}' for field in BOUNDARY_FIELDS)
+    )
+
+
+class GeographySnapshot:
+    """Serialized countries and states, indexed for the geography endpoints"""
+
+    def __init__(self):
+        # Changes on every rebuild, used for ETags
+        self.revision = time.time_ns()
+        # Plain lists, so the model instances aren't kept alive with the data
+        self.countries = list(CountrySerializer(country_queryset(), many=True).data)
+        self.states = list(StateSerializer(state_queryset(), many=True).data)
+
+        self.countries_by_id = {country['id']: country for country in self.countries}
+        self.states_by_id = {state['id']: state for state in self.states}
+        self.states_by_country = {}
+        for state in self.states:
+            self.states_by_country.setdefault(state['country'], []).append(state)
+
+
+_snapshot = VersionedProcessCache(GEOGRAPHY_NAMESPACE, GeographySnapshot)
+
+
+def get_snapshot():
+    """Return the current snapshot, reloading it if geography data changed"""
+    return _snapshot.get()
+
+
+def clear_snapshot():
+    _snapshot.clear()
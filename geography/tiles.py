@@ -0,0 +1,92 @@
+"""
+Mapbox Vector Tiles (MVT) for the chapter map
+
+Each XYZ (web mercator) tile holds two layers built by PostGIS with ST_AsMVT:
+- chapters: active public chapter points with club and active member count
+- states: State boundaries, from the simplified copy matching the zoom level
+
+Tiles are cached as bytes under two namespace versions: MAP_TILES_NAMESPACE,
+bumped when chapters or clubs change (see geography.signals), and the
+geography namespace, bumped when states or countries change. Member counts
+may lag by up to TILE_CACHE_TIMEOUT.
+"""
+
+from django.db import connection
+
+from motomundo.cache import cache_get, cache_set, get_version
+from .models import resolution_for_zoom
+
+MAP_TILES_NAMESPACE = 'map-tiles'
+GEOGRAPHY_NAMESPACE = 'geography'
+TILE_CACHE_TIMEOUT = 3600
+MAX_ZOOM = 22
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS env,
+           ST_Transform(ST_TileEnvelope(%(z)s, %(x)s, %(y)s), 4326) AS env_4326
+),
+chapters AS (
+    SELECT ch.id,
+           ch.name,
+           ch.club_id,
+           cl.name AS club_name,
+           cl.club_type,
+           (SELECT count(*) FROM clubs_member m
+            WHERE m.chapter_id = ch.id AND m.is_active) AS member_count,
+           ST_AsMVTGeom(ST_Transform(ch.location, 3857), bounds.env, %(extent)s, %(buffer)s, true) AS geom
+    FROM clubs_chapter ch
+    JOIN clubs_club cl ON cl.id = ch.club_id
+    CROSS JOIN bounds
+    WHERE ch.location && bounds.env_4326
+      AND ch.is_active AND ch.is_public AND cl.is_public
+),
+states AS (
+    SELECT st.id,
+           st.name,
+           st.code,
+           st.country_id,
+           ST_AsMVTGeom(ST_Transform(coalesce(st.{boundary_column}, st.boundary), 3857), bounds.env, %(extent)s, %(buffer)s, true) AS geom
+    FROM geography_state st
+    CROSS JOIN bounds
+    WHERE st.boundary && bounds.env_4326
+)
+SELECT
+    coalesce((SELECT ST_AsMVT(chapters, 'chapters', %(extent)s, 'geom') FROM chapters WHERE geom IS NOT NULL), ''::bytea)
+    || coalesce((SELECT ST_AsMVT(states, 'states', %(extent)s, 'geom') FROM states WHERE geom IS NOT NULL), ''::bytea)
+"""
+
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def render_tile(z, x, y):
+    """Build the MVT bytes for a tile"""
+    level, _precision = resolution_for_zoom(z)
+    sql = TILE_SQL.format(boundary_column=f'boundary_{level}')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'z': z, 'x': x, 'y': y,
+            'extent': TILE_EXTENT, 'buffer': TILE_BUFFER,
+        })
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile else b''
+
+
+def get_tile(z, x, y):
+    """Return the MVT bytes for a tile, from the cache when possible"""
+    tiles_version = get_version(MAP_TILES_NAMESPACE)
+    geography_version = get_version(GEOGRAPHY_NAMESPACE)
+    if tiles_version is None or geography_version is None:
+        return render_tile(z, x, y)
+
+    key = f'mvt:{tiles_version}:{geography_version}:{z}:{x}:{y}'
+    tile = cache_get(key)
+    if tile is None:
+        tile = render_tile(z, x, y)
+        cache_set(key, tile, TILE_CACHE_TIMEOUT)
+    return tile
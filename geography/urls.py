@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CountryViewSet, StateViewSet
+from .views import CountryViewSet, ReverseGeocodeViewSet, StateViewSet, boundaries_geojson, vector_tile
 
 router = DefaultRouter()
 router.register(r'countries', CountryViewSet)
 router.register(r'states', StateViewSet)
+router.register(r'reverse', ReverseGeocodeViewSet, basename='reverse-geocode')
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', vector_tile, name='vector_tile'),
+    path('boundaries/<str:layer>.geojson', boundaries_geojson, name='boundaries_geojson'),
 ]
@@ -5,34 +5,88 @@ from rest_framework.permissions import AllowAny
 from django.contrib.gis.geos import Point
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.measure import D
-from .models import Country, State
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_GET
+from clubs.geo import parse_point
+from .boundaries import LAYERS, get_feature_collection
+from .snapshot import country_queryset, get_snapshot, state_queryset
+from .reverse import reverse_geocode
 from .serializers import CountrySerializer, StateSerializer
+from .tiles import MAX_ZOOM, get_tile, is_valid_tile
 
-class CountryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Country.objects.all()
+class GeographySnapshotMixin:
+    """
+    Serve list/retrieve from the in-process geography snapshot (see
+    geography.snapshot) with an ETag. Requests using ?ordering= or ?search=
+    go to the database.
+    """
+    snapshot_name = None
+
+    def use_snapshot(self, request):
+        return not any(param in request.query_params for param in ('ordering', 'search'))
+
+    def snapshot_response(self, request, snapshot, data, paginate=False):
+        etag = f'"geo-{snapshot.revision}-{request.accepted_renderer.format}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif paginate and (page := self.paginate_queryset(data)) is not None:
+            response = self.get_paginated_response(page)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+    def get_snapshot_object(self, snapshot):
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            raise Http404
+        obj = getattr(snapshot, f'{self.snapshot_name}_by_id').get(pk)
+        if obj is None:
+            raise Http404
+        return obj
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_snapshot(request):
+            return super().list(request, *args, **kwargs)
+        snapshot = get_snapshot()
+        return self.snapshot_response(request, snapshot, getattr(snapshot, self.snapshot_name), paginate=True)
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = get_snapshot()
+        return self.snapshot_response(request, snapshot, self.get_snapshot_object(snapshot))
+
+
+class CountryViewSet(GeographySnapshotMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = country_queryset()
     serializer_class = CountrySerializer
     permission_classes = [AllowAny]  # Allow public access for geographic data
+    snapshot_name = 'countries'
     
     @action(detail=True, methods=['get'])
     def states(self, request, pk=None):
         """Get all states for a country"""
-        country = self.get_object()
-        states = country.states.all()
-        serializer = StateSerializer(states, many=True)
-        return Response(serializer.data)
+        snapshot = get_snapshot()
+        country = self.get_snapshot_object(snapshot)
+        states = snapshot.states_by_country.get(country['id'], [])
+        return self.snapshot_response(request, snapshot, states)
     
     @action(detail=True, methods=['get'])
     def states_with_coordinates(self, request, pk=None):
         """Get all states with geographic coordinates"""
-        country = self.get_object()
-        states = country.states.filter(location__isnull=False)
-        serializer = StateSerializer(states, many=True)
-        return Response(serializer.data)
+        snapshot = get_snapshot()
+        country = self.get_snapshot_object(snapshot)
+        states = [
+            state for state in snapshot.states_by_country.get(country['id'], [])
+            if state['has_location']
+        ]
+        return self.snapshot_response(request, snapshot, states)
 
-class StateViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = State.objects.select_related('country')
+class StateViewSet(GeographySnapshotMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = state_queryset()
     serializer_class = StateSerializer
     permission_classes = [AllowAny]  # Allow public access for geographic data
+    snapshot_name = 'states'
     
     @action(detail=False, methods=['get'])
     def nearby(self, request):
@@ -45,7 +99,7 @@ class StateViewSet(viewsets.ReadOnlyModelViewSet):
             point = Point(lng, lat)  # PostGIS uses (longitude, latitude)
             
             # Find states within distance
-            nearby_states = State.objects.filter(
+            nearby_states = state_queryset().filter(
                 location__isnull=False,
                 location__distance_lte=(point, D(km=distance_km))
             ).annotate(
@@ -68,6 +122,98 @@ class StateViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def with_coordinates(self, request):
         """Get all states that have coordinates"""
-        states = State.objects.filter(location__isnull=False).select_related('country')
-        serializer = StateSerializer(states, many=True)
-        return Response(serializer.data)
+        snapshot = get_snapshot()
+        states = [state for state in snapshot.states if state['has_location']]
+        return self.snapshot_response(request, snapshot, states)
+
+
+class ReverseGeocodeViewSet(viewsets.ViewSet):
+    """
+    State and Country containing a point, answered from the in-process
+    boundary index (see geography.reverse)
+    GET  /geography/api/reverse/?lat=<lat>&lng=<lng>
+    POST /geography/api/reverse/batch/ {"points": [{"lat": .., "lng": ..}, ...]}
+    """
+    permission_classes = [AllowAny]
+    batch_max_points = 500
+
+    def list(self, request):
+        try:
+            point = parse_point(request.query_params.get('lat'), request.query_params.get('lng'))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid coordinates. Provide lat and lng.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        result, = reverse_geocode([point])
+        return Response({'lat': point.y, 'lng': point.x, **result})
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        points = request.data.get('points') if isinstance(request.data, dict) else None
+        if not isinstance(points, list) or not 0 < len(points) <= self.batch_max_points:
+            return Response(
+                {'error': f'Provide "points", a list of 1 to {self.batch_max_points} {{"lat", "lng"}} objects.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            parsed = [parse_point(point['lat'], point['lng']) for point in points]
+        except (ValueError, TypeError, KeyError):
+            return Response(
+                {'error': 'Invalid coordinates. Each point needs a numeric lat and lng.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = reverse_geocode(parsed)
+        return Response({
+            'results': [
+                {'lat': point.y, 'lng': point.x, **result}
+                for point, result in zip(parsed, results)
+            ]
+        })
+
+
+@require_GET
+def vector_tile(request, z, x, y):
+    """
+    Mapbox Vector Tile with 'chapters' and 'states' layers
+    GET /geography/tiles/<z>/<x>/<y>.mvt
+    """
+    if not is_valid_tile(z, x, y):
+        raise Http404('Tile out of range')
+
+    tile = get_tile(z, x, y)
+    if not tile:
+        response = HttpResponse(status=204)
+    else:
+        response = HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+@require_GET
+def boundaries_geojson(request, layer):
+    """
+    Country or State boundaries as a GeoJSON FeatureCollection, simplified for
+    the map zoom level
+    GET /geography/boundaries/<countries|states>.geojson?zoom=<z>[&country=<id>]
+    """
+    if layer not in LAYERS:
+        raise Http404('Unknown boundary layer')
+
+    try:
+        zoom = int(request.GET.get('zoom', 0))
+        country = request.GET.get('country')
+        country_id = int(country) if country else None
+    except ValueError:
+        return JsonResponse({'error': 'zoom and country must be integers'}, status=400)
+    if not 0 <= zoom <= MAX_ZOOM:
+        return JsonResponse({'error': f'zoom must be between 0 and {MAX_ZOOM}'}, status=400)
+
+    body, etag = get_feature_collection(layer, zoom, country_id)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/geo+json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=86400'
+    return response
@@ -0,0 +1,143 @@
+"""
+Small helpers around the Django cache that never let a cache outage break a
+request, plus versioned namespaces for cheap bulk invalidation.
+
+A namespace has a version number stored in the cache. Cached entries record
+the version they were computed under; bumping the version invalidates every
+entry of the namespace at once without having to find and delete keys.
+VersionedProcessCache applies the same versions to values kept in process
+memory.
+"""
+
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(namespace):
+    return f'nsversion:{namespace}'
+
+
+def _initial_version():
+    # Time based so a version evicted from the cache never restarts at a
+    # number older entries were stored under
+    return int(time.time() * 1000)
+
+
+def cache_get(key, default=None, alias='default'):
+    try:
+        return caches[alias].get(key, default)
+    except Exception as e:  # broad to capture backend issues
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return default
+
+
+def cache_set(key, value, timeout=None, alias='default'):
+    try:
+        caches[alias].set(key, value, timeout)
+        return True
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+        return False
+
+
+def cache_add(key, value, timeout=None, alias='default'):
+    """Set key only if it doesn't exist; False when it exists or the cache is down"""
+    try:
+        return caches[alias].add(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"Cache add failed for {key}: {e}")
+        return False
+
+
+def cache_delete(key, alias='default'):
+    try:
+        caches[alias].delete(key)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {key}: {e}")
+
+
+def get_version(namespace, alias='default'):
+    """
+    Return the current version of a namespace, or None if the cache is
+    unavailable (callers should then bypass the cache)
+    """
+    key = _version_key(namespace)
+    try:
+        cache = caches[alias]
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), None)
+            version = cache.get(key)
+        return version
+    except Exception as e:
+        logger.warning(f"Cache version lookup failed for {namespace}: {e}")
+        return None
+
+
+def bump_version(namespace, alias='default'):
+    """Invalidate every entry of a namespace"""
+    key = _version_key(namespace)
+    try:
+        cache = caches[alias]
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Version not set (or evicted)
+            if not cache.add(key, _initial_version(), None):
+                cache.incr(key)
+    except Exception as e:
+        logger.warning(f"Cache version bump failed for {namespace}: {e}")
+
+
+def invalidate_namespace(namespace, alias='default'):
+    """
+    Bump a namespace now and again once the current transaction commits, so
+    entries computed from pre-commit data by concurrent requests don't survive
+    the commit
+    """
+    bump_version(namespace, alias)
+    transaction.on_commit(lambda: bump_version(namespace, alias))
+
+
+class VersionedProcessCache:
+    """
+    A value built once per process by `build()` and rebuilt when the version
+    of `namespace` changes, or every `local_ttl` seconds while the cache is
+    unavailable. clear() drops the value of the current process only.
+    """
+
+    def __init__(self, namespace, build, local_ttl=60, alias='default'):
+        self.namespace = namespace
+        self.build = build
+        self.local_ttl = local_ttl
+        self.alias = alias
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = get_version(self.namespace, self.alias)
+        entry = self._entry
+        if entry is not None and self._is_current(entry, version):
+            return entry[2]
+
+        with self._lock:
+            entry = self._entry
+            if entry is None or not self._is_current(entry, version):
+                entry = (version, time.monotonic(), self.build())
+                self._entry = entry
+        return entry[2]
+
+    def clear(self):
+        self._entry = None
+
+    def _is_current(self, entry, version):
+        built_version, built_at, _value = entry
+        if version is None or built_version is None:
+            return version is None and time.monotonic() - built_at < self.local_ttl
+        return built_version == version
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # PostGIS support
+    'django.contrib.postgres',  # Full-text and trigram search
     'rest_framework',
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
@@ -93,6 +94,17 @@ CACHES = {
     }
 }
 
+# Response cache for public read endpoints of the clubs API (clubs/cache.py).
+# Unless 'ENABLED' is set here, PUBLIC_API_CACHE_ENABLED=1/0 decides, and it is
+# disabled in DEBUG so local changes made outside the ORM show up immediately.
+PUBLIC_API_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds an entry is served as fresh
+    'STALE_TIMEOUT': 600,  # extra seconds it may be served stale while recomputing
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 2.0,  # seconds a request waits for another one computing the same entry
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -0,0 +1,72 @@
+"""
+Field change tracking for models
+
+TrackedFieldsMixin remembers the values a model instance's `tracked_fields`
+had when it was loaded from the database or last saved. save() logic and
+signal handlers can then ask whether a field changed, or what its persisted
+value was, without querying the row again. In post_save handlers the saved
+values are still the ones from before the save. They are reset once save()
+returns.
+
+A field with no saved value counts as changed if it holds a value on the
+instance: every field of an instance that was never loaded or saved, and a
+field deferred at load and assigned since. A deferred field that hasn't been
+assigned still holds its persisted value, so it counts as unchanged (and its
+saved value is unknown, see saved_value()/saved_values()).
+Values are compared with ==, so mutable values (dicts, lists) must be
+replaced rather than modified in place for a change to be seen.
+"""
+
+
+class TrackedFieldsMixin:
+    """Remember the persisted values of `tracked_fields` (attnames, e.g. 'chapter_id')"""
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.reset_tracked_fields()
+        return instance
+
+    def reset_tracked_fields(self, names=None):
+        """Record the current values of the (given) tracked fields as persisted"""
+        saved = self.__dict__.setdefault('_saved_values', {})
+        for name in self.tracked_fields if names is None else names:
+            if name in self.__dict__:
+                saved[name] = self.__dict__[name]
+
+    def has_saved_value(self, name):
+        return name in self.__dict__.get('_saved_values', {})
+
+    def saved_value(self, name, default=None):
+        """The persisted value of a tracked field, or default if unknown"""
+        return self.__dict__.get('_saved_values', {}).get(name, default)
+
+    def saved_values(self, *names):
+        """The persisted values of several tracked fields, or None if any is unknown"""
+        saved = self.__dict__.get('_saved_values', {})
+        if any(name not in saved for name in names):
+            return None
+        return tuple(saved[name] for name in names)
+
+    def field_changed(self, name):
+        """Whether a tracked field differs from its persisted value"""
+        if name not in self.__dict__:
+            # Deferred and not assigned since, so still the persisted value
+            return False
+        if not self.has_saved_value(name):
+            return True
+        return self.__dict__[name] != self.saved_value(name)
+
+    def changed_fields(self):
+        """The tracked fields that differ from their persisted values"""
+        return {name for name in self.tracked_fields if self.field_changed(name)}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.reset_tracked_fields()
+        else:
+            self.reset_tracked_fields([self._meta.get_field(name).attname for name in update_fields])
@@ -0,0 +1,188 @@
+"""
+Tests for deferred, coalesced achievement rechecks
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from achievements.catalog import get_active_achievements
+from achievements.models import AchievementRecheck, UserAchievement
+from achievements.queue import queue_recheck
+from achievements.services import AchievementService
+from clubs.models import Club, Chapter, Member, ClubAdmin
+from .test_utils import create_test_image
+
+
+class AchievementQueueTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='queued', password='testpass123')
+        self.club = Club.objects.create(name='Queue Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='Queue Chapter')
+
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+
+    def create_member(self, **kwargs):
+        return Member.objects.create(
+            user=self.user, chapter=self.chapter, first_name='Queue', last_name='Rider',
+            profile_picture=create_test_image('queued.jpg'), **kwargs
+        )
+
+    def test_signals_queue_instead_of_awarding(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_member(role='president')
+            ClubAdmin.objects.create(user=self.user, club=self.club)
+
+        self.assertFalse(UserAchievement.objects.filter(user=self.user).exists())
+        recheck = AchievementRecheck.objects.get(user=self.user)
+        self.assertEqual(recheck.triggers, ['member_created', 'club_admin_assigned'])
+
+    def test_one_row_per_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_member()
+        with self.captureOnCommitCallbacks(execute=True):
+            ClubAdmin.objects.create(user=self.user, club=self.club)
+
+        recheck = AchievementRecheck.objects.get(user=self.user)
+        self.assertEqual(set(recheck.triggers), {'member_created', 'club_admin_assigned'})
+
+    def test_nothing_queued_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_member()
+        self.assertFalse(AchievementRecheck.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertTrue(AchievementRecheck.objects.filter(user=self.user).exists())
+
+    def test_rolled_back_savepoint_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    queue_recheck(self.user.id, 'rolled_back')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            queue_recheck(self.user.id, 'kept')
+
+        self.assertEqual(AchievementRecheck.objects.get(user=self.user).triggers, ['kept'])
+
+    def test_released_savepoint_is_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                queue_recheck(self.user.id, 'inner')
+            queue_recheck(self.user.id, 'outer')
+
+        self.assertEqual(sorted(AchievementRecheck.objects.get(user=self.user).triggers), ['inner', 'outer'])
+
+    def test_worker_awards_and_clears_queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = self.create_member(role='president')
+
+        call_command('process_achievement_rechecks', stdout=StringIO())
+
+        self.assertFalse(AchievementRecheck.objects.exists())
+        president = UserAchievement.objects.get(user=self.user, achievement__code='president_badge')
+        self.assertEqual(president.source_member, member)
+        self.assertEqual(president.progress_data['trigger'], 'member_created')
+
+    def test_role_change_is_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = self.create_member(role='member')
+        with self.captureOnCommitCallbacks(execute=True):
+            member.role = 'treasurer'
+            member.save()
+        self.assertEqual(AchievementRecheck.objects.get(user=self.user).triggers, ['member_role_change'])
+
+
+class AchievementQueueRollbackTests(TransactionTestCase):
+    """Outermost transactions, which TestCase can't roll back"""
+
+    def test_rolled_back_transaction_queues_nothing_for_the_next(self):
+        user = User.objects.create_user(username='rolled_back', password='testpass123')
+        try:
+            with transaction.atomic():
+                queue_recheck(user.id, 'rolled_back')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(AchievementRecheck.objects.exists())
+
+        with transaction.atomic():
+            queue_recheck(user.id, 'kept')
+
+        self.assertEqual(AchievementRecheck.objects.get(user=user).triggers, ['kept'])
+
+
+class ChapterCreatedFanOutTests(TestCase):
+
+    def setUp(self):
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+        # Load the per-process catalog so it isn't counted in the first batch
+        get_active_achievements()
+
+    def club_with_admins(self, count):
+        club = Club.objects.create(name=f'Fan-out Club {count}')
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                user = User.objects.create_user(username=f'admin{count}-{i}', password='testpass123')
+                ClubAdmin.objects.create(user=user, club=club)
+        AchievementRecheck.objects.all().delete()
+        return club
+
+    def create_chapter(self, club, name):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                Chapter.objects.create(club=club, name=name)
+        return len(queries)
+
+    def process(self):
+        with CaptureQueriesContext(connection) as queries:
+            call_command('process_achievement_rechecks', stdout=StringIO())
+        return len(queries)
+
+    def test_queries_do_not_grow_with_admins(self):
+        small, large = self.club_with_admins(2), self.club_with_admins(6)
+
+        # One chapter each: nothing is awarded, so only the batch queries remain
+        small_create = self.create_chapter(small, 'First')
+        self.assertEqual(AchievementRecheck.objects.filter(triggers=['chapter_created']).count(), 2)
+        small_process = self.process()
+
+        self.assertEqual(self.create_chapter(large, 'First'), small_create)
+        self.assertEqual(AchievementRecheck.objects.filter(triggers=['chapter_created']).count(), 6)
+        self.assertEqual(self.process(), small_process)
+
+        self.assertFalse(AchievementRecheck.objects.exists())
+        self.assertFalse(UserAchievement.objects.exists())
+
+    def test_admins_are_awarded_after_commit(self):
+        club = self.club_with_admins(3)
+        self.create_chapter(club, 'First')
+        self.process()
+        with self.captureOnCommitCallbacks(execute=True):
+            Chapter.objects.create(club=club, name='Second')
+            self.assertFalse(AchievementRecheck.objects.exists())
+
+        self.process()
+        self.assertEqual(
+            UserAchievement.objects.filter(achievement__code='chapter_creator_badge').count(), 3
+        )
+
+    def test_failed_batch_is_retried_per_user(self):
+        club = self.club_with_admins(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Chapter.objects.create(club=club, name='First')
+
+        with mock.patch.object(AchievementService, 'check_users_achievements', side_effect=RuntimeError('boom')):
+            call_command('process_achievement_rechecks', stdout=StringIO())
+
+        self.assertEqual(list(AchievementRecheck.objects.values_list('attempts', 'last_error')), [(1, 'boom')] * 2)
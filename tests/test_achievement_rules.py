@@ -0,0 +1,188 @@
+"""
+Tests for snapshot-based achievement evaluation
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from achievements.catalog import get_active_achievements
+from achievements.models import Achievement, UserAchievement
+from achievements.rules import Membership, UserFacts, codes_for_triggers, evaluate
+from achievements.services import AchievementService
+from clubs.models import Club, Chapter, Member, ClubAdmin, ChapterAdmin
+from .test_utils import create_test_image
+
+
+class RuleTests(SimpleTestCase):
+
+    def facts(self, *memberships, admin_club_ids=frozenset(), admin_chapter_count=0):
+        return UserFacts(
+            1,
+            memberships=list(memberships),
+            admin_club_ids=admin_club_ids,
+            admin_chapter_count=admin_chapter_count,
+        )
+
+    def test_role_rules(self):
+        facts = self.facts(Membership('president', 1, timezone.now()))
+        self.assertTrue(evaluate('president_badge', facts))
+        self.assertFalse(evaluate('treasurer_badge', facts))
+        self.assertTrue(evaluate('first_timer_badge', facts))
+
+    def test_multi_club_rules(self):
+        now = timezone.now()
+        facts = self.facts(
+            Membership('president', 1, now),
+            Membership('secretary', 2, now),
+            Membership('member', 3, now - timedelta(days=400)),
+        )
+        self.assertTrue(evaluate('multi_club_leader_badge', facts))
+        self.assertTrue(evaluate('social_butterfly_badge', facts))
+        self.assertTrue(evaluate('veteran_rider_badge', facts))
+
+    def test_admin_rules(self):
+        facts = self.facts(admin_club_ids=frozenset({1}), admin_chapter_count=2)
+        self.assertTrue(evaluate('club_founder_badge', facts))
+        self.assertTrue(evaluate('chapter_creator_badge', facts))
+        self.assertFalse(evaluate('first_timer_badge', facts))
+
+    def test_unknown_code(self):
+        self.assertFalse(evaluate('legend_badge', self.facts()))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UserFactsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='facts', password='testpass123')
+        self.club = Club.objects.create(name='Facts Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='North')
+        Chapter.objects.create(club=self.club, name='South')
+        other_chapter = Chapter.objects.create(club=Club.objects.create(name='Other Club'), name='East')
+
+        ClubAdmin.objects.create(user=self.user, club=self.club)
+        ChapterAdmin.objects.create(user=self.user, chapter=other_chapter)
+        ChapterAdmin.objects.create(user=self.user, chapter=self.chapter)
+        Member.objects.create(
+            user=self.user, chapter=self.chapter, first_name='Fact', last_name='Rider',
+            role='president', profile_picture=create_test_image('facts.jpg')
+        )
+
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+
+    def test_load_uses_three_queries(self):
+        with self.assertNumQueries(3):
+            facts = UserFacts.load(self.user)
+        self.assertEqual(facts.roles, {'president'})
+        self.assertEqual(facts.admin_club_ids, {self.club.id})
+        # Both club chapters plus the directly administered one, counted once
+        self.assertEqual(facts.admin_chapter_count, 3)
+
+    def test_check_queries_do_not_depend_on_catalog_size(self):
+        AchievementService.check_user_achievements(self.user)
+        get_active_achievements()
+
+        bystander = User.objects.create_user(username='bystander', password='testpass123')
+        # Earned ids + three fact queries, the catalog is cached
+        with self.assertNumQueries(4):
+            self.assertEqual(AchievementService.check_user_achievements(bystander), [])
+
+    def test_catalog_reloads_after_change(self):
+        count = len(get_active_achievements())
+        Achievement.objects.filter(code='president_badge').first().delete()
+        self.assertEqual(len(get_active_achievements()), count - 1)
+
+    def test_awards_match_rules(self):
+        AchievementService.check_user_achievements(self.user)
+        codes = set(UserAchievement.objects.filter(user=self.user).values_list('achievement__code', flat=True))
+        self.assertTrue({'president_badge', 'first_timer_badge', 'club_founder_badge', 'chapter_creator_badge'} <= codes)
+        self.assertNotIn('multi_club_member_badge', codes)
+
+    def test_batch_awards_match_rules(self):
+        rider = User.objects.create_user(username='batch_rider', password='testpass123')
+        for i, club in enumerate([self.club, Club.objects.create(name='Second Club')]):
+            Member.objects.create(
+                user=rider, chapter=Chapter.objects.create(club=club, name=f'Batch {i}'),
+                first_name='Batch', last_name='Rider', role='member',
+                profile_picture=create_test_image(f'batch{i}.jpg'),
+            )
+
+        awarded = AchievementService.check_users_achievements([
+            (self.user, None),
+            (rider, {'trigger': 'member_created'}),
+        ])
+
+        codes = {
+            user_id: {award.achievement.code for award in awards}
+            for user_id, awards in awarded.items()
+        }
+        self.assertTrue(
+            {'president_badge', 'first_timer_badge', 'club_founder_badge', 'chapter_creator_badge'}
+            <= codes[self.user.pk]
+        )
+        self.assertNotIn('multi_club_member_badge', codes[self.user.pk])
+        self.assertEqual(codes[rider.pk], {'first_timer_badge', 'multi_club_member_badge'})
+        self.assertEqual(
+            set(UserAchievement.objects.filter(user=rider).values_list('achievement__code', flat=True)),
+            codes[rider.pk]
+        )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TriggerIndexTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='indexed', password='testpass123')
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+        get_active_achievements()
+
+    def test_trigger_index(self):
+        # veteran_rider_badge depends on time only, so it goes with every trigger
+        self.assertEqual(
+            codes_for_triggers(['club_admin_assigned']),
+            {'club_founder_badge', 'chapter_creator_badge', 'veteran_rider_badge'}
+        )
+        self.assertIsNone(codes_for_triggers(['manual_check']))
+        self.assertIsNone(codes_for_triggers([]))
+
+    def test_trigger_evaluates_fewer_facts(self):
+        # Earned ids + every fact
+        with self.assertNumQueries(4):
+            AchievementService.check_user_achievements(self.user, {'trigger': 'manual_check'})
+        # Earned ids + the chapter count + memberships (veteran_rider_badge)
+        with self.assertNumQueries(3):
+            AchievementService.check_user_achievements(self.user, {'trigger': 'chapter_created'})
+        # Earned ids + memberships
+        with self.assertNumQueries(2):
+            AchievementService.check_user_achievements(self.user, {'trigger': 'member_created'})
+
+    def test_membership_anniversary_awarded_on_other_trigger(self):
+        chapter = Chapter.objects.create(club=Club.objects.create(name='Veteran Club'), name='Old Town')
+        member = Member.objects.create(
+            user=self.user, chapter=chapter, first_name='Old', last_name='Timer',
+            profile_picture=create_test_image('veteran.jpg')
+        )
+        AchievementService.check_user_achievements(self.user, {'trigger': 'member_created'})
+        veteran = UserAchievement.objects.filter(user=self.user, achievement__code='veteran_rider_badge')
+        self.assertFalse(veteran.exists())
+
+        # A year on, with no change to the membership
+        Member.objects.filter(pk=member.pk).update(created_at=timezone.now() - timedelta(days=366))
+        AchievementService.check_user_achievements(self.user, {'trigger': 'chapter_created'})
+        self.assertTrue(veteran.exists())
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_achievement_triggers', stdout=out)
+        self.assertIn('club_admin_assigned', out.getvalue())
+        self.assertFalse(User.objects.filter(username='achievement-benchmark').exists())
@@ -0,0 +1,109 @@
+"""
+Tests for the precomputed achievement statistics
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from achievements.models import Achievement, UserAchievement
+from achievements.services import AchievementService
+from achievements.stats import RECENT_FEED_SIZE, get_recent_feed
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AchievementStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+
+        self.users = [User.objects.create_user(username=f'stats{i}', password='testpass123') for i in range(4)]
+        self.president = Achievement.objects.get(code='president_badge')
+        self.first_timer = Achievement.objects.get(code='first_timer_badge')
+
+    def award(self, user, achievement):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AchievementService.award_achievement(user, achievement)
+
+    def test_earned_count_follows_awards(self):
+        for user in self.users:
+            self.award(user, self.first_timer)
+        awarded = self.award(self.users[0], self.president)
+
+        self.first_timer.refresh_from_db()
+        self.president.refresh_from_db()
+        self.assertEqual(self.first_timer.earned_count, 4)
+        self.assertEqual(self.president.earned_count, 1)
+
+        awarded.delete()
+        self.president.refresh_from_db()
+        self.assertEqual(self.president.earned_count, 0)
+
+    def test_save_keeps_earned_count(self):
+        stale = Achievement.objects.get(pk=self.first_timer.pk)
+        self.award(self.users[0], self.first_timer)
+        stale.name = 'First Ride'
+        stale.save()
+
+        self.first_timer.refresh_from_db()
+        self.assertEqual(self.first_timer.name, 'First Ride')
+        self.assertEqual(self.first_timer.earned_count, 1)
+
+    def test_global_stats(self):
+        for user in self.users:
+            self.award(user, self.first_timer)
+        self.award(self.users[0], self.president)
+
+        client = APIClient()
+        url = reverse('achievementstats-global-stats')
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any(UserAchievement._meta.db_table in query['sql'] for query in queries))
+
+        self.assertEqual(response.data['total_earned'], 5)
+        self.assertEqual(response.data['total_users_with_achievements'], 4)
+        popular = response.data['popular_achievements']
+        self.assertEqual(popular[0]['achievement']['code'], 'first_timer_badge')
+        self.assertEqual(popular[0]['achievement']['rarity'], 100.0)
+        self.assertEqual(popular[1]['achievement']['rarity'], 25.0)
+        self.assertEqual(response.data['recent_achievements'][0]['achievement']['code'], 'president_badge')
+
+    def test_recent_feed(self):
+        get_recent_feed()
+        for i in range(RECENT_FEED_SIZE + 2):
+            self.award(User.objects.create_user(username=f'feed{i}'), self.first_timer)
+
+        with self.assertNumQueries(0):
+            feed = get_recent_feed()
+        self.assertEqual(len(feed), RECENT_FEED_SIZE)
+        self.assertEqual(feed[0]['user_display'], f'feed{RECENT_FEED_SIZE + 1}')
+
+        # Removing an earned achievement drops the feed
+        with self.captureOnCommitCallbacks(execute=True):
+            UserAchievement.objects.filter(user__username=f'feed{RECENT_FEED_SIZE + 1}').delete()
+        self.assertEqual(get_recent_feed()[0]['user_display'], f'feed{RECENT_FEED_SIZE}')
+
+    def test_award_not_in_feed_before_commit(self):
+        get_recent_feed()
+        with self.captureOnCommitCallbacks():
+            AchievementService.award_achievement(self.users[0], self.president)
+        self.assertEqual(get_recent_feed(), [])
+
+    def test_achievement_list_rarity(self):
+        self.award(self.users[0], self.first_timer)
+        self.award(self.users[1], self.president)
+
+        response = APIClient().get(reverse('achievement-list'))
+        by_code = {achievement['code']: achievement for achievement in response.data['results']}
+        self.assertEqual(by_code['first_timer_badge']['earned_count'], 1)
+        self.assertEqual(by_code['first_timer_badge']['rarity'], 50.0)
+        self.assertEqual(by_code['secretary_badge']['rarity'], 0.0)
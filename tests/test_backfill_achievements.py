@@ -0,0 +1,88 @@
+"""
+Tests for the set-based backfill_achievements command
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from achievements.models import UserAchievement
+from achievements.rules import RULES, UserFacts, evaluate
+from clubs.models import Club, Chapter, Member, ClubAdmin, ChapterAdmin
+from .test_utils import create_test_image
+
+
+class BackfillAchievementsTests(TestCase):
+
+    def setUp(self):
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+
+        clubs = [Club.objects.create(name=f'Backfill Club {i}') for i in range(3)]
+        chapters = [Chapter.objects.create(club=club, name='Main') for club in clubs]
+        Chapter.objects.create(club=clubs[0], name='Second')
+
+        self.president = User.objects.create_user(username='president', password='testpass123')
+        self.rider = User.objects.create_user(username='rider', password='testpass123')
+        self.admin = User.objects.create_user(username='admin', password='testpass123')
+        self.nobody = User.objects.create_user(username='nobody', password='testpass123')
+
+        for i, chapter in enumerate(chapters):
+            self.member(self.rider, chapter, f'Rider{i}')
+        self.member(self.president, chapters[0], 'Pres', role='president')
+        self.member(self.president, chapters[1], 'Pres', role='secretary')
+        ClubAdmin.objects.create(user=self.admin, club=clubs[0])
+        ChapterAdmin.objects.create(user=self.nobody, chapter=chapters[2])
+
+        # Achievements awarded by signals are not part of these tests
+        UserAchievement.objects.all().delete()
+
+    def member(self, user, chapter, name, role='member'):
+        return Member.objects.create(
+            user=user, chapter=chapter, first_name=name, last_name='Backfill', role=role,
+            profile_picture=create_test_image(f'{name.lower()}.jpg')
+        )
+
+    def earned(self, user):
+        return set(UserAchievement.objects.filter(user=user).values_list('achievement__code', flat=True))
+
+    def test_set_based_rules_match_per_user_rules(self):
+        for user in User.objects.all():
+            facts = UserFacts.load(user)
+            for code, rule in RULES.items():
+                self.assertEqual(
+                    user.pk in set(rule.users()), evaluate(code, facts),
+                    f'{code} disagrees for {user.username}'
+                )
+
+    def test_backfill(self):
+        call_command('backfill_achievements', '--chunk-size', '2', stdout=StringIO())
+
+        self.assertTrue({'president_badge', 'multi_club_leader_badge', 'first_timer_badge'} <= self.earned(self.president))
+        self.assertTrue({'social_butterfly_badge', 'multi_club_member_badge'} <= self.earned(self.rider))
+        self.assertTrue({'club_founder_badge', 'chapter_creator_badge'} <= self.earned(self.admin))
+        self.assertEqual(self.earned(self.nobody), set())
+
+        # Running again awards nothing new
+        count = UserAchievement.objects.count()
+        call_command('backfill_achievements', stdout=StringIO())
+        self.assertEqual(UserAchievement.objects.count(), count)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command('backfill_achievements', '--dry-run', stdout=out)
+        self.assertFalse(UserAchievement.objects.exists())
+        self.assertIn('president_badge: 1 would be awarded', out.getvalue())
+
+    def test_codes(self):
+        call_command('backfill_achievements', '--codes', 'club_founder_badge', stdout=StringIO())
+        self.assertEqual(
+            set(UserAchievement.objects.values_list('achievement__code', flat=True)),
+            {'club_founder_badge'}
+        )
+
+        with self.assertRaises(CommandError):
+            call_command('backfill_achievements', '--codes', 'no_such_badge', stdout=StringIO())
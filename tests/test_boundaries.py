@@ -0,0 +1,104 @@
+"""
+Tests for simplified Country/State boundaries and the GeoJSON boundaries endpoint
+"""
+
+import json
+import unittest
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from geography.models import Country, State, resolution_for_zoom, simplify_boundary
+
+
+def jagged_boundary():
+    """A square with many tiny zigzags along its southern edge"""
+    south = [(i / 100, 0.001 * (i % 2)) for i in range(0, 101)]
+    ring = south + [(1, 1), (0, 1), (0, 0)]
+    return MultiPolygon(Polygon(ring), srid=4326)
+
+
+class SimplifyBoundaryTests(SimpleTestCase):
+
+    def test_simplified_is_multipolygon_with_fewer_points(self):
+        boundary = jagged_boundary()
+        simplified = simplify_boundary(boundary, 0.01)
+        self.assertEqual(simplified.geom_type, 'MultiPolygon')
+        self.assertEqual(simplified.srid, 4326)
+        self.assertLess(simplified.num_coords, boundary.num_coords)
+
+    def test_none_boundary(self):
+        self.assertIsNone(simplify_boundary(None, 0.01))
+
+    def test_resolution_for_zoom(self):
+        self.assertEqual(resolution_for_zoom(0), ('low', 2))
+        self.assertEqual(resolution_for_zoom(6), ('medium', 3))
+        self.assertEqual(resolution_for_zoom(12), ('high', 4))
+
+
+class BoundariesEndpointValidationTests(TestCase):
+
+    def test_unknown_layer_is_404(self):
+        response = self.client.get('/geography/boundaries/rivers.geojson')
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_zoom_is_400(self):
+        response = self.client.get('/geography/boundaries/states.geojson', {'zoom': 'far'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/geography/boundaries/states.geojson', {'zoom': 40})
+        self.assertEqual(response.status_code, 400)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Boundaries need PostGIS')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BoundariesEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name='Boundaria', code='BD', boundary=jagged_boundary())
+        self.state = State.objects.create(
+            name='Jagged', code='JG', country=self.country, boundary=jagged_boundary()
+        )
+
+    def test_save_stores_simplified_boundaries(self):
+        self.state.refresh_from_db()
+        self.assertLess(self.state.boundary_low.num_coords, self.state.boundary.num_coords)
+        self.assertLessEqual(self.state.boundary_low.num_coords, self.state.boundary_high.num_coords)
+
+    def test_states_feature_collection(self):
+        response = self.client.get('/geography/boundaries/states.geojson', {'zoom': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/geo+json')
+        self.assertIn('max-age', response['Cache-Control'])
+
+        data = json.loads(response.content)
+        self.assertEqual(data['type'], 'FeatureCollection')
+        feature = data['features'][0]
+        self.assertEqual(feature['id'], self.state.id)
+        self.assertEqual(feature['properties']['country_id'], self.country.id)
+        self.assertEqual(feature['geometry']['type'], 'MultiPolygon')
+
+    def test_low_zoom_is_coarser_than_high_zoom(self):
+        low = self.client.get('/geography/boundaries/states.geojson', {'zoom': 2})
+        high = self.client.get('/geography/boundaries/states.geojson', {'zoom': 12})
+        self.assertLess(len(low.content), len(high.content))
+
+    def test_etag_revalidation(self):
+        response = self.client.get('/geography/boundaries/countries.geojson', {'zoom': 5})
+        etag = response['ETag']
+        response = self.client.get(
+            '/geography/boundaries/countries.geojson', {'zoom': 5}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_boundary_change_changes_etag(self):
+        etag = self.client.get('/geography/boundaries/countries.geojson', {'zoom': 5})['ETag']
+        self.country.name = 'Renamed'
+        self.country.save()
+        response = self.client.get(
+            '/geography/boundaries/countries.geojson', {'zoom': 5}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,105 @@
+"""
+Tests for nearest-chapter and bounding-box chapter search
+"""
+
+import unittest
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.models import Club, Chapter
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Geo queries need PostGIS')
+class ChapterGeoSearchTests(APITestCase):
+    """/api/chapters/nearby/ and ?in_bbox="""
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Geo Club')
+        self.other_club = Club.objects.create(name='Other Geo Club')
+        self.monterrey = self.create_chapter('Monterrey', -100.3161, 25.6866)
+        self.saltillo = self.create_chapter('Saltillo', -101.0053, 25.4232)
+        self.guadalajara = self.create_chapter('Guadalajara', -103.3496, 20.6597)
+        self.cdmx = self.create_chapter('CDMX', -99.1332, 19.4326, accepts_new_members=False)
+        self.create_chapter('Nowhere', None, None)
+
+    def create_chapter(self, name, lng, lat, club=None, **kwargs):
+        location = Point(lng, lat, srid=4326) if lng is not None else None
+        return Chapter.objects.create(club=club or self.club, name=name, location=location, **kwargs)
+
+    def nearby(self, **params):
+        params.setdefault('lat', 25.6866)
+        params.setdefault('lng', -100.3161)
+        return self.client.get('/api/chapters/nearby/', params)
+
+    def test_nearest_first_with_km_distances(self):
+        response = self.nearby()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        names = [chapter['name'] for chapter in response.data['results']]
+        self.assertEqual(names, ['Monterrey', 'Saltillo', 'Guadalajara', 'CDMX'])
+        self.assertEqual(response.data['results'][0]['distance_km'], 0)
+        # Monterrey - Saltillo is roughly 75 km
+        self.assertAlmostEqual(response.data['results'][1]['distance_km'], 75, delta=5)
+
+    def test_limit_and_radius(self):
+        self.assertEqual(len(self.nearby(limit=2).data['results']), 2)
+        names = [chapter['name'] for chapter in self.nearby(radius=100).data['results']]
+        self.assertEqual(names, ['Monterrey', 'Saltillo'])
+
+    def test_combines_with_filters(self):
+        response = self.nearby(accepts_new_members='false')
+        self.assertEqual([c['name'] for c in response.data['results']], ['CDMX'])
+
+        self.create_chapter('Apodaca', -100.19, 25.78, club=self.other_club)
+        response = self.nearby(club=self.other_club.id)
+        self.assertEqual([c['name'] for c in response.data['results']], ['Apodaca'])
+
+    def test_invalid_coordinates(self):
+        self.assertEqual(self.nearby(lat='abc').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.nearby(lat=95).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_in_bbox(self):
+        response = self.client.get('/api/chapters/', {'in_bbox': '-102,25,-100,26', 'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['name'] for c in response.data['results']], ['Monterrey', 'Saltillo'])
+
+    def test_invalid_bbox(self):
+        response = self.client.get('/api/chapters/', {'in_bbox': '1,2,3'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_clusters(self):
+        # Monterrey and Saltillo share a cell at a low zoom
+        response = self.client.get('/api/chapters/clusters/', {'bbox': '-118,14,-86,33', 'zoom': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+
+        by_size = sorted(response.data['clusters'], key=lambda cluster: -cluster['count'])
+        self.assertEqual(by_size[0]['count'], 2)
+        self.assertEqual(sorted(by_size[0]['sample_ids']), sorted([self.monterrey.id, self.saltillo.id]))
+        self.assertAlmostEqual(by_size[0]['lng'], (-100.3161 - 101.0053) / 2, places=3)
+
+        # At a high zoom every chapter is its own cluster
+        response = self.client.get('/api/chapters/clusters/', {'bbox': '-101.1,25.3,-100.2,25.8', 'zoom': 9})
+        self.assertEqual(sorted(c['count'] for c in response.data['clusters']), [1, 1])
+
+    def test_clusters_skip_private_chapters_and_apply_filters(self):
+        self.saltillo.is_public = False
+        self.saltillo.save()
+        response = self.client.get(
+            '/api/chapters/clusters/',
+            {'bbox': '-118,14,-86,33', 'zoom': 3, 'accepts_new_members': 'true'}
+        )
+        self.assertEqual(response.data['count'], 2)
+
+    def test_clusters_bound_tile_count(self):
+        response = self.client.get('/api/chapters/clusters/', {'bbox': '-180,-90,180,90', 'zoom': 12})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(response.data['tiles'], 16)
+        self.assertEqual(response.data['count'], 4)
+
+    def test_clusters_invalid_bbox(self):
+        response = self.client.get('/api/chapters/clusters/', {'zoom': 3})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,123 @@
+"""
+Tests for deriving Chapter.state_new from the chapter location
+"""
+
+import unittest
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from clubs.models import Club, Chapter
+from geography.models import Country, State
+from geography.tiles import MAP_TILES_NAMESPACE
+from motomundo.cache import get_version
+
+
+def square(min_lng, min_lat, max_lng, max_lat):
+    return MultiPolygon(Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat)), srid=4326)
+
+
+class LocationChangedTests(SimpleTestCase):
+
+    def test_new_chapter_with_location(self):
+        self.assertTrue(Chapter(location=Point(-100, 25, srid=4326)).location_changed())
+        self.assertFalse(Chapter().location_changed())
+
+    def test_loaded_chapter(self):
+        chapter = Chapter(location=Point(-100, 25, srid=4326))
+        chapter.reset_tracked_fields()
+        self.assertFalse(chapter.location_changed())
+        chapter.location = Point(-99, 25, srid=4326)
+        self.assertTrue(chapter.location_changed())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'State assignment needs PostGIS')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ChapterStateAssignmentTests(TestCase):
+
+    def setUp(self):
+        self.mexico = Country.objects.create(name='Mexico', code='MX')
+        self.nuevo_leon = State.objects.create(
+            name='Nuevo León', code='NL', country=self.mexico, boundary=square(-101, 24, -99, 27)
+        )
+        self.jalisco = State.objects.create(
+            name='Jalisco', code='JAL', country=self.mexico, boundary=square(-105, 19, -101.5, 22.5)
+        )
+        self.club = Club.objects.create(name='Geo Club')
+
+    def test_state_assigned_on_create(self):
+        chapter = Chapter.objects.create(
+            club=self.club, name='Monterrey', location=Point(-100.3161, 25.6866, srid=4326)
+        )
+        chapter.refresh_from_db()
+        self.assertEqual(chapter.state_new, self.nuevo_leon)
+        self.assertEqual(chapter.state, 'Nuevo León')
+
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.country_new, self.mexico)
+
+    def test_state_reassigned_when_moved(self):
+        chapter = Chapter.objects.create(
+            club=self.club, name='Moving', state='Nuevo León', location=Point(-100.3, 25.6, srid=4326)
+        )
+        chapter = Chapter.objects.get(pk=chapter.pk)
+        chapter.location = Point(-103.35, 20.67, srid=4326)
+        chapter.save(update_fields=['location'])
+
+        chapter.refresh_from_db()
+        self.assertEqual(chapter.state_new, self.jalisco)
+        # Existing legacy text is left alone
+        self.assertEqual(chapter.state, 'Nuevo León')
+
+    def test_unchanged_location_skips_lookup(self):
+        chapter = Chapter.objects.create(
+            club=self.club, name='Still', location=Point(-100.3, 25.6, srid=4326)
+        )
+        chapter = Chapter.objects.get(pk=chapter.pk)
+        chapter.name = 'Still Here'
+        with self.assertNumQueries(1):
+            chapter.save(update_fields=['name'])
+
+    def test_point_outside_states_keeps_state(self):
+        chapter = Chapter.objects.create(
+            club=self.club, name='Offshore', state_new=self.jalisco, location=Point(-120, 10, srid=4326)
+        )
+        chapter.refresh_from_db()
+        self.assertEqual(chapter.state_new, self.jalisco)
+
+    def test_backfill_command(self):
+        chapter = Chapter.objects.create(club=self.club, name='Legacy')
+        Chapter.objects.filter(pk=chapter.pk).update(location=Point(-100.3, 25.6, srid=4326))
+        tiles_version = get_version(MAP_TILES_NAMESPACE)
+
+        call_command('assign_chapter_states', stdout=open('/dev/null', 'w'))
+
+        # update() sent no save signals, the command invalidates the tiles itself
+        self.assertNotEqual(get_version(MAP_TILES_NAMESPACE), tiles_version)
+
+        chapter.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertEqual(chapter.state_new, self.nuevo_leon)
+        self.assertEqual(chapter.state, 'Nuevo León')
+        self.assertEqual(self.club.country_new, self.mexico)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'State assignment needs PostGIS')
+class DiscoveryStateFilterTests(APITestCase):
+
+    def test_by_location_state_id(self):
+        mexico = Country.objects.create(name='Mexico', code='MX')
+        state = State.objects.create(name='Sonora', code='SON', country=mexico, boundary=square(-115, 26, -108, 32))
+        club = Club.objects.create(name='Desert Riders', is_public=True)
+        Chapter.objects.create(club=club, name='Hermosillo', location=Point(-110.95, 29.07, srid=4326))
+        Club.objects.create(name='Elsewhere', is_public=True)
+
+        response = self.client.get('/clubs/api/discovery/clubs/by_location/', {'state_id': state.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([club['name'] for club in response.data['Sonora']], ['Desert Riders'])
+
+        response = self.client.get('/clubs/api/discovery/clubs/by_location/', {'state_id': 'x'})
+        self.assertEqual(response.status_code, 400)
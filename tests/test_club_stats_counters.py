@@ -0,0 +1,76 @@
+"""
+Tests for the incrementally maintained Club.total_members / total_chapters counters
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from clubs.models import Club, Chapter, Member
+from .test_utils import create_test_image
+
+
+class ClubStatsCounterTests(TestCase):
+    """Counters follow chapter and member changes without a full recount"""
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Counter Club')
+        self.other_club = Club.objects.create(name='Other Counter Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='Counter Chapter')
+
+    def create_member(self, name, chapter=None, **kwargs):
+        return Member.objects.create(
+            chapter=chapter or self.chapter,
+            first_name=name,
+            last_name='Rider',
+            profile_picture=create_test_image(f'{name}.jpg'),
+            **kwargs
+        )
+
+    def assertCounters(self, club, members, chapters):
+        club.refresh_from_db()
+        self.assertEqual(club.total_members, members)
+        self.assertEqual(club.total_chapters, chapters)
+
+    def test_member_create_and_delete(self):
+        member = self.create_member('ana')
+        self.create_member('beto', is_active=False)
+        self.assertCounters(self.club, 1, 1)
+
+        member.delete()
+        self.assertCounters(self.club, 0, 1)
+
+    def test_member_deactivation(self):
+        member = Member.objects.get(pk=self.create_member('ana').pk)
+        member.is_active = False
+        member.save()
+        self.assertCounters(self.club, 0, 1)
+
+    def test_chapter_moved_to_another_club(self):
+        self.create_member('ana')
+        self.create_member('beto')
+
+        chapter = Chapter.objects.get(pk=self.chapter.pk)
+        chapter.club = self.other_club
+        chapter.save()
+
+        self.assertCounters(self.club, 0, 0)
+        self.assertCounters(self.other_club, 2, 1)
+
+    def test_chapter_delete_removes_its_members(self):
+        self.create_member('ana')
+        self.create_member('beto')
+
+        Chapter.objects.get(pk=self.chapter.pk).delete()
+        self.assertCounters(self.club, 0, 0)
+
+    def test_reconcile_fixes_drift(self):
+        self.create_member('ana')
+        Club.objects.filter(pk=self.club.pk).update(total_members=10, total_chapters=4)
+
+        call_command('reconcile_club_stats', '--dry-run', stdout=StringIO())
+        self.assertCounters(self.club, 10, 4)
+
+        call_command('reconcile_club_stats', stdout=StringIO())
+        self.assertCounters(self.club, 1, 1)
@@ -0,0 +1,73 @@
+"""
+Tests for the opt-in keyset (cursor) pagination
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.models import Club, Chapter, Member
+from clubs.pagination import HybridPagination
+from .test_utils import create_test_image
+
+
+@mock.patch.object(HybridPagination, 'page_size', 2)
+class MemberCursorPaginationTests(APITestCase):
+    """Members can be paged by (first_name, last_name, id) keyset"""
+
+    def setUp(self):
+        club = Club.objects.create(name='Cursor Club')
+        chapters = [Chapter.objects.create(club=club, name=f'Cursor Chapter {i}') for i in range(2)]
+        # Same full names in different chapters exercise the id tie-break
+        names = [('Ana', 'Lopez'), ('Ana', 'Lopez'), ('Beto', 'Diaz'), ('Carla', 'Ruiz'), ('Ana', 'Avila')]
+        for i, (first_name, last_name) in enumerate(names):
+            Member.objects.create(
+                chapter=chapters[i % 2],
+                first_name=first_name,
+                last_name=last_name,
+                role='member',
+                profile_picture=create_test_image(f'cursor_{i}.jpg')
+            )
+        self.expected = list(
+            Member.objects.order_by('first_name', 'last_name', 'id').values_list('id', flat=True)
+        )
+
+    def test_walks_all_members_in_order(self):
+        url = '/api/members/?pagination=cursor'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(member['id'] for member in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/api/members/?pagination=cursor')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(
+            [m['id'] for m in back.data['results']],
+            [m['id'] for m in first.data['results']]
+        )
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/members/?pagination=cursor')
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get('/api/members/', {'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/members/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,92 @@
+"""
+Tests for the public discovery API
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.models import Club, Chapter, PlatformStats
+from geography.models import Country, State
+
+
+class DiscoveryByLocationTests(APITestCase):
+    """Clubs grouped by state in a single query"""
+
+    url = '/clubs/api/discovery/clubs/by_location/'
+
+    def setUp(self):
+        mexico = Country.objects.create(name='Mexico', code='MX')
+        self.jalisco = State.objects.create(name='Jalisco', country=mexico, code='JAL')
+
+        self.club = Club.objects.create(name='Location Club', primary_state='Colima')
+        Chapter.objects.create(club=self.club, name='Guadalajara', state_new=self.jalisco)
+        Chapter.objects.create(club=self.club, name='Zapopan', state='Jalisco')
+        Chapter.objects.create(club=self.club, name='Monterrey', state='Nuevo Leon', is_active=False)
+        Chapter.objects.create(club=self.club, name='Saltillo', state='Coahuila', is_public=False)
+
+        other = Club.objects.create(name='Other Location Club', primary_state_new=self.jalisco)
+        Chapter.objects.create(club=other, name='Tlaquepaque', state='Jalisco')
+
+    def test_grouped_by_state(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(set(response.data), {'Colima', 'Jalisco'})
+        self.assertEqual([c['name'] for c in response.data['Colima']], ['Location Club'])
+        self.assertEqual(
+            [c['name'] for c in response.data['Jalisco']],
+            ['Location Club', 'Other Location Club']
+        )
+        self.assertEqual(response.data['Jalisco'][0]['club_type'], 'Motorcycle Club')
+
+    def test_state_filter(self):
+        response = self.client.get(self.url, {'state': 'Colima'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'Colima', 'Jalisco'})
+        self.assertEqual([c['name'] for c in response.data['Jalisco']], ['Location Club'])
+
+
+class DiscoveryStatsTests(APITestCase):
+    """Platform stats are read from the PlatformStats rollup"""
+
+    url = '/clubs/api/discovery/clubs/stats/'
+
+    def setUp(self):
+        club = Club.objects.create(name='Stats Club', club_type='association')
+        Chapter.objects.create(club=club, name='Stats Chapter')
+        Club.objects.create(name='Private Club', is_public=False)
+
+    def test_stats_computed_on_first_read_then_single_row_read(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_clubs'], 1)
+        self.assertEqual(response.data['total_chapters'], 1)
+        self.assertEqual(response.data['clubs_by_type'], [{'club_type': 'association', 'count': 1}])
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_stale_stats_recomputed_on_read(self):
+        PlatformStats.refresh()
+        Club.objects.create(name='Newer Club')
+        self.assertEqual(PlatformStats.get().total_clubs, 1)
+
+        PlatformStats.objects.update(updated_at=timezone.now() - PlatformStats.STALE_AFTER - timedelta(minutes=1))
+        self.assertEqual(PlatformStats.get().total_clubs, 2)
+
+    def test_fresh_only_for_staff(self):
+        PlatformStats.refresh()
+        Club.objects.create(name='Newer Club')
+
+        response = self.client.get(self.url, {'fresh': '1'})
+        self.assertEqual(response.data['total_clubs'], 1)
+
+        staff = User.objects.create_user(username='stats_staff', password='testpass123', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(self.url, {'fresh': '1'})
+        self.assertEqual(response.data['total_clubs'], 2)
@@ -0,0 +1,62 @@
+"""
+Tests for the in-process geography snapshot behind the countries/states API
+"""
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from geography.models import Country, State
+from geography.snapshot import clear_snapshot
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GeographySnapshotTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        clear_snapshot()
+        self.mexico = Country.objects.create(name='Mexico', code='MX')
+        self.jalisco = State.objects.create(name='Jalisco', code='JAL', country=self.mexico)
+        State.objects.create(name='Sonora', code='SON', country=self.mexico)
+
+    def tearDown(self):
+        clear_snapshot()
+
+    def test_list_served_from_snapshot(self):
+        response = self.client.get('/geography/api/countries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['states_count'], 2)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/geography/api/countries/')
+        self.assertEqual(response.data['results'][0]['name'], 'Mexico')
+
+    def test_snapshot_loads_in_two_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get('/geography/api/states/')
+
+    def test_retrieve_and_country_states(self):
+        response = self.client.get(f'/geography/api/states/{self.jalisco.id}/')
+        self.assertEqual(response.data['country_name'], 'Mexico')
+
+        response = self.client.get(f'/geography/api/countries/{self.mexico.id}/states/')
+        self.assertEqual([state['name'] for state in response.data], ['Jalisco', 'Sonora'])
+
+        response = self.client.get('/geography/api/countries/999999/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag_revalidation(self):
+        response = self.client.get('/geography/api/countries/')
+        etag = response['ETag']
+        response = self.client.get('/geography/api/countries/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_refreshes_snapshot(self):
+        etag = self.client.get('/geography/api/countries/')['ETag']
+        self.mexico.name = 'México'
+        self.mexico.save()
+
+        response = self.client.get('/geography/api/countries/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['name'], 'México')
@@ -0,0 +1,125 @@
+"""
+Tests for the denormalized points leaderboard
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from achievements.leaderboard import get_rank, get_top_scores
+from achievements.models import Achievement, UserAchievement, UserScore
+from achievements.services import AchievementService
+from clubs.models import Club, Chapter, Member
+from .test_utils import create_test_image
+
+
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        from achievements.management.commands.setup_achievements import Command
+        Command().handle(force=False)
+
+        self.club = Club.objects.create(name='Score Club')
+        self.other_club = Club.objects.create(name='Other Score Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='Score Chapter')
+        self.other_chapter = Chapter.objects.create(club=self.other_club, name='Other Chapter')
+
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.carol = User.objects.create_user(username='carol', password='testpass123')
+        self.member(self.alice, self.chapter)
+        self.member(self.bob, self.chapter)
+        self.member(self.carol, self.other_chapter)
+
+        self.president = Achievement.objects.get(code='president_badge')
+        self.first_timer = Achievement.objects.get(code='first_timer_badge')
+        self.founder = Achievement.objects.get(code='club_founder_badge')
+
+    def member(self, user, chapter):
+        return Member.objects.create(
+            user=user, chapter=chapter, first_name=user.username, last_name='Score',
+            profile_picture=create_test_image(f'{user.username}.jpg')
+        )
+
+    def award(self, user, *achievements):
+        for achievement in achievements:
+            AchievementService.award_achievement(user, achievement)
+
+    def score(self, user):
+        return UserScore.objects.get(user=user)
+
+    def test_score_follows_awards(self):
+        self.award(self.alice, self.president, self.first_timer)
+
+        score = self.score(self.alice)
+        self.assertEqual(score.total_points, self.president.points + self.first_timer.points)
+        self.assertEqual(score.achievement_count, 2)
+        self.assertEqual(score.last_earned_at, UserAchievement.objects.filter(user=self.alice).latest('earned_at').earned_at)
+
+        UserAchievement.objects.get(user=self.alice, achievement=self.president).delete()
+        score = self.score(self.alice)
+        self.assertEqual(score.total_points, self.first_timer.points)
+        self.assertEqual(score.achievement_count, 1)
+
+        UserAchievement.objects.filter(user=self.alice).delete()
+        self.assertFalse(UserScore.objects.filter(user=self.alice).exists())
+
+    def test_points_change_refreshes_holders(self):
+        self.award(self.alice, self.first_timer)
+        self.first_timer.points += 5
+        self.first_timer.save()
+        self.assertEqual(self.score(self.alice).total_points, self.first_timer.points)
+
+    def test_ranking(self):
+        self.award(self.alice, self.first_timer)
+        self.award(self.bob, self.president, self.first_timer)
+        self.award(self.carol, self.president, self.first_timer, self.founder)
+
+        self.assertEqual([s.user for s in get_top_scores()], [self.carol, self.bob, self.alice])
+        self.assertEqual([s.rank for s in get_top_scores()], [1, 2, 3])
+        self.assertEqual([s.user for s in get_top_scores(club_id=self.club.pk)], [self.bob, self.alice])
+        self.assertEqual([s.user for s in get_top_scores(chapter_id=self.other_chapter.pk)], [self.carol])
+
+        alice = self.score(self.alice)
+        self.assertEqual(get_rank(alice), 3)
+        self.assertEqual(get_rank(alice, club_id=self.club.pk), 2)
+
+    def test_top_users_endpoint(self):
+        self.award(self.alice, self.first_timer)
+        self.award(self.bob, self.president, self.first_timer)
+        client = APIClient()
+
+        with self.assertNumQueries(1):
+            response = client.get(reverse('achievementstats-top-users'), {'club': self.club.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        top = response.data['top_users']
+        self.assertEqual([entry['user']['username'] for entry in top], ['bob', 'alice'])
+        self.assertEqual(top[0]['total_points'], self.president.points + self.first_timer.points)
+        self.assertEqual(top[0]['rank'], 1)
+
+        response = client.get(reverse('achievementstats-top-users'), {'club': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rank_endpoint(self):
+        self.award(self.alice, self.first_timer)
+        self.award(self.carol, self.president)
+        client = APIClient()
+
+        response = client.get(reverse('achievementstats-rank', args=[self.alice.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rank'], 2)
+        self.assertEqual(response.data['club_ranks'], [{'club': {'id': self.club.pk, 'name': 'Score Club'}, 'rank': 1}])
+
+        response = client.get(reverse('achievementstats-rank', args=[self.bob.pk]))
+        self.assertIsNone(response.data['rank'])
+        self.assertEqual(response.data['total_points'], 0)
+
+    def test_backfill_refreshes_scores(self):
+        UserAchievement.objects.all().delete()
+        call_command('backfill_achievements', '--codes', 'first_timer_badge', stdout=StringIO())
+        self.assertEqual(self.score(self.carol).total_points, self.first_timer.points)
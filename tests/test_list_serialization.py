@@ -0,0 +1,127 @@
+"""
+Tests for page-level (batched) list serialization of clubs
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.models import Club, Chapter, Member
+from clubs.serializers import ClubSerializer, ChapterSerializer
+from .test_utils import create_test_image
+
+
+def create_club_with_members(index):
+    club = Club.objects.create(name=f'Batch Club {index}', description='Batch test club')
+    chapter = Chapter.objects.create(club=club, name=f'Batch Chapter {index}')
+    Member.objects.create(
+        chapter=chapter,
+        first_name='President',
+        last_name=f'Number {index}',
+        role='president',
+        national_role='national_president',
+        profile_picture=create_test_image(f'president_{index}.jpg')
+    )
+    Member.objects.create(
+        chapter=chapter,
+        first_name='Rider',
+        last_name=f'Number {index}',
+        role='member',
+        profile_picture=create_test_image(f'rider_{index}.jpg')
+    )
+    return club
+
+
+class ClubListSerializationTests(TestCase):
+    """List serialization returns the same payload with a fixed number of queries"""
+
+    def test_list_payload_matches_single_object_payload(self):
+        clubs = [create_club_with_members(i) for i in range(3)]
+
+        list_data = ClubSerializer(Club.objects.order_by('name'), many=True).data
+        single_data = [ClubSerializer(club).data for club in sorted(clubs, key=lambda c: c.name)]
+
+        self.assertEqual(list_data, single_data)
+        self.assertEqual(list_data[0]['total_members'], 2)
+        self.assertEqual(len(list_data[0]['featured_members']), 1)
+
+    def test_query_count_does_not_grow_with_clubs(self):
+        for i in range(2):
+            create_club_with_members(i)
+        with CaptureQueriesContext(connection) as small_page:
+            ClubSerializer(Club.objects.all(), many=True).data
+
+        for i in range(2, 8):
+            create_club_with_members(i)
+        with CaptureQueriesContext(connection) as large_page:
+            ClubSerializer(Club.objects.all(), many=True).data
+
+        self.assertEqual(len(small_page), len(large_page))
+
+
+class ChapterMemberStatsTests(TestCase):
+    """Chapter member counts and breakdown come from one aggregation per page"""
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Stats Club')
+        self.chapters = [
+            Chapter.objects.create(club=self.club, name=f'Stats Chapter {i}') for i in range(3)
+        ]
+        chapter = self.chapters[0]
+        Member.objects.create(
+            chapter=chapter, first_name='Ana', last_name='Pilot', role='president',
+            member_type='pilot', profile_picture=create_test_image('ana.jpg')
+        )
+        Member.objects.create(
+            chapter=chapter, first_name='Beto', last_name='Copilot', role='member',
+            member_type='copilot', profile_picture=create_test_image('beto.jpg')
+        )
+        Member.objects.create(
+            chapter=chapter, first_name='Carla', last_name='Inactive', role='member',
+            member_type='pilot', is_active=False, profile_picture=create_test_image('carla.jpg')
+        )
+
+    def test_counts_and_breakdown(self):
+        data = ChapterSerializer(self.chapters[0]).data
+
+        self.assertEqual(data['total_members'], 3)
+        self.assertEqual(data['active_members'], 2)
+        self.assertEqual(data['member_breakdown']['by_role']['president'], 1)
+        self.assertEqual(data['member_breakdown']['by_role']['member'], 1)
+        self.assertEqual(data['member_breakdown']['by_member_type']['pilot'], 1)
+        self.assertEqual(data['member_breakdown']['by_member_type']['copilot'], 1)
+        self.assertEqual(data['member_breakdown']['by_member_type']['prospect'], 0)
+
+    def test_list_payload_matches_single_object_payload(self):
+        chapters = Chapter.objects.filter(club=self.club).order_by('name')
+        list_data = ChapterSerializer(chapters, many=True).data
+        single_data = [ChapterSerializer(chapter).data for chapter in chapters]
+
+        self.assertEqual(list_data, single_data)
+
+    def test_list_uses_a_single_stats_query(self):
+        chapters = list(Chapter.objects.filter(club=self.club))
+        with self.assertNumQueries(1):
+            ChapterSerializer(chapters, many=True).data
+
+
+class ClubListEndpointQueryTests(APITestCase):
+    """Club list endpoints don't issue per-club queries"""
+
+    def test_club_list_endpoint_query_count(self):
+        for i in range(2):
+            create_club_with_members(i)
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get('/api/clubs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for i in range(2, 8):
+            create_club_with_members(i)
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get('/api/clubs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 8)
+
+        self.assertEqual(len(small_page), len(large_page))
@@ -0,0 +1,124 @@
+"""
+Tests for the manageable-queryset builders and the shape of their query plans
+"""
+
+import json
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from clubs.models import Club, Chapter, Member, ClubAdmin, ChapterAdmin
+from clubs.permissions import get_user_manageable_chapters, get_user_manageable_members
+
+
+def seed_clubs(clubs=12, chapters_per_club=6, members_per_chapter=25):
+    """Seed a dataset large enough for the planner to prefer indexes"""
+    club_objs = [Club.objects.create(name=f'Plan Club {i}') for i in range(clubs)]
+    chapter_objs = [
+        Chapter.objects.create(club=club, name=f'Plan Chapter {club.pk}-{j}')
+        for club in club_objs
+        for j in range(chapters_per_club)
+    ]
+    Member.objects.bulk_create([
+        Member(
+            chapter=chapter,
+            first_name=f'Rider {k}',
+            last_name=f'Chapter {chapter.pk}',
+            role='member',
+            profile_picture='members/profiles/seed.jpg',
+        )
+        for chapter in chapter_objs
+        for k in range(members_per_chapter)
+    ])
+    return club_objs, chapter_objs
+
+
+def plan_nodes(plan):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class ManageableQuerysetTests(TestCase):
+    """Manageable querysets return each object once"""
+
+    def setUp(self):
+        self.clubs, self.chapters = seed_clubs(clubs=3, chapters_per_club=2, members_per_chapter=2)
+        self.user = User.objects.create_user(username='plan_admin', password='testpass123')
+        # Club admin of the first club and chapter admin in both the first and second club
+        ClubAdmin.objects.create(user=self.user, club=self.clubs[0])
+        ChapterAdmin.objects.create(user=self.user, chapter=self.chapters[0])
+        ChapterAdmin.objects.create(user=self.user, chapter=self.chapters[2])
+
+    def test_chapters(self):
+        chapter_ids = list(get_user_manageable_chapters(self.user).values_list('pk', flat=True))
+        expected = {self.chapters[0].pk, self.chapters[1].pk, self.chapters[2].pk}
+        self.assertEqual(len(chapter_ids), len(expected))
+        self.assertEqual(set(chapter_ids), expected)
+
+    def test_members(self):
+        member_ids = list(get_user_manageable_members(self.user).values_list('pk', flat=True))
+        expected = set(Member.objects.filter(
+            chapter__in=self.chapters[:3]
+        ).values_list('pk', flat=True))
+        self.assertEqual(len(member_ids), len(expected))
+        self.assertEqual(set(member_ids), expected)
+
+    def test_no_distinct(self):
+        self.assertFalse(get_user_manageable_chapters(self.user).query.distinct)
+        self.assertFalse(get_user_manageable_members(self.user).query.distinct)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plan checks need PostgreSQL')
+class ManageableQuerysetPlanTests(TestCase):
+    """
+    Index availability checks: the plans must not de-duplicate rows (Unique /
+    hashed Aggregate), and with sequential scans disabled the member and admin
+    tables must be reachable through their indexes. They don't show that the
+    planner picks those indexes for production data, only that it can.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clubs, cls.chapters = seed_clubs()
+        cls.users = [
+            User.objects.create_user(username=f'plan_user_{i}', password='testpass123')
+            for i in range(20)
+        ]
+        for i, user in enumerate(cls.users):
+            ClubAdmin.objects.create(user=user, club=cls.clubs[i % len(cls.clubs)])
+            ChapterAdmin.objects.create(user=user, chapter=cls.chapters[(i * 7) % len(cls.chapters)])
+        cls.user = cls.users[0]
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE clubs_member, clubs_chapter, clubs_clubadmin, clubs_chapteradmin')
+            # Only affects this test's transaction. A seq scan that remains
+            # means no usable index, not the planner's preference on this data
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            result = cursor.fetchone()[0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        return list(plan_nodes(result[0]['Plan']))
+
+    def assertPlanShape(self, nodes):
+        node_types = [node['Node Type'] for node in nodes]
+        self.assertNotIn('Unique', node_types)
+        self.assertFalse(
+            [node for node in nodes if node['Node Type'] == 'Aggregate' and node.get('Strategy') == 'Hashed'],
+            'Plan de-duplicates rows with a hash aggregate'
+        )
+        seq_scanned = {node.get('Relation Name') for node in nodes if node['Node Type'] == 'Seq Scan'}
+        for table in ('clubs_member', 'clubs_clubadmin', 'clubs_chapteradmin'):
+            self.assertNotIn(table, seq_scanned)
+
+    def test_chapters_plan(self):
+        self.assertPlanShape(self.explain(get_user_manageable_chapters(self.user)))
+
+    def test_members_plan(self):
+        self.assertPlanShape(self.explain(get_user_manageable_members(self.user)))
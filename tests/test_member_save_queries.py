@@ -0,0 +1,94 @@
+"""
+Tests for the Member write path query budget and field change tracking
+"""
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from achievements.models import AchievementRecheck
+from clubs.models import MEMBER_SAVE_QUERIES, Club, Chapter, Member
+from .test_utils import create_test_image
+
+
+class MemberSaveQueryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='budget', password='testpass123')
+        self.club = Club.objects.create(name='Budget Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='Budget Chapter')
+        self.other_chapter = Chapter.objects.create(club=self.club, name='Other Budget Chapter')
+
+    def create_member(self, **kwargs):
+        fields = {
+            'user': self.user, 'chapter': self.chapter, 'first_name': 'Ana', 'last_name': 'Budget',
+            'role': 'member', 'profile_picture': create_test_image('budget.jpg'),
+        }
+        fields.update(kwargs)
+        return Member.objects.create(**fields)
+
+    def test_create(self):
+        with self.assertNumQueries(MEMBER_SAVE_QUERIES['create']):
+            self.create_member()
+
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.total_members, 1)
+
+    def test_role_change(self):
+        member = Member.objects.get(pk=self.create_member().pk)
+        member.role = 'president'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(MEMBER_SAVE_QUERIES['update']):
+                member.save()
+
+        self.assertFalse(member.field_changed('role'))
+        recheck = AchievementRecheck.objects.get(user=self.user)
+        self.assertIn('member_role_change', recheck.triggers)
+
+    def test_unchanged_save(self):
+        member = Member.objects.get(pk=self.create_member().pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(MEMBER_SAVE_QUERIES['update']):
+                member.save()
+        self.assertFalse(AchievementRecheck.objects.filter(triggers__contains=['member_role_change']).exists())
+
+    def test_changed_name_is_validated(self):
+        self.create_member(user=None, first_name='Luis')
+        member = Member.objects.get(pk=self.create_member().pk)
+        member.first_name = 'luis'
+
+        with self.assertRaises(ValidationError) as raised:
+            member.save()
+        self.assertIn('first_name', raised.exception.message_dict)
+
+    def test_moved_member_is_validated(self):
+        self.create_member(chapter=self.other_chapter, first_name='Other')
+        member = Member.objects.get(pk=self.create_member().pk)
+        member.chapter = self.other_chapter
+
+        with self.assertRaises(ValidationError):
+            member.save()
+
+    def test_moved_member_updates_counters(self):
+        other_club = Club.objects.create(name='Other Budget Club')
+        other_chapter = Chapter.objects.create(club=other_club, name='Budget Chapter')
+        member = Member.objects.get(pk=self.create_member().pk)
+
+        member.chapter = other_chapter
+        member.save()
+
+        self.club.refresh_from_db()
+        other_club.refresh_from_db()
+        self.assertEqual((self.club.total_members, other_club.total_members), (0, 1))
+        self.assertEqual(member.saved_value('chapter_id'), other_chapter.pk)
+
+    def test_update_fields_only_resets_saved_fields(self):
+        member = Member.objects.get(pk=self.create_member().pk)
+        member.role = 'president'
+        member.nickname = 'Prez'
+        member.is_active = False
+        member.save(update_fields=['role', 'nickname'])
+
+        self.assertFalse(member.field_changed('role'))
+        self.assertTrue(member.field_changed('is_active'))
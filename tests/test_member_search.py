@@ -0,0 +1,70 @@
+"""
+Tests for the members directory full-text / trigram search
+"""
+
+import unittest
+
+from django.db import connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.filters import normalize_search_term
+from clubs.models import Club, Chapter, Member
+from .test_utils import create_test_image
+
+
+class NormalizeSearchTermTests(unittest.TestCase):
+
+    def test_strips_accents_and_case(self):
+        self.assertEqual(normalize_search_term('José Peña ÁLVAREZ'), 'jose pena alvarez')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Member search needs PostgreSQL')
+class MemberSearchTests(APITestCase):
+    """?search= is accent-insensitive, prefix-aware and ranked"""
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Águilas del Norte')
+        self.chapter = Chapter.objects.create(club=self.club, name='Monterrey')
+        self.jose = self.create_member('José', 'López', 'jose.jpg')
+        self.maria = self.create_member('María', 'Núñez', 'maria.jpg', nickname='La Güera')
+
+        other_club = Club.objects.create(name='Jose Riders')
+        other_chapter = Chapter.objects.create(club=other_club, name='Saltillo')
+        self.pedro = self.create_member('Pedro', 'Ramírez', 'pedro.jpg', chapter=other_chapter)
+
+    def create_member(self, first_name, last_name, image, chapter=None, **kwargs):
+        return Member.objects.create(
+            chapter=chapter or self.chapter,
+            first_name=first_name,
+            last_name=last_name,
+            role='member',
+            profile_picture=create_test_image(image),
+            **kwargs
+        )
+
+    def search(self, term):
+        response = self.client.get('/api/members/', {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [member['id'] for member in response.data['results']]
+
+    def test_accent_insensitive(self):
+        self.assertEqual(self.search('nunez'), [self.maria.id])
+        self.assertEqual(self.search('NÚÑEZ'), [self.maria.id])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search('lop'), [self.jose.id])
+
+    def test_nickname_chapter_and_club(self):
+        self.assertEqual(self.search('guera'), [self.maria.id])
+        self.assertEqual(self.search('saltillo'), [self.pedro.id])
+        self.assertEqual(set(self.search('aguilas')), {self.jose.id, self.maria.id})
+
+    def test_name_match_ranks_above_club_match(self):
+        self.assertEqual(self.search('jose'), [self.jose.id, self.pedro.id])
+
+    def test_chapter_rename_updates_search(self):
+        self.chapter.name = 'Guadalajara'
+        self.chapter.save()
+        self.assertEqual(set(self.search('guadalajara')), {self.jose.id, self.maria.id})
+        self.assertEqual(self.search('monterrey'), [])
@@ -0,0 +1,94 @@
+"""
+Tests for the request-scoped permission context
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from clubs.models import Club, Chapter, Member, ClubAdmin, ChapterAdmin
+from clubs.permissions import PermissionContext, get_permission_context
+from .test_utils import create_test_image
+
+
+def admin_role_queries(queries):
+    """Queries that read the admin role tables directly"""
+    return [
+        q['sql'] for q in queries
+        if 'FROM "clubs_clubadmin"' in q['sql'] or 'FROM "clubs_chapteradmin"' in q['sql']
+    ]
+
+
+class PermissionContextTests(TestCase):
+    """Admin roles are loaded once and reused for every check"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ctx_admin', password='testpass123')
+        self.club = Club.objects.create(name='Context Club')
+        self.other_club = Club.objects.create(name='Other Context Club')
+        self.chapters = [
+            Chapter.objects.create(club=self.club, name=f'Context Chapter {i}') for i in range(3)
+        ]
+        self.other_chapter = Chapter.objects.create(club=self.other_club, name='Managed Chapter')
+        self.foreign_chapter = Chapter.objects.create(club=self.other_club, name='Foreign Chapter')
+        ClubAdmin.objects.create(user=self.user, club=self.club)
+        ChapterAdmin.objects.create(user=self.user, chapter=self.other_chapter)
+
+    def test_checks_cost_two_queries_in_total(self):
+        context = PermissionContext(self.user)
+        with self.assertNumQueries(2):
+            for chapter in self.chapters:
+                self.assertTrue(context.can_manage_chapter(chapter))
+            self.assertTrue(context.can_manage_chapter(self.other_chapter))
+            self.assertFalse(context.can_manage_chapter(self.foreign_chapter))
+            self.assertTrue(context.can_manage_club(self.club))
+            self.assertFalse(context.can_manage_club(self.other_club.pk))
+
+    def test_superuser_needs_no_queries(self):
+        superuser = User.objects.create_superuser(username='ctx_super', password='testpass123')
+        context = PermissionContext(superuser)
+        with self.assertNumQueries(0):
+            self.assertTrue(context.is_admin)
+            self.assertTrue(context.can_manage_club(self.other_club))
+            self.assertTrue(context.can_manage_chapter(self.foreign_chapter))
+
+    def test_context_is_cached_on_the_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertIs(get_permission_context(request), get_permission_context(request))
+
+
+class PermissionQueryCountAPITests(APITestCase):
+    """A write request loads the user's admin roles at most once"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='api_admin', password='testpass123')
+        self.club = Club.objects.create(name='API Permission Club')
+        self.chapter = Chapter.objects.create(club=self.club, name='API Permission Chapter')
+        ClubAdmin.objects.create(user=self.user, club=self.club)
+        self.member = Member.objects.create(
+            chapter=self.chapter,
+            first_name='Query',
+            last_name='Counter',
+            profile_picture=create_test_image('query_counter.jpg')
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_member_update_permission_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/members/{self.member.id}/', {'nickname': 'Counter'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(admin_role_queries(queries)), 2)
+
+    def test_chapter_update_permission_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/chapters/{self.chapter.id}/', {'description': 'Updated'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(admin_role_queries(queries)), 2)
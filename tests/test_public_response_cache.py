@@ -0,0 +1,66 @@
+"""
+Tests for the public API response cache
+"""
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.request import Request
+from rest_framework import status
+
+from clubs.cache import CLUBS_CACHE_NAMESPACE, build_cache_key
+from clubs.models import Club
+from motomundo.cache import bump_version
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PUBLIC_API_CACHE={'ENABLED': True, 'ALIAS': 'default', 'LOCK_WAIT': 0.1},
+)
+class PublicResponseCacheTests(APITestCase):
+    """Public GETs are cached and invalidated by model changes"""
+
+    def setUp(self):
+        cache.clear()
+        Club.objects.create(name='Cached Club', description='Cache test club')
+
+    def get_clubs(self, query=''):
+        response = self.client.get(f'/api/clubs/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.get_clubs()
+        second = self.get_clubs()
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_query_parameter_order_is_normalized(self):
+        self.get_clubs('?search=Cached&ordering=name')
+        response = self.get_clubs('?ordering=name&search=Cached')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_model_change_invalidates(self):
+        self.get_clubs()
+        Club.objects.create(name='New Club', description='Created after caching')
+
+        response = self.get_clubs()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_stale_entry_served_while_another_request_recomputes(self):
+        self.get_clubs()
+        request = Request(APIRequestFactory().get('/api/clubs/'))
+        cache.add(f'{build_cache_key(request)}:lock', 1, 30)
+        bump_version(CLUBS_CACHE_NAMESPACE)
+
+        response = self.get_clubs()
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_writes_are_not_cached(self):
+        self.client.post('/api/clubs/', {'name': 'Anonymous Club'})
+        self.assertEqual(Club.objects.count(), 1)
+        self.assertEqual(self.get_clubs()['X-Cache'], 'MISS')
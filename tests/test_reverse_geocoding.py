@@ -0,0 +1,98 @@
+"""
+Tests for the in-process reverse geocoding index and endpoints
+"""
+
+import unittest
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from geography.models import Country, State
+from geography.reverse import BoundaryIndex, clear_geocoder
+from geography.snapshot import clear_snapshot
+
+
+def square(min_lng, min_lat, max_lng, max_lat):
+    return MultiPolygon(Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat)), srid=4326)
+
+
+class BoundaryIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = BoundaryIndex([
+            (1, square(-101, 24, -99, 27)),
+            (2, square(-105, 19, -101.5, 22.5)),
+            (3, None),
+        ])
+
+    def test_find(self):
+        self.assertEqual(self.index.find(Point(-100.3, 25.6, srid=4326)), 1)
+        self.assertEqual(self.index.find(Point(-103.35, 20.67, srid=4326)), 2)
+
+    def test_point_outside_every_boundary(self):
+        self.assertIsNone(self.index.find(Point(-101.2, 23, srid=4326)))
+        self.assertIsNone(self.index.find(Point(10, 10, srid=4326)))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Boundaries need PostGIS')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ReverseGeocodeAPITests(APITestCase):
+    url = '/geography/api/reverse/'
+
+    def setUp(self):
+        cache.clear()
+        clear_snapshot()
+        clear_geocoder()
+        self.mexico = Country.objects.create(name='Mexico', code='MX', boundary=square(-118, 14, -86, 33))
+        self.nuevo_leon = State.objects.create(
+            name='Nuevo León', code='NL', country=self.mexico, boundary=square(-101, 24, -99, 27)
+        )
+
+    def tearDown(self):
+        clear_snapshot()
+        clear_geocoder()
+
+    def test_point_in_state(self):
+        response = self.client.get(self.url, {'lat': 25.6866, 'lng': -100.3161})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['state']['id'], self.nuevo_leon.id)
+        self.assertEqual(response.data['country']['id'], self.mexico.id)
+
+    def test_point_in_country_only(self):
+        response = self.client.get(self.url, {'lat': 19.43, 'lng': -99.13})
+        self.assertIsNone(response.data['state'])
+        self.assertEqual(response.data['country']['name'], 'Mexico')
+
+    def test_lookups_skip_the_database(self):
+        self.client.get(self.url, {'lat': 25.6, 'lng': -100.3})
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'lat': 25.7, 'lng': -100.2})
+
+    def test_index_rebuilt_after_edit(self):
+        self.client.get(self.url, {'lat': 25.6, 'lng': -100.3})
+        self.nuevo_leon.boundary = square(-102, 28, -100, 30)
+        self.nuevo_leon.save()
+        response = self.client.get(self.url, {'lat': 25.6, 'lng': -100.3})
+        self.assertIsNone(response.data['state'])
+
+    def test_invalid_coordinates(self):
+        response = self.client.get(self.url, {'lat': 95, 'lng': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch(self):
+        response = self.client.post(f'{self.url}batch/', {
+            'points': [{'lat': 25.6, 'lng': -100.3}, {'lat': 0, 'lng': 0}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data['results']
+        self.assertEqual(first['state']['name'], 'Nuevo León')
+        self.assertIsNone(second['country'])
+
+    def test_batch_validation(self):
+        response = self.client.post(f'{self.url}batch/', {'points': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(f'{self.url}batch/', {'points': [{'lat': 1}]}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,72 @@
+"""
+Tests for the Mapbox Vector Tile endpoint
+"""
+
+import unittest
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from clubs.models import Club, Chapter
+from geography.tiles import MAP_TILES_NAMESPACE, is_valid_tile
+from motomundo.cache import get_version
+
+
+class TileRangeTests(TestCase):
+
+    def test_is_valid_tile(self):
+        self.assertTrue(is_valid_tile(0, 0, 0))
+        self.assertTrue(is_valid_tile(3, 7, 7))
+        self.assertFalse(is_valid_tile(3, 8, 0))
+        self.assertFalse(is_valid_tile(23, 0, 0))
+
+    def test_out_of_range_tile_is_404(self):
+        response = self.client.get('/geography/tiles/2/5/1.mvt')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TileInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.chapter = Chapter.objects.create(club=Club.objects.create(name='Tile Club'), name='Tile Chapter')
+
+    def test_chapter_move_bumps_tile_version(self):
+        version = get_version(MAP_TILES_NAMESPACE)
+        self.chapter.location = Point(-100.3161, 25.6866, srid=4326)
+        self.chapter.save()
+        self.assertNotEqual(get_version(MAP_TILES_NAMESPACE), version)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Vector tiles need PostGIS')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class VectorTileTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        club = Club.objects.create(name='MVT Club')
+        # Monterrey lies in tile 6/14/27
+        self.chapter = Chapter.objects.create(
+            club=club, name='Monterrey', location=Point(-100.3161, 25.6866, srid=4326)
+        )
+
+    def test_tile_with_chapter(self):
+        response = self.client.get('/geography/tiles/6/14/27.mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn(b'chapters', response.content)
+        self.assertIn(b'Monterrey', response.content)
+
+    def test_empty_tile(self):
+        response = self.client.get('/geography/tiles/6/0/0.mvt')
+        self.assertEqual(response.status_code, 204)
+
+    def test_moved_chapter_leaves_cached_tile(self):
+        self.client.get('/geography/tiles/6/14/27.mvt')
+        self.chapter.location = Point(2.35, 48.85, srid=4326)
+        self.chapter.save()
+        response = self.client.get('/geography/tiles/6/14/27.mvt')
+        self.assertEqual(response.status_code, 204)